@@ -0,0 +1,168 @@
+"""
+Batch research: generate profiles for a whole watchlist of companies.
+
+Usage:
+    python batch_research.py watchlist.txt --max-concurrent-agents 40
+    python batch_research.py --companies "Dell" "Apple" "Grainger"
+    python batch_research.py --resume
+
+Python API:
+    from batch_research import run_batch
+    run_batch(["Dell", "Apple"], max_concurrent_agents=40)
+"""
+from pathlib import Path
+from datetime import datetime
+import argparse
+import asyncio
+import json
+import time
+
+from parallel import AsyncParallel
+
+import upstream
+from merge_sectors_data import (
+    client, generate_profile, claim_orphaned_generation, run_generation, DATA_DIR, GENERATION_BUDGET,
+)
+
+BATCHES_DIR = DATA_DIR / "batches"
+
+# Each company fans out into four agent runs, so 40 keeps ~10 companies in flight
+DEFAULT_MAX_CONCURRENT_AGENTS = 40
+
+DEFAULT_BATCH_TENANT = "batch"
+
+
+def load_watchlist(path) -> list[str]:
+    """Read one company per line, skipping blanks, '#' comments and duplicates"""
+    companies = []
+    seen = set()
+    with open(path, 'r') as f:
+        for line in f:
+            company = line.split("#", 1)[0].strip()
+            if company and company.lower() not in seen:
+                seen.add(company.lower())
+                companies.append(company)
+    return companies
+
+
+async def run_batch_async(companies: list[str], max_concurrent_agents: int = DEFAULT_MAX_CONCURRENT_AGENTS,
+                          manifest_path: Path | None = None, resume: bool = False, use_cache: bool = True,
+                          two_tier: bool = False, budget: float | None = GENERATION_BUDGET,
+                          tenant: str = DEFAULT_BATCH_TENANT):
+    """
+    Generate profiles for every company, with at most max_concurrent_agents
+    agent runs in flight across the whole batch. Companies queue as batch
+    generations of tenant with the scheduler, so interactive requests go
+    first and other tenants' batches get their fair share.
+
+    Each profile is published to data/<TICKER>_profile.json as soon as its
+    company finishes, and a line is appended to the JSONL manifest so a
+    long batch can be followed (or post-processed) while it runs.
+
+    With resume=True, generations orphaned by a crashed or redeployed process
+    are reattached to and finished as part of the batch. use_cache=False
+    bypasses cached agent outputs (fresh results still refresh the cache).
+    two_tier adds a preview run per agent; it is off by default since batch
+    refreshes don't need early previews and it doubles the number of runs.
+    A company whose agents overrun budget has a partial profile published at
+    the deadline; its manifest line is written once the late agents finish.
+    """
+    if manifest_path is None:
+        BATCHES_DIR.mkdir(parents=True, exist_ok=True)
+        manifest_path = BATCHES_DIR / f"batch_{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl"
+
+    # Batch calls leave part of the upstream rate limit (and of the generation
+    # slots) to interactive requests
+    upstream.priority.set("batch")
+    semaphore = asyncio.Semaphore(max_concurrent_agents)
+    print(f"Starting batch of {len(companies)} companies (max {max_concurrent_agents} concurrent agents)")
+    print(f"Writing manifest to {manifest_path}")
+
+    async with AsyncParallel(api_key=client.api_key, max_retries=0) as async_client:
+        async def run_company(company: str, generation: dict | None = None):
+            started = time.monotonic()
+            try:
+                if generation is not None:
+                    profile, ticker = await run_generation(company, Path(generation["workspace"]), async_client=async_client,
+                                                           semaphore=semaphore, use_cache=use_cache, two_tier=two_tier,
+                                                           budget=budget)
+                else:
+                    profile, ticker = await generate_profile(company, async_client=async_client,
+                                                             semaphore=semaphore, use_cache=use_cache, two_tier=two_tier,
+                                                             budget=budget, tenant=tenant)
+            except Exception as e:
+                print(f"[batch] {company} failed: {e}")
+                profile, ticker = None, None
+            sector_status = profile["meta"]["sector_status"] if profile else {}
+            failed_sectors = [name for name, status in sector_status.items() if status == "failed"]
+            return company, ticker, failed_sectors, time.monotonic() - started
+
+        summary = []
+        pending = []
+        if resume:
+            while (generation := claim_orphaned_generation()) is not None:
+                pending.append(asyncio.create_task(run_company(generation["company"], generation)))
+            print(f"Resuming {len(pending)} orphaned generations")
+        pending.extend(asyncio.create_task(run_company(company)) for company in companies)
+        with open(manifest_path, 'a') as manifest:
+            for finished in asyncio.as_completed(pending):
+                company, ticker, failed_sectors, elapsed = await finished
+                entry = {
+                    "company": company,
+                    "ticker": ticker,
+                    "status": "completed" if ticker else "failed",
+                    "failed_sectors": failed_sectors,
+                    "profile_path": str(DATA_DIR / f"{ticker}_profile.json") if ticker else None,
+                    "elapsed_seconds": round(elapsed, 1),
+                    "finished_at": datetime.now().isoformat(timespec="seconds"),
+                }
+                manifest.write(json.dumps(entry) + "\n")
+                manifest.flush()
+                summary.append(entry)
+                print(f"[batch] {len(summary)}/{len(pending)} done - {company}: {entry['status']}")
+
+    completed = sum(1 for entry in summary if entry["status"] == "completed")
+    print(f"\nBatch finished: {completed}/{len(summary)} profiles generated")
+    return summary
+
+
+def run_batch(companies: list[str], max_concurrent_agents: int = DEFAULT_MAX_CONCURRENT_AGENTS,
+              manifest_path: Path | None = None, resume: bool = False, use_cache: bool = True,
+              two_tier: bool = False, budget: float | None = GENERATION_BUDGET,
+              tenant: str = DEFAULT_BATCH_TENANT):
+    """Blocking wrapper around run_batch_async"""
+    return asyncio.run(run_batch_async(companies, max_concurrent_agents, manifest_path, resume, use_cache,
+                                       two_tier, budget, tenant))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate company profiles for a watchlist")
+    parser.add_argument("watchlist", nargs="?", help="File with one company name per line")
+    parser.add_argument("--companies", nargs="+", default=[], help="Company names given inline")
+    parser.add_argument("--max-concurrent-agents", type=int, default=DEFAULT_MAX_CONCURRENT_AGENTS,
+                        help="Global cap on agent runs in flight across all companies")
+    parser.add_argument("--manifest", type=Path, help="JSONL file to append per-company results to")
+    parser.add_argument("--resume", action="store_true",
+                        help="Also reattach to generations left running by a crashed or redeployed process")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached agent outputs and re-run every agent")
+    parser.add_argument("--two-tier", action="store_true",
+                        help="Publish a fast preview profile first, then upgrade it with the full results")
+    parser.add_argument("--budget", type=float, default=GENERATION_BUDGET,
+                        help="Seconds after which a company's profile is published without its late agents")
+    parser.add_argument("--tenant", default=DEFAULT_BATCH_TENANT,
+                        help="Who the batch runs for; queued generations are shared fairly between tenants")
+    args = parser.parse_args()
+
+    companies = list(args.companies)
+    if args.watchlist:
+        companies.extend(load_watchlist(args.watchlist))
+    if not companies and not args.resume:
+        parser.error("provide a watchlist file, --companies or --resume")
+
+    run_batch(companies, args.max_concurrent_agents, args.manifest, args.resume,
+              use_cache=not args.refresh, two_tier=args.two_tier, budget=args.budget, tenant=args.tenant)
+
+
+if __name__ == "__main__":
+    main()
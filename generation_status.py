@@ -0,0 +1,72 @@
+"""
+What the dashboard needs to know about generations, without the research stack.
+
+Generations run in the worker pool (worker.py). The app only submits jobs and
+shows their progress and partial profiles, all of which it reads from the job
+store and the run workspace, so it imports this module instead of
+merge_sectors_data (which loads the Parallel SDK and creates its client).
+"""
+from pathlib import Path
+from datetime import datetime
+import os
+
+import job_store
+from pararell_agents.registry import AGENTS
+
+# End-to-end latency budget of a generation (seconds). Agents still running
+# when their deadline passes are flagged "late": the profile is published
+# without them and upgraded when they land (until merge_sectors_data.MAX_WAIT_TIME)
+GENERATION_BUDGET = float(os.getenv("GENERATION_BUDGET", 900))
+
+
+def partial_profile_path(workspace: Path) -> Path:
+    """Where a generation publishes its profile while sectors are still arriving"""
+    return workspace / "profile.json"
+
+
+def generation_progress(company: str) -> dict | None:
+    """
+    Live progress of the generation for a company, read from the job store so
+    any process (e.g. the dashboard) can show it:
+    {"queue_position": n} while it waits for a slot, otherwise
+    {"elapsed": seconds, "agents": [{"name", "label", "status", "elapsed"}]}
+    with status "queued", "running", "preview" (preview landed, full run
+    still going), "completed" or "failed". None if nothing is running.
+    """
+    position = job_store.queue_position(company)
+    if position is not None:
+        return {"queue_position": position}
+    generation = job_store.find_running_generation(company)
+    if generation is None:
+        return None
+
+    now = datetime.now()
+    runs = job_store.get_agent_runs(generation["generation_id"])
+
+    def run_elapsed(run: dict) -> float:
+        end = now if run["status"] == "running" else datetime.fromisoformat(run["updated_at"])
+        return (end - datetime.fromisoformat(run["created_at"])).total_seconds()
+
+    agents = []
+    for agent in AGENTS:
+        full = runs.get(agent["name"])
+        preview = runs.get(f"{agent['name']}:preview")
+        if full is not None and full["status"] == "completed":
+            status = "completed"
+        elif preview is not None and preview["status"] == "completed":
+            status = "preview" if full is None or full["status"] == "running" else "completed"
+        elif full is not None and full["status"] in ("failed", "timed_out", "cancelled"):
+            status = "failed" if preview is None or preview["status"] != "running" else "running"
+        elif full is not None or preview is not None:
+            status = "running"
+        else:
+            status = "queued"
+        started = [run for run in (full, preview) if run is not None]
+        agents.append({
+            "name": agent["name"],
+            "label": agent["label"],
+            "status": status,
+            "elapsed": max((run_elapsed(run) for run in started), default=0),
+        })
+    elapsed = (now - datetime.fromisoformat(generation["created_at"])).total_seconds()
+    return {"elapsed": elapsed, "agents": agents}
@@ -0,0 +1,60 @@
+"""
+Hedged re-submission of straggler task runs.
+
+When a run has been going for longer than HEDGE_PERCENTILE of recent runs
+of the same agent on the same processor, a duplicate run is submitted and
+whichever finishes first is used. Hedges cost a full extra run, so at most
+HEDGE_MAX_RATE of the runs started in the last HEDGE_WINDOW_SECONDS may be
+hedged (always allowing one).
+
+Hedging is off unless HEDGE_PERCENTILE is set (e.g. 0.95).
+"""
+from collections import deque
+import os
+import threading
+import time
+
+from poll_scheduler import MIN_SAMPLES
+
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 0)) or None
+HEDGE_MAX_RATE = float(os.getenv("HEDGE_MAX_RATE", 0.05))
+HEDGE_WINDOW_SECONDS = 3600
+
+
+def hedge_after(durations: list[float]) -> float | None:
+    """Run age (seconds) after which to hedge, or None without hedging or enough history"""
+    if HEDGE_PERCENTILE is None or len(durations) < MIN_SAMPLES:
+        return None
+    durations = sorted(durations)
+    return durations[min(len(durations) - 1, int(HEDGE_PERCENTILE * len(durations)))]
+
+
+class HedgeBudget:
+    def __init__(self, max_rate: float, window_seconds: float):
+        self.max_rate = max_rate
+        self.window_seconds = window_seconds
+        self.runs = deque()
+        self.hedges = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        for times in (self.runs, self.hedges):
+            while times and now - times[0] > self.window_seconds:
+                times.popleft()
+
+    def record_run(self):
+        with self._lock:
+            self.runs.append(time.monotonic())
+
+    def try_hedge(self) -> bool:
+        """Take a hedge from the budget, if the hedge rate allows one more"""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            if len(self.hedges) + 1 > max(1, self.max_rate * len(self.runs)):
+                return False
+            self.hedges.append(now)
+            return True
+
+
+budget = HedgeBudget(HEDGE_MAX_RATE, HEDGE_WINDOW_SECONDS)
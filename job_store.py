@@ -0,0 +1,472 @@
+"""
+Durable job store for profile generations.
+
+Every generation (one company, one workspace) and each of its agent task runs
+is recorded in SQLite, so the Parallel run_ids of expensive "ultra" tasks
+survive a restart of the process running them and can be reattached to
+instead of being paid for again.
+
+It also holds the queues shared between processes: generation requests
+submitted by the app for the worker pool (jobs, see worker.py) and the
+scheduler's admission tickets.
+"""
+from pathlib import Path
+from collections import Counter
+from datetime import datetime, timedelta
+import contextlib
+import os
+import socket
+import sqlite3
+import threading
+import uuid
+
+DB_PATH = Path(os.getenv("JOB_STORE_PATH", "data/jobs.db"))
+
+# A generation whose owner has not sent a heartbeat for this long is
+# considered orphaned (its process crashed or was redeployed)
+HEARTBEAT_INTERVAL = 30  # seconds
+STALE_AFTER = timedelta(seconds=120)
+
+# Identifies this process as the owner of the generations it runs
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_initialized_paths = set()
+_initialize_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    generation_id TEXT PRIMARY KEY,
+    company TEXT NOT NULL,
+    company_key TEXT NOT NULL,
+    workspace TEXT NOT NULL,
+    status TEXT NOT NULL,
+    ticker TEXT,
+    owner TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    heartbeat_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_generations_status ON generations (status, company_key);
+
+CREATE TABLE IF NOT EXISTS agent_runs (
+    generation_id TEXT NOT NULL REFERENCES generations (generation_id),
+    agent TEXT NOT NULL,
+    run_id TEXT,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (generation_id, agent)
+);
+
+CREATE TABLE IF NOT EXISTS run_latencies (
+    agent TEXT NOT NULL,
+    processor TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    finished_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_run_latencies ON run_latencies (agent, processor, finished_at);
+
+CREATE TABLE IF NOT EXISTS queue_tickets (
+    ticket_id TEXT PRIMARY KEY,
+    company TEXT NOT NULL,
+    company_key TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    tenant TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    enqueued_at TEXT NOT NULL,
+    heartbeat_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    company TEXT NOT NULL,
+    tenant TEXT,
+    two_tier INTEGER NOT NULL,
+    budget REAL,
+    status TEXT NOT NULL,
+    ticker TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    client_heartbeat_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    heartbeat_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS webhook_statuses (
+    run_id TEXT PRIMARY KEY,
+    status TEXT,
+    received_at TEXT NOT NULL
+);
+"""
+
+# Webhook statuses nobody picked up are dropped after this long
+WEBHOOK_STATUS_TTL = timedelta(hours=1)
+
+
+def normalize_company(company: str) -> str:
+    """Canonical key for a company name ("  apple inc " -> "apple inc")"""
+    return " ".join(company.lower().split())
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+@contextlib.contextmanager
+def _connect():
+    """Open a short-lived connection; safe to use from any thread or process"""
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        if DB_PATH not in _initialized_paths:
+            # Switching to WAL fails instead of waiting while another thread's
+            # connection holds the database, so threads set it up one at a time
+            with _initialize_lock:
+                if DB_PATH not in _initialized_paths:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(SCHEMA)
+                    _initialized_paths.add(DB_PATH)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def create_generation(generation_id: str, company: str, workspace: Path):
+    """Record a new generation owned by this process"""
+    now = _now()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO generations (generation_id, company, company_key, workspace, status, owner, created_at, updated_at, heartbeat_at) "
+            "VALUES (?, ?, ?, ?, 'running', ?, ?, ?, ?)",
+            (generation_id, company, normalize_company(company), str(workspace), PROCESS_ID, now, now, now),
+        )
+
+
+def finish_generation(generation_id: str, status: str, ticker: str | None = None):
+    """Mark a generation completed or failed"""
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE generations SET status = ?, ticker = ?, updated_at = ? WHERE generation_id = ?",
+            (status, ticker, _now(), generation_id),
+        )
+
+
+def mark_generation_published(generation_id: str, ticker: str):
+    """Record that a running generation published its profile (at its deadline) under ticker"""
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE generations SET ticker = ?, updated_at = ? WHERE generation_id = ?",
+            (ticker, _now(), generation_id),
+        )
+
+
+def heartbeat(generation_id: str):
+    """Tell other processes this generation's owner is still alive"""
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE generations SET heartbeat_at = ? WHERE generation_id = ? AND owner = ?",
+            (_now(), generation_id, PROCESS_ID),
+        )
+
+
+def find_running_generation(company: str) -> dict | None:
+    """Most recently started generation still running for a company, if any"""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT * FROM generations WHERE status = 'running' AND company_key = ? ORDER BY created_at DESC LIMIT 1",
+            (normalize_company(company),),
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def running_generation_ids() -> set[str]:
+    """Ids of every generation still running (or orphaned and not yet reclaimed)"""
+    with _connect() as conn:
+        rows = conn.execute("SELECT generation_id FROM generations WHERE status = 'running'").fetchall()
+    return {row["generation_id"] for row in rows}
+
+
+def find_orphaned_generations(company: str | None = None) -> list[dict]:
+    """Running generations whose owner stopped sending heartbeats, oldest first"""
+    cutoff = (datetime.now() - STALE_AFTER).isoformat(timespec="seconds")
+    query = "SELECT * FROM generations WHERE status = 'running' AND heartbeat_at < ?"
+    params = [cutoff]
+    if company is not None:
+        query += " AND company_key = ?"
+        params.append(normalize_company(company))
+    with _connect() as conn:
+        rows = conn.execute(query + " ORDER BY created_at", params).fetchall()
+    return [dict(row) for row in rows]
+
+
+def claim_generation(generation: dict) -> bool:
+    """
+    Take ownership of an orphaned generation. Only one process wins: the update
+    is conditional on the owner and heartbeat we read not having changed.
+    """
+    now = _now()
+    with _connect() as conn:
+        cursor = conn.execute(
+            "UPDATE generations SET owner = ?, heartbeat_at = ?, updated_at = ? "
+            "WHERE generation_id = ? AND status = 'running' AND owner IS ? AND heartbeat_at = ?",
+            (PROCESS_ID, now, now, generation["generation_id"], generation["owner"], generation["heartbeat_at"]),
+        )
+        return cursor.rowcount == 1
+
+
+def record_agent_run(generation_id: str, agent: str, run_id: str | None, status: str):
+    """
+    Insert or update the task run of one agent within a generation. A new
+    run_id (e.g. replacing a failed run) also resets created_at, which is
+    what resumed runs time themselves from.
+    """
+    now = _now()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO agent_runs (generation_id, agent, run_id, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (generation_id, agent) DO UPDATE SET "
+            "created_at = CASE WHEN excluded.run_id IS NOT NULL AND excluded.run_id IS NOT agent_runs.run_id "
+            "THEN excluded.created_at ELSE agent_runs.created_at END, "
+            "run_id = COALESCE(excluded.run_id, agent_runs.run_id), status = excluded.status, updated_at = excluded.updated_at",
+            (generation_id, agent, run_id, status, now, now),
+        )
+
+
+def get_agent_runs(generation_id: str) -> dict[str, dict]:
+    """Agent runs of a generation, keyed by agent name"""
+    with _connect() as conn:
+        rows = conn.execute("SELECT * FROM agent_runs WHERE generation_id = ?", (generation_id,)).fetchall()
+    return {row["agent"]: dict(row) for row in rows}
+
+
+def record_run_latency(agent: str, processor: str, seconds: float):
+    """Remember how long a completed task run took, for poll scheduling"""
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO run_latencies (agent, processor, seconds, finished_at) VALUES (?, ?, ?, ?)",
+            (agent, processor, seconds, _now()),
+        )
+
+
+def get_run_latencies(agent: str, processor: str, limit: int = 200) -> list[float]:
+    """Durations (seconds) of the most recent completed runs of an agent on a processor"""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT seconds FROM run_latencies WHERE agent = ? AND processor = ? ORDER BY finished_at DESC LIMIT ?",
+            (agent, processor, limit),
+        ).fetchall()
+    return [row["seconds"] for row in rows]
+
+
+def recent_run_latencies(limit: int = 20) -> list[dict]:
+    """The most recent completed runs of every agent (agent, processor, seconds, finished_at), newest first"""
+    with _connect() as conn:
+        rows = conn.execute("SELECT * FROM run_latencies ORDER BY finished_at DESC LIMIT ?", (limit,)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def enqueue_ticket(ticket_id: str, company: str, priority: str, tenant: str):
+    """Queue a generation of this process for admission by the scheduler"""
+    now = _now()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO queue_tickets (ticket_id, company, company_key, priority, tenant, status, owner, enqueued_at, heartbeat_at) "
+            "VALUES (?, ?, ?, ?, ?, 'queued', ?, ?, ?)",
+            # Microseconds keep first-come-first-served ordering within a second
+            (ticket_id, company, normalize_company(company), priority, tenant, PROCESS_ID,
+             datetime.now().isoformat(), now),
+        )
+
+
+def _queue_order(conn) -> tuple[list[dict], list[dict]]:
+    """
+    Drop tickets whose owner stopped heartbeating and return (admitted, queued),
+    queued in admission order: interactive before batch, then tenants with
+    fewer admitted tickets, then first come first served.
+    """
+    cutoff = (datetime.now() - STALE_AFTER).isoformat(timespec="seconds")
+    conn.execute("DELETE FROM queue_tickets WHERE heartbeat_at < ?", (cutoff,))
+    rows = [dict(row) for row in conn.execute("SELECT * FROM queue_tickets").fetchall()]
+    admitted = [row for row in rows if row["status"] == "admitted"]
+    admitted_per_tenant = Counter(row["tenant"] for row in admitted)
+    queued = sorted(
+        (row for row in rows if row["status"] == "queued"),
+        key=lambda row: (row["priority"] != "interactive", admitted_per_tenant[row["tenant"]], row["enqueued_at"]),
+    )
+    return admitted, queued
+
+
+def admit_tickets(ticket_ids: list[str], capacity: int, batch_capacity: int) -> dict[str, int | None]:
+    """
+    Heartbeat queued tickets (of this process) and admit those a slot is free
+    for, in one transaction: at most capacity tickets are admitted at once,
+    and batch tickets only while fewer than batch_capacity are. Returns, per
+    ticket, 0 once admitted, its 1-based queue position while it waits, or
+    None if it is unknown (e.g. dropped as stale).
+    """
+    if not ticket_ids:
+        return {}
+    placeholders = ", ".join("?" * len(ticket_ids))
+    with _connect() as conn:
+        # Serialize admissions across processes
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(f"UPDATE queue_tickets SET heartbeat_at = ? WHERE ticket_id IN ({placeholders})",
+                     (_now(), *ticket_ids))
+        admitted, queued = _queue_order(conn)
+        positions = dict.fromkeys(ticket_ids)
+        positions.update((row["ticket_id"], 0) for row in admitted if row["ticket_id"] in positions)
+        newly_admitted = []
+        for index, row in enumerate(queued):
+            if row["ticket_id"] not in positions:
+                continue
+            limit = capacity if row["priority"] == "interactive" else min(capacity, batch_capacity)
+            # Admitting a ticket moves it out of the queue and into the admitted
+            # ones, so the tickets behind it keep the same headroom
+            if index < limit - len(admitted):
+                newly_admitted.append(row["ticket_id"])
+                positions[row["ticket_id"]] = 0
+            else:
+                positions[row["ticket_id"]] = index + 1
+        conn.executemany("UPDATE queue_tickets SET status = 'admitted' WHERE ticket_id = ?",
+                         [(ticket_id,) for ticket_id in newly_admitted])
+    return positions
+
+
+def heartbeat_ticket(ticket_id: str):
+    with _connect() as conn:
+        conn.execute("UPDATE queue_tickets SET heartbeat_at = ? WHERE ticket_id = ?", (_now(), ticket_id))
+
+
+def release_ticket(ticket_id: str):
+    with _connect() as conn:
+        conn.execute("DELETE FROM queue_tickets WHERE ticket_id = ?", (ticket_id,))
+
+
+def queue_position(company: str) -> int | None:
+    """1-based position of a company's generation in the admission queue, or None if it is not queued"""
+    key = normalize_company(company)
+    with _connect() as conn:
+        _, queued = _queue_order(conn)
+    return next((i + 1 for i, row in enumerate(queued) if row["company_key"] == key), None)
+
+
+def submit_job(company: str, two_tier: bool, budget: float | None, tenant: str | None = None) -> str:
+    """Queue a generation request for the worker pool and return its job id"""
+    job_id = uuid.uuid4().hex
+    now = _now()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (job_id, company, tenant, two_tier, budget, status, created_at, updated_at, client_heartbeat_at) "
+            "VALUES (?, ?, ?, ?, ?, 'queued', ?, ?, ?)",
+            (job_id, company, tenant, int(two_tier), budget, now, now, now),
+        )
+    return job_id
+
+
+def get_job(job_id: str) -> dict | None:
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def touch_job(job_id: str):
+    """Tell the worker running a job that its requester is still waiting for it"""
+    with _connect() as conn:
+        conn.execute("UPDATE jobs SET client_heartbeat_at = ? WHERE job_id = ?", (_now(), job_id))
+
+
+def request_job_cancel(job_id: str):
+    with _connect() as conn:
+        conn.execute("UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE job_id = ?", (_now(), job_id))
+
+
+def claim_job(worker_id: str) -> dict | None:
+    """
+    Take the oldest queued job for a worker, or None if there is none. Jobs
+    whose worker stopped heartbeating are queued again first - a little after
+    their generations count as orphaned, so the next worker reattaches to
+    the generation instead of starting a new one.
+    """
+    cutoff = (datetime.now() - STALE_AFTER - timedelta(seconds=HEARTBEAT_INTERVAL)).isoformat(timespec="seconds")
+    now = _now()
+    with _connect() as conn:
+        # Serialize claims across worker processes
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, updated_at = ? WHERE status = 'running' "
+            "AND worker NOT IN (SELECT worker_id FROM workers WHERE heartbeat_at >= ?)",
+            (now, cutoff),
+        )
+        conn.execute("DELETE FROM workers WHERE heartbeat_at < ?", (cutoff,))
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at, rowid LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', worker = ?, updated_at = ? WHERE job_id = ?",
+            (worker_id, now, row["job_id"]),
+        )
+    return {**dict(row), "status": "running", "worker": worker_id}
+
+
+def finish_job(job_id: str, status: str, ticker: str | None = None, error: str | None = None):
+    """Mark a job completed (its profile is published), failed or cancelled"""
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, ticker = ?, error = ?, updated_at = ? WHERE job_id = ?",
+            (status, ticker, error, _now(), job_id),
+        )
+
+
+def worker_heartbeat(worker_id: str):
+    now = _now()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO workers (worker_id, heartbeat_at) VALUES (?, ?) "
+            "ON CONFLICT (worker_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+            (worker_id, now),
+        )
+
+
+def live_workers() -> int:
+    """Number of worker processes that have sent a heartbeat recently"""
+    cutoff = (datetime.now() - STALE_AFTER).isoformat(timespec="seconds")
+    with _connect() as conn:
+        return conn.execute("SELECT COUNT(*) FROM workers WHERE heartbeat_at >= ?", (cutoff,)).fetchone()[0]
+
+
+def record_webhook_status(run_id: str, status: str | None):
+    """Relay a task run status received by this process's webhook receiver to the other processes"""
+    now = datetime.now()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO webhook_statuses (run_id, status, received_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (run_id) DO UPDATE SET status = excluded.status, received_at = excluded.received_at",
+            (run_id, status, now.isoformat(timespec="seconds")),
+        )
+        conn.execute("DELETE FROM webhook_statuses WHERE received_at < ?",
+                     ((now - WEBHOOK_STATUS_TTL).isoformat(timespec="seconds"),))
+
+
+def take_webhook_statuses(run_ids: list[str]) -> dict[str, str | None]:
+    """Remove and return the relayed statuses of these runs, for those that have one"""
+    if not run_ids:
+        return {}
+    placeholders = ", ".join("?" * len(run_ids))
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(f"SELECT run_id, status FROM webhook_statuses WHERE run_id IN ({placeholders})",
+                            run_ids).fetchall()
+        conn.execute(f"DELETE FROM webhook_statuses WHERE run_id IN ({placeholders})", run_ids)
+    return {row["run_id"]: row["status"] for row in rows}
@@ -2,37 +2,60 @@ from pathlib import Path
 from datetime import datetime
 import json
 import asyncio
-from parallel import Parallel
+import logging
+import contextlib
+from parallel import Parallel, AsyncParallel
 import os
-
-from pararell_agents.financial_pararell import create_financial_task, save_financial_result
-from pararell_agents.supply_chain_pararell import create_supply_chain_task, save_supply_chain_result
-from pararell_agents.customers_markets_pararell import create_customers_markets_task, save_customers_markets_result
-from pararell_agents.regulatory_trade_pararell import create_regulatory_trade_task, save_regulatory_trade_result
-
-client = Parallel(api_key=os.getenv("PARALLEL_API_KEY"))
+import shutil
+import time
+import threading
+import concurrent.futures
+import uuid
+
+import job_store
+import result_cache
+import single_flight
+import upstream
+import poll_scheduler
+import hedging
+import scheduler
+import webhooks
+import telemetry
+from source_index import SourceIndex
+# The app-facing helpers live apart from the research stack (see generation_status)
+from generation_status import GENERATION_BUDGET, partial_profile_path
+from pararell_agents import registry
+from pararell_agents.registry import AGENTS
+
+# Retries are handled by upstream (with backoff, rate limiting and a circuit breaker)
+client = Parallel(api_key=os.getenv("PARALLEL_API_KEY"), max_retries=0)
+
+DATA_DIR = Path("data")
+RUNS_DIR = DATA_DIR / "runs"
+
+# Workspaces of finished generations are kept this long (for audit), then pruned
+WORKSPACE_RETENTION_DAYS = float(os.getenv("WORKSPACE_RETENTION_DAYS", 7))
+
+# Cheaper, faster processor used for the first tier of two-tier research
+PREVIEW_PROCESSOR = os.getenv("PREVIEW_PROCESSOR", "base")
+
+MAX_WAIT_TIME = 1800  # 30 minutes
+CANCEL_CHECK_INTERVAL = 1  # How often a running generation checks whether it was abandoned
+
+
+class GenerationCancelled(Exception):
+    """Every caller waiting on a generation abandoned it before its profile was published"""
 
 def collect_sources(data):
     """Collect all sources from the data"""
-    sources = []
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if key == "sources" and isinstance(value, list):
-                sources.extend(value)
-            elif isinstance(value, (dict, list)):
-                sources.extend(collect_sources(value))
-    elif isinstance(data, list):
-        for item in data:
-            if isinstance(item, (dict, list)):
-                sources.extend(collect_sources(item))
-    return sources
-
-def calculate_confidence(data):
+    return SourceIndex.build(data).sources
+
+def calculate_confidence(data, index: SourceIndex | None = None):
     """Calculate overall confidence score"""
     # Simple heuristic: count non-null values
-    sources = collect_sources(data)
-    if sources:
-        return min(len(sources) * 0.1, 1.0)
+    index = index or SourceIndex.build(data)
+    if index.sources:
+        return min(len(index.sources) * 0.1, 1.0)
     return 0.5
 
 def generate_concentration_flags(data):
@@ -41,32 +64,108 @@ def generate_concentration_flags(data):
     # Add logic here to identify concentration risks
     return flags
 
-def assess_data_quality(data):
+def assess_data_quality(data, index: SourceIndex | None = None):
     """Assess data quality"""
-    sources = collect_sources(data)
+    index = index or SourceIndex.build(data)
     return {
         "source_summary": {
-            "tier_1_count": len([s for s in sources if s.get("type") == "10-K"]),
-            "tier_2_count": len([s for s in sources if s.get("type") in ["annual_report", "investor_presentation"]]),
-            "tier_3_count": len([s for s in sources if s.get("type") in ["earnings_call", "press_release"]]),
-            "tier_4_count": len([s for s in sources if s.get("type") == "news"])
+            "tier_1_count": index.tier_count(1),
+            "tier_2_count": index.tier_count(2),
+            "tier_3_count": index.tier_count(3),
+            "tier_4_count": index.tier_count(4)
         },
         "data_gaps": [],
         "stale_data_warnings": []
     }
 
-def merge_sectors_data():
-    files = ["financial.json", "supply_chain.json", "customers_markets.json", "regulatory_trade.json"]
-    merged_data = {}
-    
-    for file in files:
+def prune_run_workspaces():
+    """Delete the workspaces of generations that are no longer running and untouched for WORKSPACE_RETENTION_DAYS"""
+    if not RUNS_DIR.exists():
+        return
+    cutoff = time.time() - WORKSPACE_RETENTION_DAYS * 86400
+    running = job_store.running_generation_ids()
+    for workspace in RUNS_DIR.iterdir():
         try:
-            with open(f'data/{file}', 'r') as f:
-                file_data = json.load(f)
-                merged_data.update(file_data)
-        except FileNotFoundError:
-            print(f"Warning: {file} not found, skipping...")
+            if workspace.is_dir() and workspace.name not in running and workspace.stat().st_mtime < cutoff:
+                shutil.rmtree(workspace)
+                telemetry.log("workspace_pruned", workspace=str(workspace))
+        except OSError as e:
+            # E.g. pruned by another process meanwhile
+            telemetry.log("workspace_prune_failed", logging.DEBUG, workspace=str(workspace), error=str(e))
+
+def create_run_workspace(run_id: str | None = None) -> Path:
+    """Create an isolated directory for one generation run's sector files, pruning expired ones"""
+    if run_id is None:
+        prune_run_workspaces()
+        run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    workspace = RUNS_DIR / run_id
+    workspace.mkdir(parents=True, exist_ok=True)
+    return workspace
+
+def write_json_atomic(path: Path, data):
+    """Write JSON so readers only ever see the previous or the complete new file"""
+    # The temp file sits next to the target so os.replace stays on one filesystem
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+def publish_profile(profile, ticker: str) -> Path:
+    """Atomically publish a profile as data/<TICKER>_profile.json"""
+    DATA_DIR.mkdir(exist_ok=True)
+    target = DATA_DIR / f"{ticker}_profile.json"
+    write_json_atomic(target, profile)
+    return target
+
+def publish_partial_profile(workspace: Path, sector_data: dict, sector_status: dict, section_tiers: dict | None = None):
+    """Re-merge whatever sectors have landed and publish the result into the workspace"""
+    profile, _, _ = merge_sectors_data(sector_data, sector_status, section_tiers)
+    write_json_atomic(partial_profile_path(workspace), profile)
+    return profile
+
+def load_sector_data(workspace: Path) -> dict:
+    """Read the sector outputs archived in a workspace, by agent name"""
+    sector_data = {}
+    for agent in AGENTS:
+        content = registry.load_result(agent, workspace)
+        if content is None:
+            telemetry.log("sector_archive_missing", logging.WARNING, agent=agent["name"], workspace=str(workspace))
+        else:
+            sector_data[agent["name"]] = content
+    return sector_data
+
+def merge_sectors_data(sector_data: dict, sector_status: dict | None = None, section_tiers: dict | None = None):
+    """
+    Merge sector outputs (parsed agent results, by agent name) into a profile.
+    sector_status maps each agent to "pending", "late", "preview", "completed"
+    or "failed"; when omitted it is derived from which sectors have data. It
+    is recorded in meta so the dashboard can show placeholders for sectors
+    that have not landed yet. section_tiers records which research tier each
+    sector's data came from.
+
+    Each sector contributes only the keys it declares, and keeps its own
+    sources: they are stored once, deduplicated, in the profile's "sources"
+    table, and each section lists the ids of the sources it cites.
+    """
+    merged_data = {}
+    ordered_sectors = {}
+    for agent in AGENTS:
+        content = sector_data.get(agent["name"])
+        if content is None:
             continue
+        ordered_sectors[agent["name"]] = content
+        for key in (*agent["top_level_keys"], *agent["output_keys"]):
+            if key in content:
+                merged_data[key] = content[key]
+    # Every source consumer below reads from this one traversal
+    sources = SourceIndex.build(ordered_sectors, {name: name for name in ordered_sectors})
+
+    if sector_status is None:
+        sector_status = {agent["name"]: "completed" if agent["name"] in sector_data else "failed" for agent in AGENTS}
     
     company_name = merged_data.get("company_overview", {}).get("name", "Unknown Company")
     ticker = merged_data.get("company_overview", {}).get("ticker", "UNKNOWN")
@@ -76,140 +175,739 @@ def merge_sectors_data():
             "ticker": ticker,
             "extraction_date": datetime.now().strftime("%Y-%m-%d"),
             "baseline_fiscal_year": merged_data.get("financial_baseline", {}).get("fiscal_year"),
-            "data_freshness_note": f"Compiled from {len(files)} data sources",
-            "confidence_overall": calculate_confidence(merged_data),
-            "primary_sources": [s.get("name", "") for s in collect_sources(merged_data)[:10]]
-        },
-
-        "company_overview": merged_data.get("company_overview", {}),
-
-        "financial": {
-            "business_segments": merged_data.get("business_segments", []),
-            "revenue_by_region": merged_data.get("revenue_by_region", []),
-            "financial_baseline": merged_data.get("financial_baseline", []),
-            "sources": merged_data.get("sources", [])
-        },
-
-        "supply_chain": {
-            "company_owned_facilities": merged_data.get("company_owned_facilities", []),
-            "contract_manufacturers": merged_data.get("contract_manufacturers", []),
-            "critical_suppliers": merged_data.get("critical_suppliers", []),
-            "supplier_concentration": merged_data.get("supplier_concentration", {}),
-            "supply_corridors": merged_data.get("supply_corridors", []),
-            "supply_chain_initiatives": merged_data.get("supply_chain_initiatives", []),
-            "sources": merged_data.get("sources", [])
+            "data_freshness_note": f"Compiled from {len(AGENTS)} data sources",
+            "confidence_overall": calculate_confidence(merged_data, sources),
+            "primary_sources": [s.get("name", "") for s in sources.sources[:10]],
+            # Copies: the caller keeps updating its dicts after the profile is published
+            "sector_status": dict(sector_status),
+            "section_tiers": dict(section_tiers or {}),
+            "complete": all(status in ("completed", "failed") for status in sector_status.values())
         },
+    }
 
-        "customer_profile": {
-            "segment_mix": merged_data.get("segment_mix", []),
-            "customer_concentration": merged_data.get("customer_concentration", {}),
-            "top_customers": merged_data.get("top_customers", []),
-            "industry_exposure": merged_data.get("industry_exposure", []),
-            "customer_characteristics": merged_data.get("customer_characteristics", []),
-            "sources": merged_data.get("sources", [])
-        },
+    # Each agent's output keys land in its profile section (or at the top level)
+    for agent in AGENTS:
+        for key, default in agent["top_level_keys"].items():
+            profile[key] = merged_data.get(key, default)
+    for agent in AGENTS:
+        section = profile.setdefault(agent["profile_section"], {})
+        for key, default in agent["output_keys"].items():
+            section[key] = merged_data.get(key, default)
+        section["sources"] = sources.cited_by(agent["name"])
 
-        "regulatory_footprint": {
-            "policy_constraints": merged_data.get("policy_constraints", []),
-            "regional_demand_signals": merged_data.get("regional_demand_signals", []),
-            "competitor_factual_moves": merged_data.get("competitor_factual_moves", []),
-            "factual_actions": merged_data.get("factual_actions", []),
-            "sources": merged_data.get("sources", [])
-        },
+    # profile["strategic_initiatives"] = merged_data.get("strategic_initiatives", [])
 
-        # "strategic_initiatives": merged_data.get("strategic_initiatives", []),
+    # profile["concentration_flags"] = generate_concentration_flags(merged_data)
 
-        # "concentration_flags": generate_concentration_flags(merged_data),
-
-        "data_quality": assess_data_quality(merged_data)
-    }
+    profile["data_quality"] = assess_data_quality(merged_data, sources)
+    profile["sources"] = sources.table()
 
     return profile, company_name, ticker
 
-def merge_sectors_data_for_company():
+def merge_sectors_data_for_company(sector_data: dict, sector_status: dict | None = None, section_tiers: dict | None = None):
     try:
-        sectors_data, company_name, ticker = merge_sectors_data()
-        with open(f'data/{ticker}_profile.json', 'w') as f:
-            json.dump(sectors_data, f, indent=4)
-        print(f"Successfully merged data for {company_name} into {company_name}_profile.json")
+        sectors_data, company_name, ticker = merge_sectors_data(sector_data, sector_status, section_tiers)
+        profile_path = publish_profile(sectors_data, ticker)
+        telemetry.log("profile_merged", company=company_name, path=str(profile_path))
         return sectors_data, ticker
     except Exception as e:
-        print(f"Error merging sectors data: {e}")
-        import traceback
-        traceback.print_exc()
+        telemetry.log("merge_failed", logging.ERROR, exc_info=True, error=str(e))
         return None, None
 
-async def run_all_agents(client: Parallel, company: str):
+async def wait_for_task_run(async_client: AsyncParallel, name: str, run_id: str,
+                            max_wait_time: float = MAX_WAIT_TIME,
+                            schedule: poll_scheduler.PollSchedule | None = None):
     """
-    Run all agents in parallel using Option 2:
-    1. Create all tasks first (fast, sync) - tasks start running on Parallel API immediately
-    2. Poll all results in parallel using asyncio.to_thread
+    Wait for a task run to complete and return its result, or None on timeout.
+
+    Status checks go through the native async client, so waiting on a run never
+    occupies a thread; the (potentially blocking) result endpoint is only hit once
+    the run reports "completed". Polls share the upstream rate limit; while the
+    API is degraded the run keeps going remotely, so we keep waiting for it.
+
+    Polls follow schedule (learned from past runs of the same agent). With
+    webhooks enabled we sleep until the run's webhook arrives instead, polling
+    only as a safety net.
     """
-    # Ensure data directory exists
-    Path("data").mkdir(exist_ok=True)
+    schedule = schedule or poll_scheduler.PollSchedule([])
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    polls = 0
+
+    with webhooks.watching(run_id) if webhooks.enabled() else contextlib.nullcontext():
+        while True:
+            try:
+                task_run = await upstream.call_async(upstream.polls, async_client.task_run.retrieve, run_id)
+                polls += 1
+                if task_run.status == "completed":
+                    telemetry.log("run_result_received", agent=name, run_id=run_id, polls=polls)
+                    return await upstream.call_async(upstream.polls, async_client.task_run.result, run_id)
+            except (upstream.CircuitOpenError, *upstream.TRANSIENT_ERRORS) as e:
+                elapsed = loop.time() - started
+                if elapsed >= max_wait_time:
+                    raise
+                telemetry.log("api_unavailable", logging.WARNING, agent=name, run_id=run_id, error=str(e))
+                await asyncio.sleep(max(poll_scheduler.MIN_POLL_INTERVAL, getattr(e, "retry_in", 0)))
+                continue
+            elapsed = loop.time() - started
+
+            if task_run.status in ("failed", "cancelled"):
+                raise RuntimeError(f"Task run {run_id} ended with status '{task_run.status}'")
+            if elapsed >= max_wait_time:
+                telemetry.log("run_timed_out", logging.WARNING, agent=name, run_id=run_id, elapsed=round(elapsed))
+                return None
+
+            delay = min(schedule.next_delay(elapsed, polls), max_wait_time - elapsed)
+            if webhooks.enabled():
+                telemetry.log("run_waiting", logging.DEBUG, agent=name, run_id=run_id, elapsed=round(elapsed),
+                              status=task_run.status, via="webhook")
+                timeout = min(max(delay, webhooks.FALLBACK_POLL_INTERVAL), max_wait_time - elapsed)
+                await webhooks.wait_for_status(run_id, timeout)
+            else:
+                telemetry.log("run_waiting", logging.DEBUG, agent=name, run_id=run_id, elapsed=round(elapsed),
+                              status=task_run.status, next_check=round(delay, 1))
+                await asyncio.sleep(delay)
+
+# Sector files are only written for audit and crash recovery, so they are
+# written off the event loop, one at a time (in order) per process
+_archive_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="sector-archive")
+
+class SectorArchive:
+    """Persists agent outputs to a workspace in the background, in the order they were saved"""
+
+    def __init__(self, workspace: Path):
+        self.workspace = workspace
+        self._last_write = None
+
+    def save(self, agent: dict, content: dict):
+        self._last_write = _archive_executor.submit(self._write, agent, content)
+
+    def _write(self, agent: dict, content: dict):
+        # Atomic, so a crash mid-write never leaves a truncated archive to resume from
+        try:
+            write_json_atomic(registry.result_path(agent, self.workspace), content)
+            telemetry.log("sector_archived", logging.DEBUG, agent=agent["name"], workspace=str(self.workspace))
+        except Exception as e:
+            telemetry.log("sector_archive_failed", logging.ERROR, agent=agent["name"], error=str(e))
 
-    print("Creating all tasks...")
+    async def flush(self):
+        """Wait until everything saved so far is on disk"""
+        if self._last_write is not None:
+            await asyncio.wrap_future(self._last_write)
 
-    # Step 1: Create all tasks (these start immediately on the Parallel API)
-    tasks = [
-        ("financial", create_financial_task(client, company), save_financial_result),
-        ("supply_chain", create_supply_chain_task(client, company), save_supply_chain_result),
-        ("customers_markets", create_customers_markets_task(client, company), save_customers_markets_result),
-        ("regulatory_trade", create_regulatory_trade_task(client, company), save_regulatory_trade_result),
-    ]
+def agent_cache_key(agent: dict, company: str, processor: str) -> str:
+    """Result cache key for one agent's output on one company with one processor"""
+    return result_cache.cache_key(company, agent["name"], agent["prompt"], agent["task_spec"], processor)
 
-    print(f"All {len(tasks)} tasks created. Waiting for results in parallel...")
+async def cancel_task_run(async_client: AsyncParallel, name: str, run_id: str):
+    """
+    Best-effort cancellation of a remote task run. The Parallel SDK has no
+    task run cancel endpoint yet, in which case we just stop polling the run.
+    """
+    cancel = getattr(async_client.task_run, "cancel", None)
+    if cancel is None:
+        # Task runs cannot be cancelled through the API
+        telemetry.log("run_abandoned", agent=name, run_id=run_id)
+        return
+    try:
+        await cancel(run_id)
+        telemetry.log("run_cancelled", agent=name, run_id=run_id)
+    except Exception as e:
+        telemetry.log("run_cancel_failed", logging.WARNING, agent=name, run_id=run_id, error=str(e))
+
+async def _take_free_slot(semaphore: asyncio.Semaphore | None) -> bool:
+    """Take a slot of the caller's semaphore if one is free right now (always true without one)"""
+    if semaphore is None:
+        return True
+    if semaphore.locked():
+        return False
+    await semaphore.acquire()  # free, so this doesn't wait
+    return True
+
+async def wait_for_task_run_hedged(async_client: AsyncParallel, name: str, run_id: str, created_at: float,
+                                   schedule: poll_scheduler.PollSchedule, create_hedge,
+                                   hedge: tuple[str, float] | None = None,
+                                   semaphore: asyncio.Semaphore | None = None):
+    """
+    Wait for a task run like wait_for_task_run, hedging it if it straggles.
 
-    # Step 2: Poll all results in parallel using asyncio.to_thread
-    async def get_and_save_result(name: str, task_run, save_func) -> bool:
-        try:
-            print(f"[{name}] Waiting for result (run_id: {task_run.run_id})...")
-
-            # Poll with timeout to keep Streamlit alive
-            max_wait_time = 1800  # 10 minutes
-            poll_interval = 5  # Check every 5 seconds
-            elapsed = 0
-
-            while elapsed < max_wait_time:
-                try:
-                    # Try to get result with short timeout
-                    result = await asyncio.wait_for(
-                        asyncio.to_thread(client.task_run.result, task_run.run_id),
-                        timeout=poll_interval
-                    )
-                    print(f"[{name}] Result received!")
-                    return save_func(result)
-                except asyncio.TimeoutError:
-                    # Still waiting, keep Streamlit alive
-                    elapsed += poll_interval
-                    print(f"[{name}] Still waiting... ({elapsed}s elapsed)")
-                    await asyncio.sleep(0.1)  # Brief pause
+    Once the run is older than hedging.HEDGE_PERCENTILE of past runs (and the
+    hedge budget allows), await create_hedge() submits a duplicate run and
+    whichever of the two completes first wins; the other is cancelled. If one
+    of them fails or times out, the other is still waited for.
 
-        except Exception as e:
-            print(f"[{name}] Error: {e}")
+    A hedge is an extra run in flight, so with a semaphore (the caller holds
+    one slot for the original run) it also takes a slot for as long as it
+    runs, and is only submitted if one is free. hedge is the (run_id,
+    created_at) of a hedge submitted before a crash: it is raced again if a
+    slot is free, and cancelled otherwise.
+
+    Returns (result, created_at of the run that produced it), result being
+    None on timeout.
+    """
+    primary = asyncio.create_task(wait_for_task_run(async_client, name, run_id, schedule=schedule))
+    runs = {primary: (run_id, created_at)}
+    hedge_slot = False
+    try:
+        if hedge is not None:
+            hedge_slot = await _take_free_slot(semaphore)
+            if not hedge_slot:
+                telemetry.log("hedge_dropped", agent=name, run_id=hedge[0], reason="no free slot")
+                await cancel_task_run(async_client, name, hedge[0])
+                return await primary, created_at
+            telemetry.log("hedge_reattached", agent=name, run_id=hedge[0])
+            hedge_run_id, hedge_created_at = hedge
+        else:
+            hedge_after = hedging.hedge_after(schedule.durations)
+            if hedge_after is not None:
+                await asyncio.wait({primary}, timeout=max(0, hedge_after - (time.time() - created_at)))
+            if primary.done() or hedge_after is None:
+                return await primary, created_at
+            # The slot is checked first so a hedge that can't run doesn't use up the budget
+            hedge_slot = await _take_free_slot(semaphore)
+            if not hedge_slot or not hedging.budget.try_hedge():
+                return await primary, created_at
+
+            telemetry.log("hedge_submitting", agent=name, run_id=run_id, after=round(hedge_after),
+                          percentile=hedging.HEDGE_PERCENTILE)
+            try:
+                hedge_run_id = (await create_hedge()).run_id
+            except Exception as e:
+                telemetry.log("hedge_failed", logging.WARNING, agent=name, error=str(e))
+                return await primary, created_at
+            hedge_created_at = time.time()
+        hedge_task = asyncio.create_task(
+            wait_for_task_run(async_client, f"{name}/hedge", hedge_run_id, schedule=schedule))
+        runs[hedge_task] = (hedge_run_id, hedge_created_at)
+
+        pending = set(runs)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and task.result() is not None:
+                    winner_id, winner_created_at = runs[task]
+                    for loser in pending:
+                        loser.cancel()
+                        await cancel_task_run(async_client, name, runs[loser][0])
+                    telemetry.log("hedge_race_won", agent=name, run_id=winner_id, winner="hedge" if task is hedge_task else "original")
+                    return task.result(), winner_created_at
+        # Neither run produced a result: report the original run's outcome
+        return primary.result(), created_at
+    except asyncio.CancelledError:
+        # The caller cancels the original run; the hedge is ours to clean up
+        for task, (task_run_id, _) in runs.items():
+            task.cancel()
+            if task is not primary and not task.done():
+                await cancel_task_run(async_client, name, task_run_id)
+        raise
+    finally:
+        if hedge_slot and semaphore is not None:
+            semaphore.release()
+
+async def run_all_agents(client: Parallel, company: str, workspace: Path,
+                         async_client: AsyncParallel | None = None,
+                         semaphore: asyncio.Semaphore | None = None,
+                         use_cache: bool = True,
+                         two_tier: bool = False,
+                         on_agent_done=None):
+    """
+    Run all agents in parallel:
+    1. Create each task with the async client - it starts running on the Parallel API immediately
+    2. Poll all runs concurrently with the async client - no threads are parked while waiting,
+       including for rate limits and retry backoff
+
+    Every run_id is recorded in the job store under the workspace's generation id;
+    agents that already have a run there (after a crash) are reattached instead
+    of being created again.
+
+    Agent outputs are stored in the result cache; with use_cache, an agent whose
+    output is cached (and still within its sector TTL) skips its task run.
+
+    With two_tier, each agent also runs on PREVIEW_PROCESSOR alongside its own
+    processor. The preview result is saved as soon as it lands and is replaced
+    when the full run completes (or kept if the full run fails).
+
+    With HEDGE_PERCENTILE set, runs that straggle past that percentile of their
+    agent's past latencies are hedged with a duplicate run (see hedging), as
+    long as the semaphore has a slot free for it. Hedges are recorded as
+    "<agent>:hedge" and raced again (or cancelled) when resuming.
+
+    on_agent_done(name, status, tier, content) is called as soon as an agent has
+    data, so callers can merge a partial profile in memory without waiting for
+    the slowest agent. status is "preview" when a preview landed and the full
+    run is still going, then "completed" or "failed" once the agent is done;
+    content is the agent's parsed output (None if it failed) and tier
+    describes it ({"tier": "preview" | "full", "processor": ...}). Outputs are
+    also archived to <name>.json in the workspace, in the background.
+
+    Batch callers pass a shared async_client and a semaphore that caps how many
+    agent runs are in flight across all companies at once.
+
+    Cancelling this coroutine stops all polling, cancels the remote runs where
+    the API allows and records them as "cancelled" in the job store.
+    """
+    generation_id = workspace.name
+    existing_runs = job_store.get_agent_runs(generation_id)
+
+    archive = SectorArchive(workspace)
+
+    def report(name: str, status: str, tier: dict | None, content: dict | None = None):
+        if on_agent_done is not None:
+            on_agent_done(name, status, tier, content)
+
+    def tier_label(agent: dict, processor: str, job_key: str) -> str:
+        return agent["name"] if job_key == agent["name"] else f"{agent['name']}/{processor}"
+
+    def cached_tier(agent: dict, processor: str, job_key: str):
+        """The cached output of one agent on one processor (recorded as completed), or None"""
+        if not use_cache:
+            return None
+        cached = result_cache.lookup(agent["name"], agent_cache_key(agent, company, processor), agent["cache_ttl"])
+        if cached is not None:
+            telemetry.log("result_cache_hit", agent=tier_label(agent, processor, job_key))
+            job_store.record_agent_run(generation_id, job_key, None, "completed")
+        return cached
+
+    async def create_run(async_client: AsyncParallel, agent: dict, processor: str, job_key: str):
+        """
+        Create a task run and record it as running. A create call can't be
+        taken back once sent, so if we are cancelled meanwhile the run is still
+        waited for, recorded and cancelled rather than left running unseen.
+        """
+        webhook = webhooks.webhook_param() if webhooks.enabled() else None
+        create = asyncio.ensure_future(upstream.call_async(upstream.creates, registry.create_task,
+                                                           async_client, agent, company, processor, webhook))
+        try:
+            task_run = await asyncio.shield(create)
+        except asyncio.CancelledError:
+            while not create.done():
+                # Repeated cancellations (e.g. of the agent, then of this tier) must not cut this short
+                with contextlib.suppress(asyncio.CancelledError):
+                    await asyncio.wait({create})
+            if not create.cancelled() and create.exception() is None:
+                run_id = create.result().run_id
+                job_store.record_agent_run(generation_id, job_key, run_id, "running")
+                await cancel_task_run(async_client, tier_label(agent, processor, job_key), run_id)
+            raise
+        job_store.record_agent_run(generation_id, job_key, task_run.run_id, "running")
+        return task_run
+
+    async def run_tier(async_client: AsyncParallel, agent: dict, processor: str, job_key: str):
+        """Run one agent on one processor (whose cache was checked) and return its output content, or None"""
+        name = agent["name"]
+        label = tier_label(agent, processor, job_key)
+        key = agent_cache_key(agent, company, processor)
+
+        existing = existing_runs.get(job_key)
+        existing_hedge = existing_runs.get(f"{job_key}:hedge")
+        run_id = None
+        hedge_run_ids = []
+
+        def record(status: str):
+            job_store.record_agent_run(generation_id, job_key, None, status)
+            for hedge_run_id in hedge_run_ids:
+                job_store.record_agent_run(generation_id, f"{job_key}:hedge", hedge_run_id, status)
+
+        async with semaphore or contextlib.nullcontext():
+            try:
+                hedge = None
+                if existing and existing["run_id"] and existing["status"] != "failed":
+                    run_id = existing["run_id"]
+                    created_at = datetime.fromisoformat(existing["created_at"]).timestamp()
+                    telemetry.log("run_reattached", agent=label, run_id=run_id)
+                    if existing_hedge and existing_hedge["run_id"] and existing_hedge["status"] == "running":
+                        hedge = (existing_hedge["run_id"],
+                                 datetime.fromisoformat(existing_hedge["created_at"]).timestamp())
+                        hedge_run_ids.append(existing_hedge["run_id"])
+                else:
+                    if existing_hedge and existing_hedge["run_id"] and existing_hedge["status"] == "running":
+                        # Hedged a run that is being replaced, so the hedge isn't waited for either
+                        await cancel_task_run(async_client, label, existing_hedge["run_id"])
+                        job_store.record_agent_run(generation_id, f"{job_key}:hedge", None, "cancelled")
+                    run_id = (await create_run(async_client, agent, processor, job_key)).run_id
+                    created_at = time.time()
+                    hedging.budget.record_run()
+                    telemetry.log("run_created", agent=label, run_id=run_id)
+
+                async def create_hedge():
+                    task_run = await create_run(async_client, agent, processor, f"{job_key}:hedge")
+                    hedge_run_ids.append(task_run.run_id)
+                    return task_run
+
+                schedule = poll_scheduler.schedule_for(name, processor)
+                result, created_at = await wait_for_task_run_hedged(async_client, label, run_id, created_at,
+                                                                    schedule, create_hedge, hedge, semaphore)
+                if result is None:
+                    telemetry.record_timing(f"agent:{name}", time.time() - created_at,
+                                            processor=processor, status="timed_out")
+                    record("timed_out")
+                    return None
+                job_store.record_run_latency(name, processor, time.time() - created_at)
+                telemetry.record_timing(f"agent:{name}", time.time() - created_at,
+                                        processor=processor, status="completed")
+                result_cache.store(name, key, result.output.content)
+                record("completed")
+                return result.output.content
+            except asyncio.CancelledError:
+                if run_id is not None:
+                    await cancel_task_run(async_client, label, run_id)
+                record("cancelled")
+                raise
+            except Exception as e:
+                telemetry.log("agent_failed", logging.ERROR, exc_info=True, agent=label, run_id=run_id, error=str(e))
+                record("failed")
+                return None
+
+    async def run_agent(async_client: AsyncParallel, agent: dict) -> bool:
+        name = agent["name"]
+        full_tier = {"tier": "full", "processor": agent["processor"]}
+        preview_tier = {"tier": "preview", "processor": PREVIEW_PROCESSOR}
+
+        existing = existing_runs.get(name)
+        if existing and existing["status"] == "completed":
+            content = registry.load_result(agent, workspace)
+            if content is not None:
+                telemetry.log("agent_already_completed", agent=name, workspace=str(workspace))
+                report(name, "completed", full_tier, content)
+                return True
+
+        content = cached_tier(agent, agent["processor"], name)
+        if content is not None:
+            archive.save(agent, content)
+            report(name, "completed", full_tier, content)
+            return True
+
+        tier_runs = []
+        try:
+            full_run = asyncio.create_task(run_tier(async_client, agent, agent["processor"], name))
+            tier_runs.append(full_run)
+            preview_content = None
+
+            # A full run that already completed (before a crash) is only
+            # fetched, so a preview would be paid for and thrown away
+            full_done = existing is not None and existing["status"] == "completed"
+            if two_tier and PREVIEW_PROCESSOR != agent["processor"] and not full_done:
+                preview_key = f"{name}:preview"
+                existing_preview = existing_runs.get(preview_key)
+                if existing_preview and existing_preview["status"] == "completed":
+                    preview_content = registry.load_result(agent, workspace)
+                if preview_content is None:
+                    preview_content = cached_tier(agent, PREVIEW_PROCESSOR, preview_key)
+                if preview_content is not None:
+                    report(name, "preview", preview_tier, preview_content)
+                else:
+                    preview_run = asyncio.create_task(run_tier(async_client, agent, PREVIEW_PROCESSOR, preview_key))
+                    tier_runs.append(preview_run)
+                    await asyncio.wait({preview_run, full_run}, return_when=asyncio.FIRST_COMPLETED)
+                    if full_run.done() and full_run.result() is not None:
+                        # The full result landed first, so the preview is no longer useful
+                        preview_run.cancel()
+                        await asyncio.gather(preview_run, return_exceptions=True)
+                    else:
+                        preview_content = await preview_run
+                        if preview_content is not None:
+                            archive.save(agent, preview_content)
+                            telemetry.log("preview_landed", agent=name, processor=agent["processor"])
+                            report(name, "preview", preview_tier, preview_content)
+
+            content = await full_run
+            if content is not None:
+                archive.save(agent, content)
+                report(name, "completed", full_tier, content)
+                return True
+            if preview_content is not None:
+                telemetry.log("full_run_failed_keeping_preview", logging.WARNING, agent=name)
+                report(name, "completed", preview_tier, preview_content)
+                return True
+            report(name, "failed", None)
             return False
+        except asyncio.CancelledError:
+            # Tier runs are separate tasks, so stop them explicitly and let
+            # them cancel their remote runs before giving up
+            for tier_run in tier_runs:
+                tier_run.cancel()
+            await asyncio.gather(*tier_runs, return_exceptions=True)
+            raise
+
+    async def gather_agents(async_client: AsyncParallel):
+        telemetry.log("agents_starting", company=company, agents=len(AGENTS), two_tier=two_tier)
+        agent_runs = [asyncio.ensure_future(run_agent(async_client, agent)) for agent in AGENTS]
+        try:
+            return await asyncio.gather(*agent_runs)
+        except BaseException:
+            # gather gives up as soon as one agent is cancelled (or fails); the
+            # others still have runs to record and cancel
+            for agent_run in agent_runs:
+                agent_run.cancel()
+            await asyncio.gather(*agent_runs, return_exceptions=True)
+            raise
+        finally:
+            await archive.flush()
+
+    if async_client is not None:
+        return await gather_agents(async_client)
+    async with AsyncParallel(api_key=client.api_key, max_retries=0) as async_client:
+        return await gather_agents(async_client)
+
+async def keep_generation_alive(generation_id: str):
+    """Heartbeat the job store so other processes don't treat this generation as orphaned"""
+    while True:
+        await asyncio.sleep(job_store.HEARTBEAT_INTERVAL)
+        job_store.heartbeat(generation_id)
+
+async def run_generation(company: str, workspace: Path, async_client: AsyncParallel | None = None,
+                         semaphore: asyncio.Semaphore | None = None, use_cache: bool = True,
+                         two_tier: bool = False, budget: float | None = GENERATION_BUDGET,
+                         on_published=None, cancelled=None):
+    """
+    Run (or finish) the agents of one generation and publish the merged profile.
+    Sector outputs are kept in memory as they land, and a partial profile is
+    re-merged from them into the workspace each time a sector lands (or, with
+    two_tier, is upgraded from its preview to its full result).
+
+    Each agent has a deadline: its deadline_seconds, capped by budget. A sector
+    with no data by then is flagged "late", and once every sector has landed or
+    passed its deadline the profile is published as an explicitly partial one
+    and on_published(profile, ticker) is called. Late agents keep running and
+    re-publish the profile as they land instead of being discarded.
+
+    If cancelled() turns true before the profile is published, the agents are
+    stopped, the generation is recorded as cancelled and GenerationCancelled
+    is raised. A published profile is always finished.
+    """
+    sector_status = {agent["name"]: "pending" for agent in AGENTS}
+    section_tiers = {}
+    sector_data = {}
+    past_deadline = set()
+    published = False
+
+    def publish_profile_early():
+        """Publish the profile to data/ before all agents are done, if it can be"""
+        nonlocal published
+        profile, _, ticker = merge_sectors_data(sector_data, sector_status, section_tiers)
+        if ticker == "UNKNOWN":
+            # Without the company overview there is no ticker to publish under yet
+            return
+        publish_profile(profile, ticker)
+        if not published:
+            published = True
+            # Lets requests in other processes pick up the profile while it is upgraded
+            job_store.mark_generation_published(workspace.name, ticker)
+            late = [name for name, status in sector_status.items() if status == "late"]
+            telemetry.log("partial_profile_published", ticker=ticker, late=late)
+            if on_published is not None:
+                on_published(profile, ticker)
+        else:
+            telemetry.log("published_profile_upgraded", ticker=ticker)
+
+    def all_due():
+        return all(name in past_deadline or status in ("completed", "failed")
+                   for name, status in sector_status.items())
+
+    def on_agent_done(name: str, status: str, tier: dict | None, content: dict | None):
+        sector_status[name] = status
+        if tier is not None:
+            section_tiers[name] = tier
+        if content is not None:
+            sector_data[name] = content
+        publish_partial_profile(workspace, sector_data, sector_status, section_tiers)
+        done = sum(status not in ("pending", "late") for status in sector_status.values())
+        telemetry.log("partial_profile_written", logging.DEBUG, generation_id=workspace.name, sectors_done=done,
+                      sectors=len(sector_status))
+        if (published or past_deadline) and all_due() and not all(
+                status in ("completed", "failed") for status in sector_status.values()):
+            publish_profile_early()
+
+    def on_deadline(name: str):
+        past_deadline.add(name)
+        if sector_status[name] == "pending":
+            sector_status[name] = "late"
+            telemetry.log("agent_deadline_missed", agent=name, generation_id=workspace.name)
+            publish_partial_profile(workspace, sector_data, sector_status, section_tiers)
+        if not published and all_due():
+            publish_profile_early()
+
+    loop = asyncio.get_running_loop()
+    deadline_handles = []
+    for agent in AGENTS:
+        deadlines = [d for d in (agent["deadline_seconds"], budget) if d is not None]
+        if deadlines:
+            deadline_handles.append(loop.call_later(min(deadlines), on_deadline, agent["name"]))
+
+    async def cancel_when_abandoned(agents_task: asyncio.Task):
+        while not published:
+            if cancelled():
+                telemetry.log("generation_abandoned", generation_id=workspace.name, company=company)
+                agents_task.cancel()
+                return
+            await asyncio.sleep(CANCEL_CHECK_INTERVAL)
+
+    heartbeat_task = asyncio.create_task(keep_generation_alive(workspace.name))
+    agents_task = asyncio.create_task(run_all_agents(
+        client, company, workspace, async_client=async_client, semaphore=semaphore,
+        use_cache=use_cache, two_tier=two_tier, on_agent_done=on_agent_done,
+    ))
+    watcher_task = asyncio.create_task(cancel_when_abandoned(agents_task)) if cancelled is not None else None
+    try:
+        results = await agents_task
+    except asyncio.CancelledError:
+        if not agents_task.cancelled():
+            raise
+        job_store.finish_generation(workspace.name, "cancelled")
+        raise GenerationCancelled(f"Generation for {company} was cancelled")
+    except Exception:
+        # Left running, the generation would be reclaimed (and likely fail the same way) forever
+        job_store.finish_generation(workspace.name, "failed")
+        raise
+    finally:
+        heartbeat_task.cancel()
+        if watcher_task is not None:
+            watcher_task.cancel()
+        for handle in deadline_handles:
+            handle.cancel()
+
+    telemetry.log("agents_finished", logging.DEBUG, generation_id=workspace.name, results=results)
+    failed = [agent["name"] for agent, success in zip(AGENTS, results) if not success]
+    telemetry.log("agents_completed", logging.WARNING if failed else logging.INFO, generation_id=workspace.name,
+                  completed=sum(results), agents=len(results), failed=failed)
+
+    profile, ticker = merge_sectors_data_for_company(sector_data, sector_status, section_tiers)
+    job_store.finish_generation(workspace.name, "completed" if ticker else "failed", ticker)
+    return profile, ticker
+
+def claim_orphaned_generation(company: str | None = None):
+    """Take over the oldest orphaned generation (for one company, or any), returning it or None"""
+    for generation in job_store.find_orphaned_generations(company):
+        if job_store.claim_generation(generation):
+            telemetry.log("generation_reclaimed", generation_id=generation["generation_id"], company=generation["company"])
+            return generation
+    return None
+
+async def generate_profile(company: str, async_client: AsyncParallel | None = None,
+                           semaphore: asyncio.Semaphore | None = None, use_cache: bool = True,
+                           two_tier: bool = False, budget: float | None = GENERATION_BUDGET,
+                           on_published=None, cancelled=None, tenant: str | None = None):
+    """
+    Generate a profile for one company, resuming an orphaned generation for it
+    if one exists. New generations first wait for a slot from the scheduler
+    (queued as tenant, in the caller's upstream priority class).
+    """
+    generation = claim_orphaned_generation(company)
+    if generation is not None:
+        # Its agent runs are already paid for, so it does not queue again
+        workspace = Path(generation["workspace"])
+        return await run_generation(company, workspace, async_client=async_client, semaphore=semaphore,
+                                    use_cache=use_cache, two_tier=two_tier, budget=budget,
+                                    on_published=on_published, cancelled=cancelled)
 
-    results = await asyncio.gather(*[
-        get_and_save_result(name, task_run, save_func)
-        for name, task_run, save_func in tasks
-    ])
+    try:
+        async with scheduler.admission(company, tenant, cancelled):
+            # Each run writes its sector files to its own workspace so concurrent
+            # generations never read each other's partial results
+            workspace = create_run_workspace()
+            job_store.create_generation(workspace.name, company, workspace)
+            telemetry.log("generation_started", generation_id=workspace.name, company=company)
+            return await run_generation(company, workspace, async_client=async_client, semaphore=semaphore,
+                                        use_cache=use_cache, two_tier=two_tier, budget=budget,
+                                        on_published=on_published, cancelled=cancelled)
+    except scheduler.AdmissionCancelled as e:
+        raise GenerationCancelled(str(e)) from e
+
+# Profiles published at their deadline whose late agents are still running in
+# this process, by normalized company
+_upgrading = {}
+_upgrading_lock = threading.Lock()
+
+def generate_until_published(company: str, two_tier: bool, budget: float | None, cancelled=None,
+                             tenant: str | None = None):
+    """
+    Run a generation on its own event loop thread and return (profile, ticker)
+    as soon as the profile is published - complete, or partial at the
+    deadline. In the latter case the thread keeps running to upgrade the
+    published profile with the late agents.
+    """
+    key = job_store.normalize_company(company)
+    published = concurrent.futures.Future()
 
-    return results
+    def on_published(profile, ticker):
+        with _upgrading_lock:
+            _upgrading[key] = (profile, ticker)
+        published.set_result((profile, ticker))
 
-def pull_data_for_company(company: str):
-    results = asyncio.run(run_all_agents(client, company))
+    def run():
+        try:
+            result = asyncio.run(generate_profile(company, two_tier=two_tier, budget=budget,
+                                                  on_published=on_published, cancelled=cancelled, tenant=tenant))
+            if not published.done():
+                published.set_result(result)
+        except BaseException as e:
+            if not published.done():
+                published.set_exception(e)
+            else:
+                telemetry.log("profile_upgrade_failed", logging.ERROR, company=company, error=str(e))
+        finally:
+            with _upgrading_lock:
+                _upgrading.pop(key, None)
+
+    threading.Thread(target=run, daemon=True).start()
+    return published.result()
+
+def find_upgrading_profile(company: str):
+    """
+    (profile, ticker) of a generation for the company that published its
+    profile at the deadline and is still upgrading it in a live process
+    (this one or another), or None.
+    """
+    generation = job_store.find_running_generation(company)
+    if generation is None or generation["ticker"] is None:
+        return None
+    if datetime.fromisoformat(generation["heartbeat_at"]) < datetime.now() - job_store.STALE_AFTER:
+        # Its owner died; the profile is finished by whoever reclaims it
+        return None
+    try:
+        with open(DATA_DIR / f"{generation['ticker']}_profile.json") as f:
+            return json.load(f), generation["ticker"]
+    except (OSError, ValueError):
+        return None
+
+def pull_data_for_company(company: str, two_tier: bool = True, budget: float | None = GENERATION_BUDGET,
+                          cancel: threading.Event | None = None, tenant: str | None = None):
+    """
+    Generate a profile for one company. Concurrent requests for the same
+    (normalized) company - from other sessions or other processes - share a
+    single generation and all receive its result.
 
-    print(f"DEBUG: results type={type(results)}, results={results}")
-    success_count = sum(results)
-    print(f"\n{success_count}/{len(results)} agents completed successfully")
+    Interactive requests use two-tier research by default so a preview
+    profile is available within a minute or two. Returns once the profile is
+    published, at the latest when the budget runs out; a request arriving
+    while that profile is still being upgraded with late agents (in any
+    process) gets it immediately.
 
-    if not all(results):
-        agent_names = ["financial", "supply_chain", "customers_markets", "regulatory_trade"]
-        for name, success in zip(agent_names, results):
-            if not success:
-                print(f"  - {name} failed")
+    Setting cancel (e.g. when the user leaves) raises GenerationCancelled; the
+    generation itself is stopped once every request sharing it has cancelled.
 
-    return merge_sectors_data_for_company()
+    A new generation queues as an interactive one for tenant (see scheduler);
+    scheduler.queue_position(company) tells where it waits.
+    """
+    key = job_store.normalize_company(company)
+    with _upgrading_lock:
+        upgrading = _upgrading.get(key)
+    if upgrading is None:
+        upgrading = find_upgrading_profile(company)
+    if upgrading is not None:
+        telemetry.log("profile_upgrading_returned", company=company)
+        return upgrading
+
+    try:
+        profile, ticker = single_flight.run_once(
+            key,
+            lambda abandoned: generate_until_published(company, two_tier, budget, abandoned, tenant),
+            shareable=lambda result: result[1] is not None,
+            cancel=cancel,
+        )
+    except single_flight.FlightCancelled as e:
+        raise GenerationCancelled(str(e)) from e
+    return profile, ticker
 
 # if __name__ == "__main__":
-#     merge_sectors_data_for_company('DELL', 'DELL')
+#     merge_sectors_data_for_company(load_sector_data(RUNS_DIR / 'DELL'))
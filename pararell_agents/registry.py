@@ -0,0 +1,124 @@
+"""
+Declarative registry of research agents.
+
+Each agent is described by an entry in agents.json: its prompt file, output
+schema, source types, processor, result cache TTL (filings-driven sectors
+change at most quarterly, regulatory news moves faster), an optional
+deadline_seconds within the generation budget, and which keys of its output
+go where in the merged profile. Output schemas live in schemas/<name>.json
+without their "sources" property; the shared sources sub-schema
+(schemas/sources.json) is filled in with each agent's source types.
+
+Definitions, prompts and task specs are loaded once when this module is
+imported, so creating a task only formats the company into the prompt.
+Adding a sector means adding a prompt, a schema and an agents.json entry.
+"""
+from pathlib import Path
+from datetime import timedelta
+from typing import TYPE_CHECKING
+import copy
+import json
+import logging
+
+import webhooks
+import telemetry
+
+if TYPE_CHECKING:
+    # Only needed for annotations: the dashboard reads agent definitions
+    # without loading the SDK
+    from parallel import AsyncParallel
+
+REGISTRY_DIR = Path(__file__).parent
+AGENTS_PATH = REGISTRY_DIR / "agents.json"
+SCHEMAS_DIR = REGISTRY_DIR / "schemas"
+
+
+def build_task_spec(definition: dict, sources_schema: dict) -> dict:
+    """Output schema of an agent with the shared sources sub-schema added"""
+    with open(SCHEMAS_DIR / definition["schema"], 'r') as f:
+        task_spec = json.load(f)
+
+    sources = copy.deepcopy(sources_schema)
+    sources["items"]["properties"]["type"]["enum"] = list(definition["source_types"])
+    json_schema = task_spec["output_schema"]["json_schema"]
+    json_schema["properties"]["sources"] = sources
+    json_schema["required"].append("sources")
+    return task_spec
+
+
+def load_agents(path: Path = AGENTS_PATH) -> list[dict]:
+    """Read the agent definitions and resolve their prompts and task specs"""
+    with open(path, 'r') as f:
+        definitions = json.load(f)
+    with open(SCHEMAS_DIR / "sources.json", 'r') as f:
+        sources_schema = json.load(f)
+
+    agents = []
+    for definition in definitions:
+        with open(definition["prompt"], 'r') as f:
+            prompt = f.read()
+        agents.append({
+            **definition,
+            "prompt_path": definition["prompt"],
+            "prompt": prompt,
+            "task_spec": build_task_spec(definition, sources_schema),
+            "deadline_seconds": definition.get("deadline_seconds"),
+            "cache_ttl": timedelta(days=definition["cache_ttl_days"]) if "cache_ttl_days" in definition else None,
+            "output_keys": definition.get("output_keys", {}),
+            "top_level_keys": definition.get("top_level_keys", {}),
+        })
+    return agents
+
+
+AGENTS = load_agents()
+AGENTS_BY_NAME = {agent["name"]: agent for agent in AGENTS}
+
+
+def get_agent(name: str) -> dict:
+    return AGENTS_BY_NAME[name]
+
+
+async def create_task(async_client: "AsyncParallel", agent: dict, company: str, processor: str | None = None,
+                      webhook: dict | None = None):
+    """
+    Create the agent's task and return the task_run object (non-blocking).
+    With a webhook ({"url", "event_types"}), the run reports its status
+    changes to that URL.
+    """
+    processor = processor or agent["processor"]
+    system_prompt = f"##For company: {company} find this information\n\n{agent['prompt']}"
+
+    telemetry.log("task_creating", logging.DEBUG, agent=agent["name"], processor=processor)
+
+    if webhook is not None:
+        return await async_client.beta.task_run.create(
+            input=system_prompt,
+            processor=processor,
+            task_spec=agent["task_spec"],
+            webhook=webhook,
+            betas=[webhooks.WEBHOOK_BETA],
+        )
+    return await async_client.task_run.create(
+        input=system_prompt,
+        processor=processor,
+        task_spec=agent["task_spec"]
+    )
+
+
+def result_path(agent: dict, workspace: Path) -> Path:
+    """Where the agent's result is archived in a run workspace"""
+    return workspace / f"{agent['name']}.json"
+
+
+def load_result(agent: dict, workspace: Path) -> dict | None:
+    """The agent's result archived in the run workspace, or None if there is none (or it is unreadable)."""
+    try:
+        with open(result_path(agent, workspace), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        # E.g. cut short by a crash before archives were written atomically; the agent is simply rerun
+        telemetry.log("sector_archive_unreadable", logging.WARNING, agent=agent["name"], workspace=str(workspace),
+                      error=str(e))
+        return None
@@ -0,0 +1,53 @@
+"""
+Adaptive poll scheduling for task runs.
+
+Instead of checking every run every few seconds, each wait learns from how
+long recent runs of the same agent on the same processor took (recorded in
+the job store). The next poll is scheduled for when another POLL_PROBABILITY_STEP
+of the remaining chance of the run having finished has passed: few polls
+while the run is almost certainly still working, dense polls around the
+typical completion time, and backing off again once it is overdue.
+
+Without enough history, intervals start at DEFAULT_FIRST_INTERVAL and grow
+geometrically.
+"""
+from bisect import bisect_right
+import math
+
+import job_store
+
+MIN_POLL_INTERVAL = 2  # seconds
+MAX_POLL_INTERVAL = 60  # seconds
+
+POLL_PROBABILITY_STEP = 0.1
+MIN_SAMPLES = 5
+HISTORY_SIZE = 200
+
+DEFAULT_FIRST_INTERVAL = 5  # seconds
+DEFAULT_BACKOFF = 1.3
+
+# Once a run outlasts every run in its history, poll every this share of its age
+OVERDUE_FRACTION = 0.1
+
+
+class PollSchedule:
+    def __init__(self, durations: list[float]):
+        self.durations = sorted(durations)
+
+    def next_delay(self, elapsed: float, polls: int) -> float:
+        """Seconds to wait before the next poll of a run that has been going for elapsed seconds"""
+        if len(self.durations) < MIN_SAMPLES:
+            delay = DEFAULT_FIRST_INTERVAL * DEFAULT_BACKOFF ** polls
+        else:
+            n = len(self.durations)
+            finished_share = bisect_right(self.durations, elapsed) / n
+            if finished_share >= 1:
+                delay = elapsed * OVERDUE_FRACTION
+            else:
+                target_share = finished_share + POLL_PROBABILITY_STEP * (1 - finished_share)
+                delay = self.durations[math.ceil(target_share * n) - 1] - elapsed
+        return min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, delay))
+
+
+def schedule_for(agent: str, processor: str) -> PollSchedule:
+    return PollSchedule(job_store.get_run_latencies(agent, processor, HISTORY_SIZE))
@@ -0,0 +1,105 @@
+"""
+Process-wide cache of parsed profiles for the Streamlit app.
+
+Every rerun of a report page needs the profile it shows. Parsed profiles are
+kept in memory, shared by every session of the process, so a rerun on a hot
+profile costs a single stat() instead of reading and parsing the file, and
+every viewer of a company shares one parsed copy.
+
+An entry is looked up by path and checked against the file's inode, mtime and
+size. Profiles are published with os.replace, so a new version always shows up
+as a new inode and is loaded again on the next rerun. Parsed copies are keyed
+by the SHA-256 of the file content, so identical files under different paths
+(a partial profile and the published one) share a copy too, and the hash is a
+stable identity for anything derived from the profile.
+
+Entries are evicted least recently used once their files add up to more than
+MAX_CACHE_BYTES. Cached profiles are shared: callers must not modify them.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+import hashlib
+import json
+import os
+import threading
+
+MAX_CACHE_BYTES = int(os.getenv("PROFILE_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+
+# A parsed profile takes several times the memory of its JSON file
+PARSED_SIZE_FACTOR = 4
+
+
+class CachedProfile(NamedTuple):
+    data: dict
+    sha256: str
+
+
+_lock = threading.Lock()
+# content hash -> (profile, estimated bytes), least recently used first
+_profiles: OrderedDict[str, tuple[CachedProfile, int]] = OrderedDict()
+# path -> (stat signature, content hash) of the version last loaded from it
+_paths: dict[str, tuple[tuple, str]] = {}
+_used_bytes = 0
+
+
+def _signature(stat: os.stat_result) -> tuple:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _lookup(key: str, signature: tuple) -> CachedProfile | None:
+    with _lock:
+        seen = _paths.get(key)
+        if seen is None or seen[0] != signature or seen[1] not in _profiles:
+            return None
+        _profiles.move_to_end(seen[1])
+        return _profiles[seen[1]][0]
+
+
+def _store(key: str, signature: tuple, profile: CachedProfile, size: int) -> CachedProfile:
+    global _used_bytes
+    with _lock:
+        _paths[key] = (signature, profile.sha256)
+        if profile.sha256 in _profiles:
+            # Same content loaded meanwhile, or under another path: share that copy
+            _profiles.move_to_end(profile.sha256)
+            return _profiles[profile.sha256][0]
+        _profiles[profile.sha256] = (profile, size)
+        _used_bytes += size
+        # Keep the newest entry even if it alone exceeds the cap
+        while _used_bytes > MAX_CACHE_BYTES and len(_profiles) > 1:
+            _, (_, evicted_size) = _profiles.popitem(last=False)
+            _used_bytes -= evicted_size
+        live = set(_profiles)
+        for path in [path for path, (_, digest) in _paths.items() if digest not in live]:
+            del _paths[path]
+        return profile
+
+
+def load_profile(path: str | Path) -> CachedProfile:
+    """
+    Return the parsed profile at path and the hash of its content, from
+    memory if the file hasn't changed since it was last loaded. Raises the
+    same errors as opening and json-loading the file.
+    """
+    key = os.path.abspath(path)
+    cached = _lookup(key, _signature(os.stat(key)))
+    if cached is not None:
+        return cached
+
+    with open(key, 'rb') as f:
+        # The signature of the open file matches the bytes read even if the
+        # path is replaced in between
+        signature = _signature(os.fstat(f.fileno()))
+        raw = f.read()
+    profile = CachedProfile(json.loads(raw), hashlib.sha256(raw).hexdigest())
+    return _store(key, signature, profile, len(raw) * PARSED_SIZE_FACTOR)
+
+
+def clear():
+    """Drop every cached profile"""
+    global _used_bytes
+    with _lock:
+        _profiles.clear()
+        _paths.clear()
+        _used_bytes = 0
@@ -0,0 +1,476 @@
+"""
+View model of a profile: every table, chart and derived list the report page
+shows, built once per profile version.
+
+The report page reruns on every interaction, and rebuilding its DataFrames
+and Plotly figures each time made page latency grow with profile size. The
+view is built from a parsed profile on first use and cached under the
+profile's content hash (see profile_cache), so a rerun only hands the cached
+objects to Streamlit. Like cached profiles, views are shared by every
+session and must not be modified.
+"""
+from collections import OrderedDict
+from functools import cached_property
+import threading
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from profile_cache import CachedProfile
+
+# Views kept in memory (a view is a few DataFrames and figures)
+MAX_CACHED_VIEWS = 64
+
+TREND_COLORS = {"growing": "#10b981", "declining": "#ef4444"}
+DEFAULT_TREND_COLOR = "#3b82f6"
+
+
+def _truncate(text: str, length: int) -> str:
+    return text[:length] + '...' if len(text) > length else text
+
+
+def _as_dict(value) -> dict:
+    # Agents occasionally return an empty list for an object field
+    return value if isinstance(value, dict) else {}
+
+
+class ProfileView:
+    """
+    Tables (None when the profile has no rows for them), figures and derived
+    lists of a profile. Each is built the first time a section asks for it,
+    so a field the builders can't handle only breaks the section showing it.
+    """
+
+    def __init__(self, data: dict):
+        self.financial = _as_dict(data.get('financial'))
+        self.supply_chain = _as_dict(data.get('supply_chain'))
+        self.customer_profile = _as_dict(data.get('customer_profile'))
+
+    # Source lists, with nulls treated as empty
+    @cached_property
+    def _business_segments(self) -> list:
+        return self.financial.get('business_segments') or []
+
+    @cached_property
+    def _facilities(self) -> list:
+        return self.supply_chain.get('company_owned_facilities') or []
+
+    @cached_property
+    def _cms(self) -> list:
+        return self.supply_chain.get('contract_manufacturers') or []
+
+    @cached_property
+    def _critical_suppliers(self) -> list:
+        return self.supply_chain.get('critical_suppliers') or []
+
+    @cached_property
+    def _industry_exposure(self) -> list:
+        return self.customer_profile.get('industry_exposure') or []
+
+    @cached_property
+    def _customer_concentration(self) -> dict:
+        return _as_dict(self.customer_profile.get('customer_concentration'))
+
+    @cached_property
+    def segments(self):
+        return self._segments(self._business_segments)
+
+    @cached_property
+    def segment_revenue_pie(self):
+        return self._segment_revenue_pie()
+
+    @cached_property
+    def segment_revenue_bar(self):
+        return self._segment_revenue_bar()
+
+    @cached_property
+    def regions(self):
+        return self._regions(self.financial.get('revenue_by_region') or [])
+
+    @cached_property
+    def region_pie(self):
+        return self._region_pie()
+
+    @cached_property
+    def manufacturing(self):
+        return self._manufacturing(self._facilities)
+
+    @cached_property
+    def facilities_by_country_pie(self):
+        return self._facilities_by_country_pie(self._facilities)
+
+    @cached_property
+    def cm_facilities(self):
+        return self._cm_facilities(self._cms)
+
+    @cached_property
+    def contract_manufacturers(self):
+        return self._contract_manufacturers(self._cms)
+
+    @cached_property
+    def segment_mix_pie(self):
+        return self._segment_mix_pie(_as_dict(self.customer_profile.get('segment_mix')))
+
+    @cached_property
+    def top_customers(self):
+        return self._top_customers(self.customer_profile.get('top_customers') or [])
+
+    @cached_property
+    def industries(self):
+        return self._industries(self._industry_exposure)
+
+    @cached_property
+    def industry_bar(self):
+        return self._industry_bar(self._industry_exposure)
+
+    @cached_property
+    def suppliers(self):
+        return self._suppliers(self._critical_suppliers)
+
+    @cached_property
+    def high_dependency_suppliers(self) -> list:
+        return [s.get('supplier_name') or 'N/A' for s in self._critical_suppliers if s.get('dependency_level') == 'high']
+
+    @cached_property
+    def components(self):
+        return self._components(self._critical_suppliers)
+
+    @cached_property
+    def china_facilities(self) -> list:
+        return [f for f in self._facilities if f.get('country') == 'China']
+
+    @cached_property
+    def supplier_risks(self) -> list:
+        return self._supplier_risks(self._critical_suppliers, self._cms)
+
+    @cached_property
+    def geo_risks(self) -> list:
+        return self._geo_risks(self._customer_concentration, _as_dict(self.financial.get('financial_baseline')))
+
+    @cached_property
+    def takeaways(self) -> list:
+        return self._takeaways(self._business_segments,
+                               self.supply_chain.get('supply_chain_initiatives') or [],
+                               self._customer_concentration)
+
+    # ------------------------------------------------------------------
+    # Revenue and business segments
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _segments(segments: list):
+        if not segments:
+            return None
+        return pd.DataFrame({
+            'Segment': [seg.get('name') or 'N/A' for seg in segments],
+            'Revenue ($B)': [(seg.get('revenue_usd_millions') or 0) / 1000 for seg in segments],
+            'YoY Growth (%)': [seg.get('yoy_growth_percent') or 0 for seg in segments],
+            'Margin (%)': [seg.get('operating_margin_percent') or 0 for seg in segments]
+        })
+
+    def _segment_revenue_pie(self):
+        if self.segments is None:
+            return None
+        fig = px.pie(self.segments, values='Revenue ($B)', names='Segment',
+                     labels={'Revenue ($B)': 'Revenue'},
+                     title='Revenue by Segment ($B)',
+                     color_discrete_sequence=['#1e40af', '#3b82f6', '#93c5fd', '#60a5fa'],
+                     hole=0.4)
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+        fig.update_layout(height=350)
+        return fig
+
+    def _segment_revenue_bar(self):
+        if self.segments is None:
+            return None
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=self.segments['Segment'],
+            y=self.segments['Revenue ($B)'],
+            name='Revenue ($B)',
+            marker_color='#1e40af'
+        ))
+        fig.update_layout(
+            title='Revenue by Business Segment',
+            xaxis_title='',
+            yaxis_title='Revenue ($B)',
+            height=350,
+            showlegend=False
+        )
+        return fig
+
+    # ------------------------------------------------------------------
+    # Geographic exposure
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _regions(regions: list):
+        has_region_data = regions and any(
+            (r.get('revenue_usd_millions') or 0) > 0 or (r.get('percent_of_total') or 0) > 0
+            for r in regions
+        )
+        if not has_region_data:
+            return None
+        geo_revenue_df = pd.DataFrame([
+            {
+                'Region': r.get('region') or 'N/A',
+                'Revenue ($B)': (r.get('revenue_usd_millions') or 0) / 1000,
+                'Percentage': r.get('percent_of_total') or 0,
+                'YoY Growth': r.get('yoy_growth_percent')
+            }
+            for r in regions
+        ])
+        return geo_revenue_df.sort_values('Percentage', ascending=False)
+
+    def _region_pie(self):
+        if self.regions is None:
+            return None
+        fig = px.pie(
+            self.regions,
+            values='Percentage',
+            names='Region',
+            title='Revenue Distribution by Region',
+            color_discrete_sequence=px.colors.qualitative.Set2,
+            hole=0.4
+        )
+        fig.update_traces(textposition='outside', textinfo='label+percent')
+        fig.update_layout(height=350, showlegend=False)
+        return fig
+
+    @staticmethod
+    def _manufacturing(facilities: list):
+        if not facilities:
+            return None
+        return pd.DataFrame({
+            'Location': [f"{f.get('city') or 'N/A'}, {f.get('country') or 'N/A'}" for f in facilities],
+            'Region Served': [f.get('region_served') or 'N/A' for f in facilities],
+            'Type': [', '.join(f.get('roles') or []).title() for f in facilities],
+            'Primary Products': [_truncate(f.get('products') or 'N/A', 60) for f in facilities]
+        })
+
+    @staticmethod
+    def _facilities_by_country_pie(facilities: list):
+        if not facilities:
+            return None
+        country_counts = pd.Series([f.get('country') or 'N/A' for f in facilities]).value_counts()
+        fig = px.pie(values=country_counts.values, names=country_counts.index,
+                     title='Facilities by Country',
+                     color_discrete_sequence=px.colors.qualitative.Set2)
+        fig.update_layout(height=300)
+        return fig
+
+    @staticmethod
+    def _cm_facilities(cms: list):
+        if not cms:
+            return None
+        return pd.DataFrame({
+            'Manufacturer': [cm.get('manufacturer_name') or 'N/A' for cm in cms],
+            'HQ Country': [cm.get('headquarters_country') or 'N/A' for cm in cms],
+            'Type': [(cm.get('relationship_type') or 'N/A').upper() for cm in cms],
+            'Production Locations': [_truncate(', '.join(cm.get('production_countries') or []), 40) for cm in cms],
+            'Dependency': [(cm.get('dependency_level') or 'N/A').capitalize() for cm in cms]
+        })
+
+    # ------------------------------------------------------------------
+    # Customer profile
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _segment_mix_pie(segment_mix: dict):
+        if not segment_mix:
+            return None
+        mix_data = pd.DataFrame({
+            'Segment': ['B2B (Business)', 'B2C (Consumer)', 'B2G (Government)'],
+            'Percentage': [
+                segment_mix.get('b2b_percent') or 0,
+                segment_mix.get('b2c_percent') or 0,
+                segment_mix.get('b2g_percent') or 0
+            ]
+        })
+        fig = px.pie(mix_data, values='Percentage', names='Segment',
+                     title='Revenue by Customer Segment',
+                     color_discrete_sequence=['#1e40af', '#3b82f6', '#93c5fd'],
+                     hole=0.4)
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+        fig.update_layout(height=350)
+        return fig
+
+    @staticmethod
+    def _top_customers(top_customers: list):
+        if not top_customers:
+            return None
+        return pd.DataFrame({
+            'Customer': [c.get('name') or 'N/A' for c in top_customers],
+            'Industry': [c.get('industry') or 'N/A' for c in top_customers],
+            'Type': [(c.get('type') or 'N/A').capitalize() for c in top_customers],
+            'Revenue %': [f"{c.get('percent_of_revenue') or 0:.2f}%" for c in top_customers]
+        })
+
+    @staticmethod
+    def _industries(industries: list):
+        if not industries:
+            return None
+        return pd.DataFrame({
+            'Industry': [ind.get('industry') or 'N/A' for ind in industries],
+            'Revenue %': [ind.get('percent_of_revenue') or 0 for ind in industries],
+            'Trend': [(ind.get('trend') or 'N/A').capitalize() for ind in industries]
+        })
+
+    def _industry_bar(self, industries: list):
+        if self.industries is None:
+            return None
+        # Color by trend
+        colors = [TREND_COLORS.get((ind.get('trend') or '').lower(), DEFAULT_TREND_COLOR) for ind in industries]
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=self.industries['Industry'],
+            y=self.industries['Revenue %'],
+            marker_color=colors,
+            text=self.industries['Trend'],
+            textposition='outside'
+        ))
+        fig.update_layout(
+            title='Revenue by Industry Vertical',
+            xaxis_title='',
+            yaxis_title='Revenue %',
+            height=400,
+            xaxis_tickangle=-45,
+            showlegend=False
+        )
+        return fig
+
+    # ------------------------------------------------------------------
+    # Supply chain
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _suppliers(suppliers: list):
+        if not suppliers:
+            return None
+        return pd.DataFrame({
+            'Supplier': [s.get('supplier_name') or 'N/A' for s in suppliers],
+            'Component': [s.get('provides') or s.get('component_category') or 'N/A' for s in suppliers],
+            'HQ Country': [s.get('headquarters_country') or 'N/A' for s in suppliers],
+            'Dependency': [(s.get('dependency_level') or 'N/A').capitalize() for s in suppliers],
+            'Manufacturing Locations': [_truncate(', '.join(s.get('manufacturing_locations') or []), 30) for s in suppliers]
+        })
+
+    @staticmethod
+    def _contract_manufacturers(cms: list):
+        if not cms:
+            return None
+        return pd.DataFrame({
+            'Manufacturer': [cm.get('manufacturer_name') or 'N/A' for cm in cms],
+            'Location': [f"{cm.get('headquarters_country') or 'N/A'}" for cm in cms],
+            'Products': [_truncate(', '.join(cm.get('products_manufactured') or []), 40) for cm in cms],
+            'Relationship': [(cm.get('relationship_type') or 'N/A').upper() for cm in cms],
+            'Dependency': [(cm.get('dependency_level') or 'N/A').capitalize() for cm in cms]
+        })
+
+    @staticmethod
+    def _components(suppliers: list):
+        if not suppliers:
+            return None
+        # Group suppliers by component category
+        categories = {}
+        for s in suppliers:
+            categories.setdefault(s.get('component_category') or 'Other', []).append(s.get('supplier_name') or 'N/A')
+        return pd.DataFrame({
+            'Component Category': list(categories.keys()),
+            'Primary Suppliers': [', '.join(sups[:3]) for sups in categories.values()],
+            'Supplier Count': [len(sups) for sups in categories.values()],
+            'Concentration': ['High' if len(sups) <= 2 else 'Medium' if len(sups) <= 4 else 'Low' for sups in categories.values()]
+        })
+
+    # ------------------------------------------------------------------
+    # Concentration & risk, takeaways: (item, level, description) rows
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _supplier_risks(suppliers: list, cms: list) -> list:
+        risk_data = []
+
+        # CPU/GPU supplier risk
+        cpu_gpu = [s for s in suppliers if s.get('component_category') in ['CPU', 'GPU'] and s.get('dependency_level') == 'high']
+        if cpu_gpu:
+            risk_data.append(("CPU/GPU Supplier Dependency", "High", f"High dependency on {', '.join([s.get('supplier_name') or 'N/A' for s in cpu_gpu[:2]])}"))
+
+        # Memory supplier risk
+        memory = [s for s in suppliers if s.get('component_category') == 'memory' and s.get('dependency_level') == 'high']
+        if memory:
+            risk_data.append(("Memory Supply Concentration", "Medium", f"Top {len(memory)} memory suppliers with high dependency"))
+
+        # Taiwan exposure
+        taiwan_cms = [cm for cm in cms if cm.get('headquarters_country') == 'Taiwan']
+        if len(taiwan_cms) >= 3:
+            risk_data.append(("Taiwan Geopolitical Risk", "High", f"Significant ODM/CM exposure in Taiwan ({len(taiwan_cms)} manufacturers)"))
+
+        # Single source risks
+        single_source = [s for s in suppliers if s.get('single_source') == True]
+        if single_source:
+            risk_data.append(("Single Source Components", "High", f"{len(single_source)} components with single-source suppliers"))
+        return risk_data
+
+    def _geo_risks(self, cust_conc: dict, fin_baseline: dict) -> list:
+        geo_risks = []
+
+        # China manufacturing exposure
+        if self.china_facilities:
+            geo_risks.append(("China Manufacturing Exposure", "High" if len(self.china_facilities) >= 2 else "Medium", f"{len(self.china_facilities)} facilities in China; geopolitical tensions impact"))
+
+        # Customer concentration
+        conc_level = cust_conc.get('concentration_level') or 'N/A'
+        top_cust_pct = cust_conc.get('top_customer_percent') or 0
+        if conc_level.lower() == 'low':
+            geo_risks.append(("Revenue Concentration", "Low", f"Well-diversified: largest customer ~{top_cust_pct:.1f}% of revenue"))
+        elif conc_level.lower() == 'high':
+            geo_risks.append(("Revenue Concentration", "High", f"Top customer represents {top_cust_pct:.1f}% of revenue"))
+
+        # Balance sheet risk
+        bs_strength = fin_baseline.get('balance_sheet_strength') or 'N/A'
+        debt_to_equity = fin_baseline.get('debt_to_equity') or 0
+        if bs_strength.lower() == 'weak':
+            geo_risks.append(("Balance Sheet Strength", "High", f"Weak balance sheet (D/E: {debt_to_equity:.1f})"))
+        elif bs_strength.lower() == 'moderate':
+            geo_risks.append(("Balance Sheet Strength", "Medium", f"Moderate balance sheet strength"))
+        return geo_risks
+
+    def _takeaways(self, segments: list, initiatives: list, cust_conc: dict) -> list:
+        takeaways = []
+
+        # Segment growth
+        growing_segments = [s for s in segments if (s.get('yoy_growth_percent') or 0) > 10]
+        if growing_segments:
+            top_growth = max(growing_segments, key=lambda x: x['yoy_growth_percent'])
+            takeaways.append(f"**Strong Segment Growth:** {top_growth.get('name') or 'N/A'} growing {top_growth['yoy_growth_percent']:.0f}% YoY")
+
+        # Supply chain initiatives
+        if initiatives:
+            takeaways.append(f"**Supply Chain Diversification:** {len(initiatives)} active initiatives including {initiatives[0].get('initiative') or 'N/A'}")
+
+        # Customer diversification
+        if not cust_conc.get('any_customer_over_10_percent'):
+            takeaways.append("**Customer Diversification:** No single customer exceeds 10% of revenue - well-diversified base")
+
+        # Geographic exposure
+        if self.china_facilities:
+            takeaways.append(f"**Geographic Risk:** {len(self.china_facilities)} manufacturing facilities in China; consider China+1 strategy")
+        return takeaways
+
+
+_lock = threading.Lock()
+# profile content hash -> view, least recently used first
+_views: OrderedDict[str, ProfileView] = OrderedDict()
+
+
+def view_for(profile: CachedProfile) -> ProfileView:
+    """The view of a cached profile, built on first use"""
+    with _lock:
+        view = _views.get(profile.sha256)
+        if view is not None:
+            _views.move_to_end(profile.sha256)
+            return view
+    # Built outside the lock; sessions racing on a new profile build it twice at worst
+    view = ProfileView(profile.data)
+    with _lock:
+        view = _views.setdefault(profile.sha256, view)
+        _views.move_to_end(profile.sha256)
+        while len(_views) > MAX_CACHED_VIEWS:
+            _views.popitem(last=False)
+    return view
@@ -0,0 +1,97 @@
+"""
+Content-addressed cache for agent outputs.
+
+An agent's output is determined by the company, the prompt, the output schema
+and the processor, so those (normalized and hashed) form the cache key. A hit
+lets a generation skip the Parallel task run for that sector entirely.
+
+Entries live as JSON files under data/cache/<agent>/<key>.json. Each sector
+has its own TTL (cache_ttl_days in pararell_agents/agents.json), and the
+directory is kept under MAX_CACHE_BYTES by evicting the least recently used
+entries.
+"""
+from pathlib import Path
+from datetime import timedelta
+import hashlib
+import json
+import os
+import time
+import uuid
+
+from job_store import normalize_company
+
+CACHE_DIR = Path(os.getenv("RESULT_CACHE_DIR", "data/cache"))
+MAX_CACHE_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Used for agents that don't set cache_ttl_days
+DEFAULT_TTL = timedelta(days=7)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(company: str, agent: str, prompt: str, task_spec: dict, processor: str) -> str:
+    """Hash of everything that determines an agent's output"""
+    return _sha256(json.dumps({
+        "company": normalize_company(company),
+        "agent": agent,
+        "prompt_sha256": _sha256(prompt),
+        "schema_sha256": _sha256(json.dumps(task_spec, sort_keys=True)),
+        "processor": processor,
+    }, sort_keys=True))
+
+
+def _entry_path(agent: str, key: str) -> Path:
+    return CACHE_DIR / agent / f"{key}.json"
+
+
+def lookup(agent: str, key: str, ttl: timedelta | None = None):
+    """Return the cached output content, or None if missing or older than ttl"""
+    path = _entry_path(agent, key)
+    try:
+        with open(path, 'r') as f:
+            entry = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    ttl = ttl or DEFAULT_TTL
+    if time.time() - entry["created_at"] > ttl.total_seconds():
+        path.unlink(missing_ok=True)
+        return None
+
+    # mtime doubles as the last-used time for LRU eviction
+    os.utime(path)
+    return entry["content"]
+
+
+def store(agent: str, key: str, content):
+    """Cache an agent's output content, then evict old entries if over the size limit"""
+    path = _entry_path(agent, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{key}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump({"created_at": time.time(), "agent": agent, "content": content}, f)
+    os.replace(tmp_path, path)
+    evict()
+
+
+def evict(max_bytes: int = MAX_CACHE_BYTES):
+    """Delete least recently used entries until the cache fits in max_bytes"""
+    entries = []
+    total = 0
+    for path in CACHE_DIR.glob("*/*.json"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    if total <= max_bytes:
+        return
+    for _, size, path in sorted(entries):
+        path.unlink(missing_ok=True)
+        total -= size
+        if total <= max_bytes:
+            break
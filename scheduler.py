@@ -0,0 +1,165 @@
+"""
+Admission scheduler for profile generations.
+
+Interactive requests (the Streamlit app) and batch refreshes share the same
+upstream capacity, so new generations queue for one of
+MAX_CONCURRENT_GENERATIONS slots before starting their agents. The queue
+lives in the job store, so it orders generations across every process on
+the machine:
+
+- interactive generations go before queued batch ones, and batch
+  generations never take the last INTERACTIVE_RESERVED_SLOTS slots, so an
+  interactive request never waits behind a batch refresh;
+- within a priority class, tenants with fewer admitted generations go first,
+  so one tenant's long watchlist does not starve the others;
+- otherwise first come, first served.
+
+The priority class is upstream.priority ("interactive" unless the caller
+runs as "batch").
+
+Each process runs a single admission thread that checks all of its queued
+generations in one job store transaction per sweep, so the event loops
+waiting for a slot never touch the database themselves.
+"""
+from dataclasses import dataclass
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+import uuid
+
+import job_store
+import telemetry
+import upstream
+
+MAX_CONCURRENT_GENERATIONS = int(os.getenv("MAX_CONCURRENT_GENERATIONS", 16))
+INTERACTIVE_RESERVED_SLOTS = int(os.getenv("INTERACTIVE_RESERVED_SLOTS", 4))
+
+DEFAULT_TENANT = "default"
+ADMISSION_CHECK_INTERVAL = 1  # seconds
+
+
+class AdmissionCancelled(Exception):
+    """The caller gave up while its generation was still queued"""
+
+
+async def keep_ticket_alive(ticket_id: str):
+    while True:
+        await asyncio.sleep(job_store.HEARTBEAT_INTERVAL)
+        await asyncio.to_thread(job_store.heartbeat_ticket, ticket_id)
+
+
+@dataclass
+class _Ticket:
+    ticket_id: str
+    company: str
+    priority: str
+    tenant: str
+    admitted: asyncio.Future
+    position: int | None = None
+
+
+class _Admitter:
+    """Admits this process's queued tickets from one thread, one sweep per ADMISSION_CHECK_INTERVAL"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiting: dict[str, _Ticket] = {}
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, ticket: _Ticket):
+        with self._lock:
+            self._waiting[ticket.ticket_id] = ticket
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="admission", daemon=True)
+                self._thread.start()
+        self.wake()
+
+    def discard(self, ticket_id: str):
+        with self._lock:
+            self._waiting.pop(ticket_id, None)
+
+    def wake(self):
+        """Sweep now, e.g. because a ticket was queued or a slot was freed"""
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(ADMISSION_CHECK_INTERVAL)
+            self._wakeup.clear()
+            with self._lock:
+                tickets = dict(self._waiting)
+            if not tickets:
+                continue
+            try:
+                self._sweep(tickets)
+            except Exception as e:
+                telemetry.log("admission_check_failed", logging.ERROR, exc_info=True, error=str(e))
+
+    def _sweep(self, tickets: dict[str, _Ticket]):
+        batch_capacity = MAX_CONCURRENT_GENERATIONS - INTERACTIVE_RESERVED_SLOTS
+        positions = job_store.admit_tickets(list(tickets), MAX_CONCURRENT_GENERATIONS, batch_capacity)
+        for ticket_id, position in positions.items():
+            ticket = tickets[ticket_id]
+            with self._lock:
+                if ticket_id not in self._waiting:
+                    # Given up meanwhile; its owner releases the ticket
+                    continue
+                if position == 0:
+                    del self._waiting[ticket_id]
+            if position is None:
+                # Dropped as stale (e.g. the process was suspended): queue again
+                job_store.enqueue_ticket(ticket_id, ticket.company, ticket.priority, ticket.tenant)
+            elif position == 0:
+                with contextlib.suppress(RuntimeError):  # the waiter's loop is gone
+                    ticket.admitted.get_loop().call_soon_threadsafe(_set_admitted, ticket.admitted)
+            else:
+                ticket.position = position
+
+
+def _set_admitted(admitted: asyncio.Future):
+    if not admitted.done():
+        admitted.set_result(None)
+
+
+_admitter = _Admitter()
+
+
+@contextlib.asynccontextmanager
+async def admission(company: str, tenant: str | None = None, cancelled=None):
+    """
+    Wait for a generation slot and hold it for the duration of the block.
+    Raises AdmissionCancelled if cancelled() turns true while still queued.
+    """
+    priority = upstream.priority.get()
+    tenant = tenant or DEFAULT_TENANT
+    ticket = _Ticket(uuid.uuid4().hex, company, priority, tenant, asyncio.get_running_loop().create_future())
+    await asyncio.to_thread(job_store.enqueue_ticket, ticket.ticket_id, company, priority, tenant)
+    heartbeat_task = None
+    try:
+        _admitter.add(ticket)
+        last_position = None
+        while not ticket.admitted.done():
+            if ticket.position is not None and ticket.position != last_position:
+                telemetry.log("generation_queued", company=company, position=ticket.position, priority=priority, tenant=tenant)
+                last_position = ticket.position
+            if cancelled is not None and cancelled():
+                raise AdmissionCancelled(f"Generation for {company} was cancelled while queued")
+            await asyncio.wait({ticket.admitted}, timeout=ADMISSION_CHECK_INTERVAL)
+        if last_position is not None:
+            telemetry.log("generation_admitted", company=company)
+        heartbeat_task = asyncio.create_task(keep_ticket_alive(ticket.ticket_id))
+        yield
+    finally:
+        _admitter.discard(ticket.ticket_id)
+        if heartbeat_task is not None:
+            heartbeat_task.cancel()
+        await asyncio.to_thread(job_store.release_ticket, ticket.ticket_id)
+        _admitter.wake()
+
+
+def queue_position(company: str) -> int | None:
+    """Where a company's generation waits in the queue (1 = next), or None if it is not queued"""
+    return job_store.queue_position(company)
@@ -0,0 +1,149 @@
+"""
+Single-flight coalescing of identical profile requests.
+
+When several sessions ask for the same company at once, only the first one
+(the leader) runs the generation; the others wait for it and receive its
+result. Within a process this uses a registry of in-flight calls, and across
+processes an exclusive file lock per key plus a small result file that the
+leader leaves behind for whoever was queued on the lock.
+
+Each caller may pass a cancel event. A caller whose event is set stops
+waiting (raising FlightCancelled); the call itself is only told to stop once
+every caller waiting on it has cancelled.
+"""
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process coalescing only
+    fcntl = None
+
+import telemetry
+
+LOCK_DIR = Path(os.getenv("SINGLE_FLIGHT_LOCK_DIR", "data/locks"))
+
+# How often waiters check their cancel event
+CANCEL_CHECK_INTERVAL = 0.5  # seconds
+
+
+class FlightCancelled(Exception):
+    """The caller cancelled its request before the result was ready"""
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.cancel_events = []
+
+    def abandoned(self) -> bool:
+        """True once every caller waiting on this flight has cancelled"""
+        with _flights_lock:
+            events = list(self.cancel_events)
+        return all(event is not None and event.is_set() for event in events)
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def run_once(key: str, fn, shareable=lambda result: True, cancel: threading.Event | None = None):
+    """
+    Run fn(abandoned) for key, or wait for the call already in flight for key
+    and return its result. abandoned() turns true once every caller has set
+    its cancel event, at which point fn should stop early. fn's result must
+    be JSON-serializable to be shared across processes; results for which
+    shareable(result) is false (e.g. failures) are not handed to callers in
+    other processes.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _flights[key] = _Flight()
+        flight.cancel_events.append(cancel)
+
+    if not is_leader:
+        telemetry.log("single_flight_joined", key=key)
+        while not flight.done.wait(CANCEL_CHECK_INTERVAL):
+            if cancel is not None and cancel.is_set():
+                raise FlightCancelled(f"Request for '{key}' was cancelled")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _run_with_file_lock(key, lambda: fn(flight.abandoned), shareable, flight.abandoned)
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+
+def _acquire(lock_file, abandoned):
+    """Take the exclusive lock, giving up if every caller cancels while queued"""
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            if abandoned():
+                raise FlightCancelled("Request was cancelled while queued behind another process")
+            time.sleep(CANCEL_CHECK_INTERVAL)
+
+
+def _run_with_file_lock(key: str, fn, shareable, abandoned=lambda: False):
+    if fcntl is None:
+        return fn()
+
+    LOCK_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    lock_path = LOCK_DIR / f"{digest}.lock"
+    result_path = LOCK_DIR / f"{digest}.result.json"
+    requested_at = time.time()
+
+    with open(lock_path, 'a') as lock_file:
+        _acquire(lock_file, abandoned)
+        try:
+            # If another process finished this key while we were queued on the
+            # lock, its result is at least as fresh as the one we came for
+            shared = _read_shared_result(result_path, since=requested_at)
+            if shared is not None:
+                telemetry.log("single_flight_reused", key=key)
+                return shared["result"]
+
+            result = fn()
+            if shareable(result):
+                _write_shared_result(result_path, result)
+            return result
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_shared_result(path: Path, since: float):
+    try:
+        with open(path, 'r') as f:
+            shared = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if shared.get("finished_at", 0) < since:
+        return None
+    return shared
+
+
+def _write_shared_result(path: Path, result):
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump({"finished_at": time.time(), "result": result}, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,118 @@
+"""
+Index of the sources cited in sector data.
+
+Confidence, data quality and the primary source list all need the cited
+sources; the index collects them in a single traversal of the sector data
+and groups them by tier, sector, date and name, so each consumer reads the
+group it needs instead of walking the whole profile again.
+
+Sources are deduplicated (same name, type and date) and numbered as they
+are found, so a profile stores each one once in its source table and
+sections refer to them by id.
+"""
+from collections import defaultdict
+from functools import cached_property
+
+# Source tier of each source type (1 = primary filings ... 4 = news)
+SOURCE_TIERS = {
+    "10-K": 1,
+    "annual_report": 2,
+    "investor_presentation": 2,
+    "earnings_call": 3,
+    "press_release": 3,
+    "news": 4,
+}
+
+
+def source_key(source) -> tuple:
+    """What makes two citations the same source"""
+    if isinstance(source, dict):
+        return source.get("name"), source.get("type"), source.get("date")
+    return (repr(source),)
+
+
+class SourceIndex:
+    def __init__(self):
+        # Distinct sources in order of first citation, and their ids
+        self.sources = []
+        self.ids = []
+        self._id_by_key = {}
+        # Ids of the sources each sector cites, in order of first citation
+        self.sector_ids = defaultdict(dict)
+
+    @classmethod
+    def build(cls, data, key_sectors: dict | None = None) -> "SourceIndex":
+        """
+        Index every "sources" list in data, in document order. key_sectors maps
+        top-level keys of data to the sector (agent) they came from.
+        """
+        index = cls()
+        if isinstance(data, dict):
+            key_sectors = key_sectors or {}
+            for key, value in data.items():
+                index._collect(key, value, key_sectors.get(key))
+        else:
+            index._collect(None, data, None)
+        return index
+
+    def _collect(self, key, value, sector: str | None):
+        if key == "sources" and isinstance(value, list):
+            cited = self.sector_ids[sector]
+            for source in value:
+                source_id = self._id_by_key.get(source_key(source))
+                if source_id is None:
+                    source_id = f"S{len(self.sources) + 1}"
+                    self._id_by_key[source_key(source)] = source_id
+                    self.sources.append(source)
+                    self.ids.append(source_id)
+                cited[source_id] = None
+        elif isinstance(value, dict):
+            for child_key, child in value.items():
+                self._collect(child_key, child, sector)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, (dict, list)):
+                    self._collect(None, item, sector)
+
+    def _group(self, keys) -> dict:
+        groups = defaultdict(list)
+        for key, source in zip(keys, self.sources):
+            groups[key].append(source)
+        return groups
+
+    def _field(self, field: str):
+        return (source.get(field) if isinstance(source, dict) else None for source in self.sources)
+
+    # Groupings are built on first use, so consumers only pay for the ones they read
+
+    @cached_property
+    def by_tier(self) -> dict:
+        return self._group(SOURCE_TIERS.get(source_type) for source_type in self._field("type"))
+
+    @cached_property
+    def by_sector(self) -> dict:
+        by_id = dict(zip(self.ids, self.sources))
+        return {sector: [by_id[source_id] for source_id in ids] for sector, ids in self.sector_ids.items()}
+
+    @cached_property
+    def by_date(self) -> dict:
+        return self._group(self._field("date"))
+
+    @cached_property
+    def by_name(self) -> dict:
+        return self._group(self._field("name"))
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def table(self) -> list[dict]:
+        """The distinct sources, each with its id"""
+        return [{"id": source_id, **source} if isinstance(source, dict) else {"id": source_id, "name": str(source)}
+                for source_id, source in zip(self.ids, self.sources)]
+
+    def cited_by(self, sector: str) -> list[str]:
+        """Ids of the sources a sector cites"""
+        return list(self.sector_ids.get(sector, ()))
+
+    def tier_count(self, tier: int) -> int:
+        return len(self.by_tier.get(tier, ()))
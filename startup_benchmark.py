@@ -0,0 +1,125 @@
+"""
+Startup-time benchmark of the Streamlit app.
+
+Usage:
+    python startup_benchmark.py --runs 5 --profile data/DELL_profile.json
+    python startup_benchmark.py --output data/startup_benchmark.jsonl
+
+Each run starts a fresh interpreter and renders one view of streamlit_app.py
+headlessly (streamlit.testing AppTest), measuring:
+    cold_start   process start until the first script run has finished
+                 (interpreter and Streamlit startup included)
+    first_paint  duration of that first script run, i.e. what a new session
+                 waits for before the page shows
+    rerun        duration of a second script run in the same process
+and which heavy modules (pandas, plotly, the Parallel SDK) the view loaded
+beyond those Streamlit itself imports.
+
+Views: landing (company input), loading (generation submitted, progress
+shown) and report (a rendered profile). The loading view submits its job to
+a throwaway job store (and events to a throwaway log), so running this never
+queues real research. With
+--output, one JSON line per view is appended so results can be tracked
+across changes.
+"""
+from pathlib import Path
+from datetime import datetime
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = Path(__file__).parent
+VIEWS = ("landing", "loading", "report")
+HEAVY_MODULES = ("pandas", "plotly.express", "plotly.graph_objects", "parallel", "merge_sectors_data")
+
+# Runs in the child interpreter; prints one JSON result line
+_CHILD = r"""
+import json, sys, time
+started = float(sys.argv[1])
+view, profile = sys.argv[2], sys.argv[3]
+from streamlit.testing.v1 import AppTest
+# Streamlit may import some of these itself; only count what the app adds
+preloaded = set(sys.modules)
+
+app = AppTest.from_file("streamlit_app.py", default_timeout=120)
+state = {"session_initialized": True}
+if view == "loading":
+    state.update(loading=True, company_name_input="Startup Benchmark Inc")
+elif view == "report":
+    state.update(profile_path=profile)
+for key, value in state.items():
+    app.session_state[key] = value
+
+run_started = time.time()
+app.run()
+first_paint = time.time() - run_started
+cold_start = time.time() - started
+run_started = time.time()
+app.run()
+rerun = time.time() - run_started
+print(json.dumps({
+    "cold_start": cold_start,
+    "first_paint": first_paint,
+    "rerun": rerun,
+    "exceptions": [e.value for e in app.exception],
+    "modules": [m for m in %r if m in sys.modules and m not in preloaded],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_view(view: str, profile: str, env: dict) -> dict:
+    started = time.time()
+    result = subprocess.run([sys.executable, "-c", _CHILD, str(started), view, profile],
+                            cwd=APP_DIR, env=env, capture_output=True, text=True, check=True)
+    # The app logs to stdout too; the result is the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def git_revision() -> str | None:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start and first-paint latency of the app")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per view")
+    parser.add_argument("--views", nargs="+", choices=VIEWS, default=list(VIEWS))
+    parser.add_argument("--profile", default=str(APP_DIR / "data_dell_idk" / "DELL_profile.json"),
+                        help="Profile rendered by the report view")
+    parser.add_argument("--output", help="Append results as JSON lines to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, JOB_STORE_PATH=str(Path(tmp) / "jobs.db"),
+                   LOG_JSONL_PATH=str(Path(tmp) / "events.jsonl"))
+        records = []
+        for view in args.views:
+            results = [run_view(view, str(Path(args.profile).resolve()), env) for _ in range(args.runs)]
+            record = {
+                "view": view,
+                "runs": args.runs,
+                **{metric: statistics.median(r[metric] for r in results)
+                   for metric in ("cold_start", "first_paint", "rerun")},
+                "modules": results[-1]["modules"],
+                "exceptions": results[-1]["exceptions"],
+            }
+            records.append(record)
+            print(f"{view:<8} cold start {record['cold_start']:.2f}s  first paint {record['first_paint']:.2f}s  "
+                  f"rerun {record['rerun']:.3f}s  heavy modules: {', '.join(record['modules']) or 'none'}")
+            if record["exceptions"]:
+                print(f"         exceptions: {record['exceptions']}")
+
+    if args.output:
+        meta = {"timestamp": datetime.now().isoformat(), "revision": git_revision()}
+        with open(args.output, 'a') as f:
+            for record in records:
+                f.write(json.dumps({**meta, **record}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
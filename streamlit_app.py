@@ -1,10 +1,13 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-from datetime import datetime, timedelta
-import time
-import json
+from datetime import datetime
+import functools
+import logging
+
+# The charting/data stack (pandas, plotly via profile_view) is imported only
+# once a report is rendered, so the landing and loading pages start without it
+import profile_cache
+import telemetry
+from pararell_agents.registry import AGENTS
 
 # ============================================================================
 # PAGE CONFIGURATION (must be first Streamlit command)
@@ -22,29 +25,128 @@ if 'ticker' not in st.session_state:
     st.session_state.ticker = None
 if 'loading' not in st.session_state:
     st.session_state.loading = False
+if 'generation' not in st.session_state:
+    st.session_state.generation = None
+if 'profile_path' not in st.session_state:
+    st.session_state.profile_path = None
+if 'upgrading_company' not in st.session_state:
+    st.session_state.upgrading_company = None
 if 'session_initialized' not in st.session_state:
     st.session_state.session_initialized = True
     # Reset state for fresh session
     st.session_state.ticker = None
     st.session_state.loading = False
+    st.session_state.generation = None
+    st.session_state.profile_path = None
+    st.session_state.upgrading_company = None
 
-# DEBUG: Print session state at the start
-print("=" * 50)
-print("DEBUG: Session state at start:")
-print(f"  ticker: {st.session_state.ticker}")
-print(f"  loading: {st.session_state.loading}")
-print("=" * 50)
+# Timings of this script run, shown in the diagnostics panel
+run_timings = telemetry.start_run()
+laps = telemetry.Laps()
+telemetry.log("script_run", logging.DEBUG, ticker=st.session_state.ticker, loading=st.session_state.loading,
+              profile_path=st.session_state.profile_path)
 
-# Force flush to ensure logs appear
-import sys
-sys.stdout.flush()
-sys.stderr.flush()
+# ============================================================================
+# BACKGROUND GENERATION HELPERS
+# ============================================================================
+# Seconds between reruns while a partial profile is shown and agents are still running
+PARTIAL_REFRESH_SECONDS = 5
+# Seconds between reruns of the loading screen
+LOADING_REFRESH_SECONDS = 2
+
+def cancel_generation():
+    """Abandon this session's generation job, if any."""
+    import job_store
+    generation = st.session_state.generation
+    if generation is not None:
+        telemetry.log("generation_cancelled", company=generation['company'], job_id=generation['job_id'])
+        job_store.request_job_cancel(generation['job_id'])
+    st.session_state.generation = None
+
+def poll_generation(generation):
+    """Non-blocking check of a generation job: ('pending', None), ('success', ticker) or ('error', exc)."""
+    import job_store
+    with telemetry.timed("poll_generation"):
+        # Checking on the job also tells the worker this session still wants it
+        job_store.touch_job(generation['job_id'])
+        job = job_store.get_job(generation['job_id'])
+    if job is None:
+        return 'error', RuntimeError("Generation job not found")
+    if job['status'] in ('queued', 'running'):
+        return 'pending', None
+    if job['status'] == 'completed':
+        return 'success', job['ticker']
+    return 'error', RuntimeError(job['error'] or f"Generation job {job['status']}")
+
+def find_partial_profile(company):
+    """Path of the partial profile of the generation running for this company, if one has been published."""
+    import job_store
+    from pathlib import Path
+    from generation_status import partial_profile_path
+    running = job_store.find_running_generation(company)
+    if running is None:
+        return None
+    path = partial_profile_path(Path(running['workspace']))
+    return path if path.exists() else None
+
+# What st.experimental_user reports for everyone outside Streamlit Community Cloud
+PLACEHOLDER_USER_EMAIL = "test@example.com"
+
+def session_tenant():
+    """Who this session's research is queued for: the signed-in user, or else this browser session."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    email = st.experimental_user.get('email')
+    if email and email != PLACEHOLDER_USER_EMAIL:
+        return email
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+def auto_refresh(interval_seconds):
+    """Rerun this page every interval_seconds from the browser, without keeping the script running in between."""
+    import streamlit.components.v1 as components
+    from pathlib import Path
+    component = components.declare_component("auto_refresh", path=str(Path(__file__).parent / "components" / "auto_refresh"))
+    component(interval_ms=int(interval_seconds * 1000), key="auto_refresh", default=None)
+
+AGENT_STATUS_ICONS = {"queued": "⏸️", "running": "⏳", "preview": "🔎", "completed": "✅", "failed": "❌"}
+
+def format_elapsed(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+def show_generation_progress(company):
+    """Render the real progress of this company's generation, as recorded in the job store."""
+    from generation_status import generation_progress
+    with telemetry.timed("generation_progress"):
+        progress = generation_progress(company)
+    if progress is None:
+        st.text("Starting research agents...")
+        return
+    if 'queue_position' in progress:
+        position = progress['queue_position']
+        ahead = "next in line" if position == 1 else f"{position - 1} requests ahead"
+        st.text(f"Waiting for a free research slot ({ahead})...")
+        return
+
+    agents = progress['agents']
+    landed = sum(1 for agent in agents if agent['status'] in ('completed', 'failed'))
+    previews = sum(1 for agent in agents if agent['status'] == 'preview')
+    st.progress((landed + 0.5 * previews) / len(agents),
+                text=f"{landed} of {len(agents)} research areas done · {format_elapsed(progress['elapsed'])} elapsed")
+    for agent in agents:
+        status = agent['status']
+        detail = "waiting to start" if status == 'queued' else f"{status} · {format_elapsed(agent['elapsed'])}"
+        st.markdown(f"{AGENT_STATUS_ICONS[status]} **{agent['label']}** — {detail}")
+
+def generation_running(company):
+    """True while a generation for this company is still running, e.g. upgrading a profile published at its deadline."""
+    import job_store
+    return company is not None and job_store.find_running_generation(company) is not None
 
 # ============================================================================
 # LANDING PAGE - Company Input Form
 # ============================================================================
-if not st.session_state.ticker and not st.session_state.loading:
-    print("DEBUG: Entering LANDING PAGE section")
+if not st.session_state.ticker and not st.session_state.loading and not st.session_state.profile_path:
     st.markdown("## Company Profile Deep Research")
     st.markdown("Enter a company name to generate a comprehensive profile")
 
@@ -58,212 +160,165 @@ if not st.session_state.ticker and not st.session_state.loading:
         )
 
         def on_generate_click():
-            import sys
             company = st.session_state.company_name_input_field
-            print(f"DEBUG: Callback - Button clicked with company_name: '{company}'", file=sys.stderr)
-            print(f"DEBUG: Callback - Button clicked with company_name: '{company}'")
-            sys.stderr.flush()
             if company and company.strip():
-                print(f"DEBUG: Callback - Setting loading=True, company_name_input='{company.strip()}'", file=sys.stderr)
-                print(f"DEBUG: Callback - Setting loading=True, company_name_input='{company.strip()}'")
+                telemetry.log("generate_clicked", company=company.strip())
                 st.session_state.loading = True
                 st.session_state.company_name_input = company.strip()
-                print(f"DEBUG: Callback - Session state after setting - loading: {st.session_state.loading}, company_name_input: {st.session_state.company_name_input}", file=sys.stderr)
-                print(f"DEBUG: Callback - Session state after setting - loading: {st.session_state.loading}, company_name_input: {st.session_state.company_name_input}")
-                sys.stderr.flush()
             else:
-                print("DEBUG: Callback - Company name is empty", file=sys.stderr)
-                sys.stderr.flush()
+                telemetry.log("generate_clicked_without_company", logging.DEBUG)
 
         st.button("Generate Profile", type="primary", use_container_width=True, on_click=on_generate_click)
 
-    print("DEBUG: Calling st.stop() to end LANDING PAGE section")
+    laps.lap("page:landing")
     st.stop()
 
 # ============================================================================
 # LOADING STATE - Data Fetching
 # ============================================================================
-print(f"DEBUG: Checking LOADING STATE condition - loading: {st.session_state.loading}")
 if st.session_state.loading:
-    print("DEBUG: Entering LOADING STATE section")
-    print("DEBUG: About to import merge_sectors_data.pull_data_for_company")
-
     try:
-        from merge_sectors_data import pull_data_for_company
-        print("DEBUG: Successfully imported pull_data_for_company")
+        import job_store
+        from generation_status import GENERATION_BUDGET
     except ImportError as ie:
-        print(f"DEBUG: IMPORT ERROR: {str(ie)}")
-        import traceback
-        print(f"DEBUG: Import traceback: {traceback.format_exc()}")
+        telemetry.log("import_failed", logging.ERROR, exc_info=True, error=str(ie))
         st.error(f"Failed to import required module: {str(ie)}")
         st.session_state.loading = False
         st.stop()
     except Exception as e:
-        print(f"DEBUG: UNEXPECTED ERROR during import: {str(e)}")
-        import traceback
-        print(f"DEBUG: Import traceback: {traceback.format_exc()}")
+        telemetry.log("import_failed", logging.ERROR, exc_info=True, error=str(e))
         st.error(f"Unexpected error during import: {str(e)}")
         st.session_state.loading = False
         st.stop()
 
     # Check if company_name_input exists in session state
     if 'company_name_input' not in st.session_state:
-        print("DEBUG: ERROR - company_name_input NOT in session state!")
+        telemetry.log("loading_without_company", logging.ERROR)
         st.error("Error: Company name not found in session state")
         st.session_state.loading = False
         st.stop()
 
-    print(f"DEBUG: About to display loading UI for company: {st.session_state.company_name_input}")
     st.markdown(f"### Generating profile for {st.session_state.company_name_input}...")
     st.markdown("Our AI agents are researching financial data, supply chain, customers, and regulatory information.")
     st.markdown("**This typically takes 5-10 minutes.**")
 
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-
-    stages = [
-        ("Initializing research agents...", 0.05),
-        ("Analyzing financial data...", 0.25),
-        ("Mapping supply chain...", 0.45),
-        ("Profiling customer segments...", 0.65),
-        ("Reviewing regulatory footprint...", 0.85),
-        ("Compiling final report...", 0.95),
-    ]
+    def on_cancel_click():
+        cancel_generation()
+        st.session_state.loading = False
 
-    status_text.text(stages[0][0])
-    progress_bar.progress(stages[0][1])
+    st.button("Cancel", on_click=on_cancel_click)
 
     try:
-        print(f"DEBUG: About to call pull_data_for_company with: '{st.session_state.company_name_input}'")
-
-        # Animate progress bar while waiting to keep Streamlit alive
-        import threading
-        import queue
-
-        result_queue = queue.Queue()
-
-        # Store company name in local variable to avoid session state issues in thread
-        company_to_search = st.session_state.company_name_input
-
-        def run_pull_data():
-            try:
-                result = pull_data_for_company(company_to_search)
-                result_queue.put(('success', result))
-            except Exception as e:
-                result_queue.put(('error', e))
-
-        # Start data pulling in background thread
-        thread = threading.Thread(target=run_pull_data, daemon=True)
-        thread.start()
-
-        # Animate progress while waiting
-        current_progress = 0.05
-        progress_increment = 0.01
-        stage_index = 0
-        ticker = None
-
-        while thread.is_alive():
-            try:
-                # Check if result is ready (non-blocking)
-                result_type, result_data = result_queue.get_nowait()
-                if result_type == 'success':
-                    _, ticker = result_data
-                    break
-                elif result_type == 'error':
-                    raise result_data
-            except queue.Empty:
-                # Still waiting, update UI
-                time.sleep(0.5)
-                current_progress = min(current_progress + progress_increment, 0.90)
-                progress_bar.progress(current_progress)
-
-                # Cycle through stages
-                if current_progress > stages[min(stage_index + 1, len(stages) - 1)][1]:
-                    stage_index = min(stage_index + 1, len(stages) - 1)
-                    status_text.text(stages[stage_index][0])
-
-        # After thread finishes, get result from queue if not already retrieved
-        if ticker is None:
-            try:
-                result_type, result_data = result_queue.get(timeout=1)
-                if result_type == 'success':
-                    _, ticker = result_data
-                elif result_type == 'error':
-                    raise result_data
-            except queue.Empty:
-                print("DEBUG: Thread finished but no result in queue")
-
-        print(f"DEBUG: pull_data_for_company returned ticker: {ticker}")
+        # Research runs in the worker pool (worker.py); this session only
+        # submits the job and checks on it, so it can outlive this script run
+        if st.session_state.generation is None:
+            company_to_search = st.session_state.company_name_input
+            job_id = job_store.submit_job(company_to_search, two_tier=True, budget=GENERATION_BUDGET,
+                                          tenant=session_tenant())
+            telemetry.log("job_submitted", company=company_to_search, job_id=job_id)
+            st.session_state.generation = {"company": company_to_search, "job_id": job_id}
+
+        generation = st.session_state.generation
+
+        # Each script run checks the generation once and renders its progress;
+        # auto_refresh reruns the page instead of keeping this thread waiting
+        outcome, outcome_data = poll_generation(generation)
+        if outcome == 'error':
+            raise outcome_data
+        if outcome == 'pending':
+            # Switch to the report as soon as the first sector has been merged
+            partial_path = find_partial_profile(generation['company'])
+            if partial_path is not None:
+                telemetry.log("partial_profile_shown", company=generation['company'], path=str(partial_path))
+                st.session_state.profile_path = str(partial_path)
+                st.session_state.loading = False
+                st.rerun()
 
-        if ticker:
-            print(f"DEBUG: Ticker found: {ticker}, showing progress")
-            for stage_text, stage_progress in stages[1:]:
-                status_text.text(stage_text)
-                progress_bar.progress(stage_progress)
-                time.sleep(0.2)
+            if job_store.live_workers() == 0:
+                st.warning("No research workers are running. Start them with `python worker.py`.")
+            show_generation_progress(generation['company'])
+            auto_refresh(LOADING_REFRESH_SECONDS)
+            laps.lap("page:loading")
+            st.stop()
+        ticker = outcome_data
 
-            progress_bar.progress(1.0)
-            status_text.text("Profile ready!")
+        st.session_state.generation = None
+        st.session_state.upgrading_company = generation['company']
+        telemetry.log("generation_finished", company=generation['company'], ticker=ticker)
 
-            print(f"DEBUG: Setting ticker={ticker} and loading=False")
+        if ticker:
             st.session_state.ticker = ticker
+            st.session_state.profile_path = None
             st.session_state.loading = False
-            print(f"DEBUG: Session state after setting - ticker: {st.session_state.ticker}, loading: {st.session_state.loading}")
-            time.sleep(0.5)
-            print("DEBUG: Calling st.rerun() from success path")
             st.rerun()
         else:
-            print("DEBUG: No ticker returned, showing error")
             st.error("Failed to retrieve data for the company. Please try again.")
             st.session_state.loading = False
             if st.button("Try Again"):
                 st.rerun()
     except Exception as e:
-        print(f"DEBUG: Exception occurred: {str(e)}")
-        import traceback
-        print(f"DEBUG: Traceback: {traceback.format_exc()}")
+        telemetry.log("generation_failed", logging.ERROR, exc_info=True,
+                      company=st.session_state.company_name_input, error=str(e))
         st.error(f"An error occurred: {str(e)}")
+        st.session_state.generation = None
         st.session_state.loading = False
         if st.button("Try Again"):
             st.rerun()
 
-    print("DEBUG: Calling st.stop() to end LOADING STATE section")
     st.stop()
 
 # ============================================================================
 # LOAD DATA FROM JSON FILE
 # ============================================================================
-print("DEBUG: Reached MAIN REPORT section")
-print(f"DEBUG: ticker from session state: {st.session_state.ticker}")
+# While agents are still running, the report shows the partial profile and
+# switches to the published one once the background generation finishes
+generation_error = None
+if st.session_state.generation is not None:
+    outcome, outcome_data = poll_generation(st.session_state.generation)
+    if outcome == 'success' and outcome_data:
+        telemetry.log("generation_finished", company=st.session_state.generation['company'], ticker=outcome_data)
+        st.session_state.ticker = outcome_data
+        st.session_state.profile_path = None
+        st.session_state.upgrading_company = st.session_state.generation['company']
+        st.session_state.generation = None
+    elif outcome != 'pending':
+        telemetry.log("generation_failed", logging.ERROR, company=st.session_state.generation['company'],
+                      error=str(outcome_data))
+        generation_error = outcome_data
+        st.session_state.generation = None
+
 COMPANY_TICKER = st.session_state.ticker
 
 # COMPANY_TICKER='DELL'
 
 # Validate that ticker exists and file is available
-if not COMPANY_TICKER:
-    print("DEBUG: No ticker in session state, resetting to landing page")
+if not COMPANY_TICKER and not st.session_state.profile_path:
     st.session_state.ticker = None
     st.session_state.loading = False
     st.rerun()
 
-print(f"DEBUG: About to load JSON file: ./data/{COMPANY_TICKER}_profile.json")
+PROFILE_PATH = st.session_state.profile_path or f"./data/{COMPANY_TICKER}_profile.json"
+
 try:
-    with open(f"./data/{COMPANY_TICKER}_profile.json", 'r') as f:
-        data = json.load(f)
-    print(f"DEBUG: Successfully loaded JSON file")
+    # Shared with every session viewing this profile: read-only from here on
+    with telemetry.timed("profile_load"):
+        profile = profile_cache.load_profile(PROFILE_PATH)
+    data = profile.data
 except FileNotFoundError:
-    print(f"DEBUG: JSON file not found for ticker {COMPANY_TICKER}")
+    telemetry.log("profile_not_found", logging.WARNING, path=PROFILE_PATH)
     st.error(f"Profile data not found for {COMPANY_TICKER}. Please generate a new profile.")
     if st.button("Start New Search"):
         st.session_state.ticker = None
+        st.session_state.profile_path = None
         st.session_state.loading = False
         st.rerun()
     st.stop()
 except Exception as e:
-    print(f"DEBUG: Failed to load JSON file: {str(e)}")
+    telemetry.log("profile_load_failed", logging.ERROR, exc_info=True, path=PROFILE_PATH)
     st.error(f"Failed to load profile data: {str(e)}")
     if st.button("Start New Search"):
         st.session_state.ticker = None
+        st.session_state.profile_path = None
         st.session_state.loading = False
         st.rerun()
     st.stop()
@@ -291,15 +346,93 @@ def safe_int(value):
         return "N/A"
     return f"{int(value):,}"
 
+
+def report_section(name):
+    """
+    Render a report section as a fragment that records its render time.
+    Interacting with a widget in the section reruns only that section.
+    """
+    def decorate(render):
+        @functools.wraps(render)
+        def timed_render():
+            with telemetry.timed(f"section:{name}"):
+                render()
+        return st.fragment(timed_render)
+    return decorate
+
+def section_tabs(key, labels):
+    """Tab bar for a section. Unlike st.tabs, only the selected tab's body runs."""
+    return st.radio(key, labels, key=key, horizontal=True, label_visibility="collapsed")
+
+def show_diagnostics():
+    """Timings of this script run and of this process, and recent agent latencies from the job store."""
+    st.markdown('<div class="section-header">🩺 Diagnostics</div>', unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**This run**")
+        st.dataframe([{"Step": name, "ms": round(seconds * 1000, 1)} for name, seconds in run_timings],
+                     use_container_width=True, hide_index=True)
+    with col2:
+        st.markdown("**This app process (recent runs)**")
+        st.dataframe([{"Step": row['name'], "Count": row['count'], "p50 ms": round(row['p50_ms'], 1),
+                       "p95 ms": round(row['p95_ms'], 1), "Max ms": round(row['max_ms'], 1)}
+                      for row in telemetry.stats.summary()],
+                     use_container_width=True, hide_index=True)
+
+    st.markdown("**Recent agent runs (all workers)**")
+    import job_store
+    agent_runs = job_store.recent_run_latencies(limit=20)
+    if agent_runs:
+        st.dataframe([{"Finished": run['finished_at'], "Agent": run['agent'], "Processor": run['processor'],
+                       "Latency (s)": round(run['seconds'], 1)} for run in agent_runs],
+                     use_container_width=True, hide_index=True)
+    else:
+        st.caption("No completed agent runs recorded yet.")
+
 # ============================================================================
 # EXTRACT DATA SECTIONS
 # ============================================================================
-data_meta = data['meta']
+# A copy, since the company name may be filled in below
+data_meta = dict(data['meta'])
 data_overview = data['company_overview']
 data_financial = data['financial']
 data_supply_chain = data['supply_chain']
 data_customer_profile = data['customer_profile']
 data_regulatory_footprint = data['regulatory_footprint']
+# Tables, charts and derived lists, built once per profile version
+import profile_view
+with telemetry.timed("view_model"):
+    view = profile_view.view_for(profile)
+
+# Profiles published before all agents finish mark the missing sectors as pending
+sector_status = data_meta.get('sector_status', {})
+pending_sectors = [sector for sector, status in sector_status.items() if status in ('pending', 'late')]
+# Sectors that missed the generation's deadline and are still being researched
+late_sectors = [sector for sector, status in sector_status.items() if status == 'late']
+# Two-tier research: these sectors show fast preview results until the full run lands
+preview_sectors = [sector for sector, status in sector_status.items() if status == 'preview']
+# A profile published at its deadline is upgraded in place as its late agents land
+profile_upgrading = (st.session_state.generation is None and not data_meta.get('complete', True)
+                     and generation_running(st.session_state.upgrading_company))
+research_running = st.session_state.generation is not None or profile_upgrading
+if st.session_state.generation is not None and data_meta.get('company_name') in (None, 'Unknown Company'):
+    data_meta['company_name'] = st.session_state.generation['company']
+
+SECTOR_LABELS = {agent["name"]: agent["label"] for agent in AGENTS}
+
+def sector_pending(*sectors):
+    """True if any of the given sectors has not landed in this (partial) profile yet."""
+    return any(sector in pending_sectors for sector in sectors)
+
+def show_pending_placeholder(*sectors):
+    """Render a placeholder for a section whose research is still running."""
+    labels = ", ".join(SECTOR_LABELS.get(sector, sector) for sector in sectors if sector in pending_sectors)
+    if not research_running:
+        st.warning(f"{labels} research did not complete – this section is unavailable.")
+    elif any(sector in late_sectors for sector in sectors):
+        st.info(f"⏳ {labels} research is taking longer than expected – this section will fill in when it lands.")
+    else:
+        st.info(f"⏳ {labels} research is still running – this section will fill in automatically.")
 
 # Custom CSS for BlackRock institutional aesthetic
 st.markdown("""
@@ -349,25 +482,31 @@ st.markdown("""
         font-size: 0.875rem;
     }
 
-    /* Tabs */
-    .stTabs [data-baseweb="tab-list"] {
+    /* Section tabs (horizontal radios, see section_tabs) */
+    div[role="radiogroup"] {
         gap: 2px;
         background-color: #f1f5f9;
         padding: 0.25rem;
         border-radius: 0.375rem;
     }
 
-    .stTabs [data-baseweb="tab"] {
+    div[role="radiogroup"] label[data-baseweb="radio"] {
         height: 2.5rem;
+        margin: 0;
         background-color: transparent;
         border-radius: 0.25rem;
         color: #64748b;
         font-weight: 500;
         font-size: 0.875rem;
         padding: 0 1.5rem;
+        align-items: center;
     }
 
-    .stTabs [aria-selected="true"] {
+    div[role="radiogroup"] label[data-baseweb="radio"] > div:first-child {
+        display: none;
+    }
+
+    div[role="radiogroup"] label[data-baseweb="radio"]:has(input:checked) {
         background-color: white;
         color: #1e293b;
         box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1);
@@ -463,8 +602,11 @@ with st.sidebar:
 
     # New Research Button
     if st.button("📊 New Research", use_container_width=True):
+        cancel_generation()
         st.session_state.ticker = None
         st.session_state.loading = False
+        st.session_state.profile_path = None
+        st.session_state.upgrading_company = None
         st.rerun()
 
     st.markdown("---")
@@ -500,6 +642,10 @@ with st.sidebar:
     for section in sections:
         st.markdown(f"- {section}")
 
+    st.markdown("---")
+    st.checkbox("Show diagnostics", key="show_diagnostics",
+                help="Render timings of this page and recent agent latencies at the bottom of the report")
+
 # Modal for New Research (using expander as modal alternative)
 if st.session_state.show_modal:
     with st.container():
@@ -532,10 +678,11 @@ if st.session_state.show_modal:
 # MAIN HEADER
 # ============================================================================
 confidence_pct = data_meta['confidence_overall'] * 100 if data_meta['confidence_overall'] <= 1 else data_meta['confidence_overall']
+fiscal_year = int(data_meta['baseline_fiscal_year']) if data_meta.get('baseline_fiscal_year') is not None else "N/A"
 st.markdown(f"""
 <div class="main-header">
     <h1>🏢 {data_meta['company_name']} – Company Profile & Deep Research</h1>
-    <p>Generated on {data_meta['extraction_date']} • Confidence Score: {confidence_pct:.0f}% • Fiscal Year: FY{int(data_meta['baseline_fiscal_year'])}</p>
+    <p>Generated on {data_meta['extraction_date']} • Confidence Score: {confidence_pct:.0f}% • Fiscal Year: FY{fiscal_year}</p>
 </div>
 """, unsafe_allow_html=True)
 
@@ -548,12 +695,33 @@ with col2:
     if st.button("📊 Run Scenario Analysis"):
         st.toast("Scenario analysis coming soon")
 
+if pending_sectors:
+    ready_count = len(sector_status) - len(pending_sectors)
+    if research_running:
+        st.info(f"⏳ Partial profile: {ready_count} of {len(sector_status)} research areas ready. "
+                "Remaining sections update automatically as agents finish.")
+    else:
+        st.warning(f"Partial profile: {ready_count} of {len(sector_status)} research areas completed.")
+if preview_sectors:
+    preview_labels = ", ".join(SECTOR_LABELS.get(sector, sector) for sector in preview_sectors)
+    if research_running:
+        st.info(f"⚡ Preview data shown for: {preview_labels}. "
+                "Deeper research is still running and will replace it automatically.")
+    else:
+        st.warning(f"Preview data shown for: {preview_labels}. Deeper research did not complete for these sections.")
+if generation_error is not None:
+    st.error(f"Research did not complete: {generation_error}")
+
 st.markdown("---")
 
+laps.lap("report_setup")
+
 # ============================================================================
 # Section 1: Company Overview
 # ============================================================================
 st.markdown(f'<div class="section-header">📋 Company Overview – {data_meta["company_name"]}</div>', unsafe_allow_html=True)
+if sector_pending("financial"):
+    show_pending_placeholder("financial")
 
 # Get HQ info
 hq = data_overview.get('headquarters', {})
@@ -574,13 +742,16 @@ with col5:
 st.markdown(f"**Value Chain Position:** {data_overview.get('value_chain_position', 'N/A')}")
 st.markdown(f"**Description:** {data_overview.get('business_description', 'N/A')}")
 
+laps.lap("section:company_overview")
+
 # ============================================================================
 # Section 2: Revenue Breakdown
 # ============================================================================
 fin_baseline = data_financial['financial_baseline']
-fiscal_year = int(data_meta['baseline_fiscal_year'])
 
 st.markdown(f'<div class="section-header">💰 Revenue Breakdown (FY {fiscal_year})</div>', unsafe_allow_html=True)
+if sector_pending("financial"):
+    show_pending_placeholder("financial")
 
 col1, col2 = st.columns([1, 2])
 
@@ -591,531 +762,322 @@ with col1:
     st.metric("Net Margin", format_percentage(fin_baseline.get('net_margin'), as_decimal=True))
 
 with col2:
-    # Build revenue data from business segments
-    segments = data_financial.get('business_segments', [])
-    if segments:
-        revenue_data = pd.DataFrame({
-            'Segment': [seg['name'] for seg in segments],
-            'Revenue': [seg.get('revenue_usd_millions', 0) / 1000 for seg in segments],  # Convert to billions
-            'Percentage': [seg.get('revenue_percent', 0) for seg in segments]
-        })
-
-        fig = px.pie(revenue_data, values='Revenue', names='Segment',
-                     title='Revenue by Segment ($B)',
-                     color_discrete_sequence=['#1e40af', '#3b82f6', '#93c5fd', '#60a5fa'],
-                     hole=0.4)
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        fig.update_layout(height=350)
-        st.plotly_chart(fig, use_container_width=True)
+    if view.segment_revenue_pie is not None:
+        st.plotly_chart(view.segment_revenue_pie, use_container_width=True)
+
+laps.lap("section:revenue_breakdown")
 
 # ============================================================================
 # Section 3: Business Segments
 # ============================================================================
 st.markdown('<div class="section-header">📊 Business Segments Analysis</div>', unsafe_allow_html=True)
+if sector_pending("financial"):
+    show_pending_placeholder("financial")
 
-segments = data_financial.get('business_segments', [])
-if segments:
-    segments_df = pd.DataFrame({
-        'Segment': [seg['name'] for seg in segments],
-        'Revenue ($B)': [seg.get('revenue_usd_millions', 0) / 1000 for seg in segments],
-        'YoY Growth (%)': [seg.get('yoy_growth_percent', 0) for seg in segments],
-        'Margin (%)': [seg.get('operating_margin_percent', 0) for seg in segments]
-    })
-
+if view.segments is not None:
     col1, col2 = st.columns([2, 1])
 
     with col1:
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=segments_df['Segment'],
-            y=segments_df['Revenue ($B)'],
-            name='Revenue ($B)',
-            marker_color='#1e40af'
-        ))
-        fig.update_layout(
-            title='Revenue by Business Segment',
-            xaxis_title='',
-            yaxis_title='Revenue ($B)',
-            height=350,
-            showlegend=False
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(view.segment_revenue_bar, use_container_width=True)
 
     with col2:
-        st.dataframe(segments_df, use_container_width=True, hide_index=True)
+        st.dataframe(view.segments, use_container_width=True, hide_index=True)
 
     # Segment descriptions
-    for seg in segments:
+    for seg in data_financial.get('business_segments', []):
         with st.expander(f"📄 {seg['name']} Details"):
             st.markdown(seg.get('description', 'No description available.'))
 
+laps.lap("section:business_segments")
+
 # ============================================================================
 # Section 4: Geographic Exposure
 # ============================================================================
-st.markdown('<div class="section-header">🌍 Geographic Exposure</div>', unsafe_allow_html=True)
-
-geo_tabs = st.tabs(["Revenue Distribution", "Manufacturing Footprint", "Key Facilities"])
-
-with geo_tabs[0]:
-    st.markdown(f"**Revenue by Geography (FY {fiscal_year})**")
-
-    regions = data_financial.get('revenue_by_region', [])
-    has_region_data = regions and any(
-        (r.get('revenue_usd_millions') or 0) > 0 or (r.get('percent_of_total') or 0) > 0
-        for r in regions
-    )
+@report_section("geographic_exposure")
+def render_geographic_exposure():
+    st.markdown('<div class="section-header">🌍 Geographic Exposure</div>', unsafe_allow_html=True)
+
+    geo_tab = section_tabs("geo_section_tab", ["Revenue Distribution", "Manufacturing Footprint", "Key Facilities"])
+
+    if geo_tab == "Revenue Distribution":
+        st.markdown(f"**Revenue by Geography (FY {fiscal_year})**")
+        if sector_pending("financial"):
+            show_pending_placeholder("financial")
+
+        regions = data_financial.get('revenue_by_region', [])
+        if view.regions is not None:
+            col1, col2 = st.columns([3, 2])
+
+            with col1:
+                st.plotly_chart(view.region_pie, use_container_width=True)
+
+            with col2:
+                st.markdown("##### Regional Breakdown")
+                for _, row in view.regions.iterrows():
+                    growth = row['YoY Growth']
+                    growth_str = f"↑ {growth:.0f}%" if growth and growth > 0 else (f"↓ {abs(growth):.0f}%" if growth and growth < 0 else "")
+                    growth_color = "green" if growth and growth > 0 else ("red" if growth and growth < 0 else "gray")
+
+                    st.markdown(f"""
+                    **{row['Region']}**
+                    💰 ${row['Revenue ($B)']:.1f}B ({row['Percentage']:.0f}%)
+                    <span style="color:{growth_color}">{growth_str}</span>
+                    """, unsafe_allow_html=True)
+                    st.progress(row['Percentage'] / 100)
+        else:
+            customer_chars = data_customer_profile.get('customer_characteristics', {})
+            if isinstance(customer_chars, list):
+                customer_chars = {}
+            geo_notes = customer_chars.get('geographic_notes', '')
+            if geo_notes:
+                st.info(f"📍 **Geographic Distribution:** {geo_notes}")
+
+            if regions:
+                region_names = [r.get('region', 'N/A') for r in regions]
+                st.markdown(f"**Regions Covered:** {' • '.join(region_names)}")
+            else:
+                st.info("Detailed regional revenue breakdown not available in current data.")
 
-    if has_region_data:
-        geo_revenue_df = pd.DataFrame([
-            {
-                'Region': r.get('region', 'N/A'),
-                'Revenue ($B)': (r.get('revenue_usd_millions') or 0) / 1000,
-                'Percentage': r.get('percent_of_total') or 0,
-                'YoY Growth': r.get('yoy_growth_percent')
-            }
-            for r in regions
-        ])
-        geo_revenue_df = geo_revenue_df.sort_values('Percentage', ascending=False)
+    elif geo_tab == "Manufacturing Footprint":
+        st.markdown("**Manufacturing & Assembly Locations**")
+        if sector_pending("supply_chain"):
+            show_pending_placeholder("supply_chain")
 
-        col1, col2 = st.columns([3, 2])
+        if view.manufacturing is not None:
+            st.dataframe(view.manufacturing, use_container_width=True, hide_index=True)
+            st.plotly_chart(view.facilities_by_country_pie, use_container_width=True)
 
-        with col1:
-            fig = px.pie(
-                geo_revenue_df,
-                values='Percentage',
-                names='Region',
-                title='Revenue Distribution by Region',
-                color_discrete_sequence=px.colors.qualitative.Set2,
-                hole=0.4
-            )
-            fig.update_traces(textposition='outside', textinfo='label+percent')
-            fig.update_layout(height=350, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+    elif geo_tab == "Key Facilities":
+        st.markdown("**Contract Manufacturers & Partners**")
+        if sector_pending("supply_chain"):
+            show_pending_placeholder("supply_chain")
 
-        with col2:
-            st.markdown("##### Regional Breakdown")
-            for _, row in geo_revenue_df.iterrows():
-                growth = row['YoY Growth']
-                growth_str = f"↑ {growth:.0f}%" if growth and growth > 0 else (f"↓ {abs(growth):.0f}%" if growth and growth < 0 else "")
-                growth_color = "green" if growth and growth > 0 else ("red" if growth and growth < 0 else "gray")
+        if view.cm_facilities is not None:
+            st.dataframe(view.cm_facilities, use_container_width=True, hide_index=True)
 
-                st.markdown(f"""
-                **{row['Region']}**
-                💰 ${row['Revenue ($B)']:.1f}B ({row['Percentage']:.0f}%)
-                <span style="color:{growth_color}">{growth_str}</span>
-                """, unsafe_allow_html=True)
-                st.progress(row['Percentage'] / 100)
-    else:
-        customer_chars = data_customer_profile.get('customer_characteristics', {})
-        if isinstance(customer_chars, list):
-            customer_chars = {}
-        geo_notes = customer_chars.get('geographic_notes', '')
-        if geo_notes:
-            st.info(f"📍 **Geographic Distribution:** {geo_notes}")
-
-        if regions:
-            region_names = [r.get('region', 'N/A') for r in regions]
-            st.markdown(f"**Regions Covered:** {' • '.join(region_names)}")
-        else:
-            st.info("Detailed regional revenue breakdown not available in current data.")
-
-with geo_tabs[1]:
-    st.markdown("**Manufacturing & Assembly Locations**")
-
-    facilities = data_supply_chain.get('company_owned_facilities', [])
-    if facilities:
-        manufacturing_df = pd.DataFrame({
-            'Location': [f"{f['city']}, {f['country']}" for f in facilities],
-            'Region Served': [f.get('region_served', 'N/A') for f in facilities],
-            'Type': [', '.join(f.get('roles', [])).title() for f in facilities],
-            'Primary Products': [f.get('products', 'N/A')[:60] + '...' if len(f.get('products', '')) > 60 else f.get('products', 'N/A') for f in facilities]
-        })
-
-        st.dataframe(manufacturing_df, use_container_width=True, hide_index=True)
-
-        # Pie chart by country
-        country_counts = pd.Series([f['country'] for f in facilities]).value_counts()
-        fig = px.pie(values=country_counts.values, names=country_counts.index,
-                     title='Facilities by Country',
-                     color_discrete_sequence=px.colors.qualitative.Set2)
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
-
-with geo_tabs[2]:
-    st.markdown("**Contract Manufacturers & Partners**")
-
-    cms = data_supply_chain.get('contract_manufacturers', [])
-    if cms:
-        facilities_df = pd.DataFrame({
-            'Manufacturer': [cm['manufacturer_name'] for cm in cms],
-            'HQ Country': [cm.get('headquarters_country', 'N/A') for cm in cms],
-            'Type': [cm.get('relationship_type', 'N/A').upper() for cm in cms],
-            'Production Locations': [', '.join(cm.get('production_countries', []))[:40] + '...' if len(', '.join(cm.get('production_countries', []))) > 40 else ', '.join(cm.get('production_countries', [])) for cm in cms],
-            'Dependency': [cm.get('dependency_level', 'N/A').capitalize() for cm in cms]
-        })
-
-        st.dataframe(facilities_df, use_container_width=True, hide_index=True)
+render_geographic_exposure()
 
 # ============================================================================
 # Section 5: Customer Profile
 # ============================================================================
-st.markdown('<div class="section-header">👥 Customer Profile</div>', unsafe_allow_html=True)
-
-cust_tabs = st.tabs(["Segment Mix", "Top Customers", "Industry Exposure", "Customer Characteristics"])
-
-with cust_tabs[0]:
-    st.markdown("**Customer Segment Mix**")
-
-    segment_mix = data_customer_profile.get('segment_mix', {})
-    if isinstance(segment_mix, list):
-        segment_mix = {}
-    if segment_mix:
-        col1, col2 = st.columns([1, 1])
+@report_section("customer_profile")
+def render_customer_profile():
+    st.markdown('<div class="section-header">👥 Customer Profile</div>', unsafe_allow_html=True)
+    if sector_pending("customers_markets"):
+        show_pending_placeholder("customers_markets")
+
+    cust_tab = section_tabs("customer_section_tab", ["Segment Mix", "Top Customers", "Industry Exposure", "Customer Characteristics"])
+
+    if cust_tab == "Segment Mix":
+        st.markdown("**Customer Segment Mix**")
+
+        segment_mix = data_customer_profile.get('segment_mix', {})
+        if isinstance(segment_mix, list):
+            segment_mix = {}
+        if segment_mix:
+            col1, col2 = st.columns([1, 1])
+
+            with col1:
+                st.plotly_chart(view.segment_mix_pie, use_container_width=True)
+
+            with col2:
+                st.metric("B2B (Business)", f"{segment_mix.get('b2b_percent', 0):.1f}%")
+                st.metric("B2C (Consumer)", f"{segment_mix.get('b2c_percent', 0):.1f}%")
+                st.metric("B2G (Government)", f"{segment_mix.get('b2g_percent', 0):.1f}%")
+
+                if segment_mix.get('notes'):
+                    with st.expander("📋 Methodology Notes"):
+                        st.markdown(segment_mix['notes'])
+
+    elif cust_tab == "Top Customers":
+        st.markdown("**Customer Concentration & Top Customers**")
+
+        # Customer concentration metrics
+        cust_conc = data_customer_profile.get('customer_concentration', {})
+        if cust_conc:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                conc_level = cust_conc.get('concentration_level', 'N/A')
+                level_color = "#10b981" if conc_level.lower() == 'low' else "#f59e0b" if conc_level.lower() == 'medium' else "#ef4444"
+                st.markdown(f"""
+                <div style="padding: 1rem; background: white; border: 1px solid #e2e8f0; border-radius: 0.5rem; text-align: center;">
+                    <div style="font-size: 0.875rem; color: #64748b;">Concentration Level</div>
+                    <div style="font-size: 1.5rem; font-weight: 700; color: {level_color};">{conc_level.upper()}</div>
+                </div>
+                """, unsafe_allow_html=True)
+            with col2:
+                st.metric("Top Customer %", f"{cust_conc.get('top_customer_percent') or 0:.1f}%")
+            with col3:
+                st.metric("Top 10 Customers %", f"{cust_conc.get('top_10_customers_percent') or 0:.1f}%")
 
-        with col1:
-            mix_data = pd.DataFrame({
-                'Segment': ['B2B (Business)', 'B2C (Consumer)', 'B2G (Government)'],
-                'Percentage': [
-                    segment_mix.get('b2b_percent', 0),
-                    segment_mix.get('b2c_percent', 0),
-                    segment_mix.get('b2g_percent', 0)
-                ]
-            })
-
-            fig = px.pie(mix_data, values='Percentage', names='Segment',
-                         title='Revenue by Customer Segment',
-                         color_discrete_sequence=['#1e40af', '#3b82f6', '#93c5fd'],
-                         hole=0.4)
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            fig.update_layout(height=350)
-            st.plotly_chart(fig, use_container_width=True)
+            if not cust_conc.get('any_customer_over_10_percent'):
+                st.success("✅ No single customer exceeds 10% of revenue - well-diversified customer base")
+            else:
+                st.warning("⚠️ One or more customers exceed 10% of revenue")
+
+        # Top customers table
+        st.markdown("**Top Customers**")
+        top_customers = data_customer_profile.get('top_customers', [])
+        if top_customers:
+            st.dataframe(view.top_customers, use_container_width=True, hide_index=True)
+
+            # Customer details
+            for cust in top_customers:
+                if cust.get('notes'):
+                    with st.expander(f"📄 {cust['name']} Details"):
+                        st.markdown(cust['notes'])
+
+    elif cust_tab == "Industry Exposure":
+        st.markdown("**Industry Exposure**")
+
+        industries = data_customer_profile.get('industry_exposure', [])
+        if industries:
+            col1, col2 = st.columns([1, 1])
+
+            with col1:
+                st.plotly_chart(view.industry_bar, use_container_width=True)
+
+            with col2:
+                st.dataframe(view.industries, use_container_width=True, hide_index=True)
+
+                # Legend
+                st.markdown("""
+                **Trend Legend:**
+                - 🟢 Growing
+                - 🔵 Stable
+                - 🔴 Declining
+                """)
+
+        # Industry notes
+        for ind in industries:
+            if ind.get('notes'):
+                with st.expander(f"📄 {ind['industry']} Notes"):
+                    st.markdown(ind['notes'])
+
+    elif cust_tab == "Customer Characteristics":
+        st.markdown("**Customer Characteristics**")
+
+        chars = data_customer_profile.get('customer_characteristics', {})
+        if isinstance(chars, list):
+            chars = {}
+        if chars:
+            col1, col2 = st.columns(2)
+
+            with col1:
+                if chars.get('typical_contract_length'):
+                    st.markdown("**📅 Typical Contract Length**")
+                    st.info(chars['typical_contract_length'])
+
+                if chars.get('geographic_notes'):
+                    st.markdown("**🌍 Geographic Distribution**")
+                    st.info(chars['geographic_notes'])
+
+            with col2:
+                if chars.get('recurring_vs_transactional'):
+                    st.markdown("**💰 Revenue Model (Recurring vs Transactional)**")
+                    st.info(chars['recurring_vs_transactional'])
+
+render_customer_profile()
 
-        with col2:
-            st.metric("B2B (Business)", f"{segment_mix.get('b2b_percent', 0):.1f}%")
-            st.metric("B2C (Consumer)", f"{segment_mix.get('b2c_percent', 0):.1f}%")
-            st.metric("B2G (Government)", f"{segment_mix.get('b2g_percent', 0):.1f}%")
+# ============================================================================
+# Section 6: Supply Chain Dependencies
+# ============================================================================
+@report_section("supply_chain")
+def render_supply_chain():
+    st.markdown('<div class="section-header">🔗 Supply Chain Dependencies</div>', unsafe_allow_html=True)
+    if sector_pending("supply_chain"):
+        show_pending_placeholder("supply_chain")
 
-            if segment_mix.get('notes'):
-                with st.expander("📋 Methodology Notes"):
-                    st.markdown(segment_mix['notes'])
+    supply_tab = section_tabs("supply_section_tab", ["Critical Suppliers", "Contract Manufacturers", "Component Analysis"])
 
-with cust_tabs[1]:
-    st.markdown("**Customer Concentration & Top Customers**")
+    if supply_tab == "Critical Suppliers":
+        st.markdown("**Top Critical Suppliers**")
 
-    # Customer concentration metrics
-    cust_conc = data_customer_profile.get('customer_concentration', {})
-    if cust_conc:
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            conc_level = cust_conc.get('concentration_level', 'N/A')
-            level_color = "#10b981" if conc_level.lower() == 'low' else "#f59e0b" if conc_level.lower() == 'medium' else "#ef4444"
-            st.markdown(f"""
-            <div style="padding: 1rem; background: white; border: 1px solid #e2e8f0; border-radius: 0.5rem; text-align: center;">
-                <div style="font-size: 0.875rem; color: #64748b;">Concentration Level</div>
-                <div style="font-size: 1.5rem; font-weight: 700; color: {level_color};">{conc_level.upper()}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        with col2:
-            st.metric("Top Customer %", f"{cust_conc.get('top_customer_percent') or 0:.1f}%")
-        with col3:
-            st.metric("Top 10 Customers %", f"{cust_conc.get('top_10_customers_percent') or 0:.1f}%")
+        if view.suppliers is not None:
+            st.dataframe(view.suppliers, use_container_width=True, hide_index=True)
 
-        if not cust_conc.get('any_customer_over_10_percent'):
-            st.success("✅ No single customer exceeds 10% of revenue - well-diversified customer base")
-        else:
-            st.warning("⚠️ One or more customers exceed 10% of revenue")
-
-    # Top customers table
-    st.markdown("**Top Customers**")
-    top_customers = data_customer_profile.get('top_customers', [])
-    if top_customers:
-        cust_df = pd.DataFrame({
-            'Customer': [c.get('name', 'N/A') for c in top_customers],
-            'Industry': [c.get('industry') or 'N/A' for c in top_customers],
-            'Type': [(c.get('type') or 'N/A').capitalize() for c in top_customers],
-            'Revenue %': [f"{c.get('percent_of_revenue') or 0:.2f}%" for c in top_customers]
-        })
-        st.dataframe(cust_df, use_container_width=True, hide_index=True)
-
-        # Customer details
-        for cust in top_customers:
-            if cust.get('notes'):
-                with st.expander(f"📄 {cust['name']} Details"):
-                    st.markdown(cust['notes'])
-
-with cust_tabs[2]:
-    st.markdown("**Industry Exposure**")
-
-    industries = data_customer_profile.get('industry_exposure', [])
-    if industries:
-        col1, col2 = st.columns([1, 1])
+            # Warning about high dependency suppliers
+            if view.high_dependency_suppliers:
+                supplier_names = ', '.join(view.high_dependency_suppliers[:3])
+                st.warning(f"⚠️ **Key Dependencies:** High dependency on {supplier_names}. Critical for supply chain resilience.")
 
-        with col1:
-            ind_df = pd.DataFrame({
-                'Industry': [ind['industry'] for ind in industries],
-                'Revenue %': [ind.get('percent_of_revenue', 0) for ind in industries],
-                'Trend': [ind.get('trend', 'N/A').capitalize() for ind in industries]
-            })
-
-            # Color by trend
-            colors = []
-            for ind in industries:
-                trend = ind.get('trend', '').lower()
-                if trend == 'growing':
-                    colors.append('#10b981')
-                elif trend == 'declining':
-                    colors.append('#ef4444')
-                else:
-                    colors.append('#3b82f6')
-
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=ind_df['Industry'],
-                y=ind_df['Revenue %'],
-                marker_color=colors,
-                text=ind_df['Trend'],
-                textposition='outside'
-            ))
-            fig.update_layout(
-                title='Revenue by Industry Vertical',
-                xaxis_title='',
-                yaxis_title='Revenue %',
-                height=400,
-                xaxis_tickangle=-45,
-                showlegend=False
-            )
-            st.plotly_chart(fig, use_container_width=True)
+    elif supply_tab == "Contract Manufacturers":
+        st.markdown("**Contract Manufacturers (ODM/OEM Partners)**")
 
-        with col2:
-            st.dataframe(ind_df, use_container_width=True, hide_index=True)
-
-            # Legend
-            st.markdown("""
-            **Trend Legend:**
-            - 🟢 Growing
-            - 🔵 Stable
-            - 🔴 Declining
-            """)
-
-    # Industry notes
-    for ind in industries:
-        if ind.get('notes'):
-            with st.expander(f"📄 {ind['industry']} Notes"):
-                st.markdown(ind['notes'])
-
-with cust_tabs[3]:
-    st.markdown("**Customer Characteristics**")
-
-    chars = data_customer_profile.get('customer_characteristics', {})
-    if isinstance(chars, list):
-        chars = {}
-    if chars:
-        col1, col2 = st.columns(2)
+        if view.contract_manufacturers is not None:
+            st.dataframe(view.contract_manufacturers, use_container_width=True, hide_index=True)
 
-        with col1:
-            if chars.get('typical_contract_length'):
-                st.markdown("**📅 Typical Contract Length**")
-                st.info(chars['typical_contract_length'])
+    elif supply_tab == "Component Analysis":
+        st.markdown("**Component Sourcing Analysis**")
 
-            if chars.get('geographic_notes'):
-                st.markdown("**🌍 Geographic Distribution**")
-                st.info(chars['geographic_notes'])
+        # Suppliers grouped by component category
+        if view.components is not None:
+            st.dataframe(view.components, use_container_width=True, hide_index=True)
 
-        with col2:
-            if chars.get('recurring_vs_transactional'):
-                st.markdown("**💰 Revenue Model (Recurring vs Transactional)**")
-                st.info(chars['recurring_vs_transactional'])
+        # Supply chain concentration notes
+        concentration = data_supply_chain.get('supplier_concentration', {})
+        if concentration.get('concentration_notes'):
+            st.info(f"📋 {concentration['concentration_notes']}")
 
-# ============================================================================
-# Section 6: Supply Chain Dependencies
-# ============================================================================
-st.markdown('<div class="section-header">🔗 Supply Chain Dependencies</div>', unsafe_allow_html=True)
-
-supply_tabs = st.tabs(["Critical Suppliers", "Contract Manufacturers", "Component Analysis"])
-
-with supply_tabs[0]:
-    st.markdown("**Top Critical Suppliers**")
-
-    suppliers = data_supply_chain.get('critical_suppliers', [])
-    if suppliers:
-        suppliers_df = pd.DataFrame({
-            'Supplier': [s['supplier_name'] for s in suppliers],
-            'Component': [s.get('provides', s.get('component_category', 'N/A')) for s in suppliers],
-            'HQ Country': [s.get('headquarters_country', 'N/A') for s in suppliers],
-            'Dependency': [s.get('dependency_level', 'N/A').capitalize() for s in suppliers],
-            'Manufacturing Locations': [', '.join(s.get('manufacturing_locations', []))[:30] + '...' if len(', '.join(s.get('manufacturing_locations', []))) > 30 else ', '.join(s.get('manufacturing_locations', [])) for s in suppliers]
-        })
-
-        st.dataframe(suppliers_df, use_container_width=True, hide_index=True)
-
-        # Warning about high dependency suppliers
-        high_dep = [s for s in suppliers if s.get('dependency_level') == 'high']
-        if high_dep:
-            supplier_names = ', '.join([s['supplier_name'] for s in high_dep[:3]])
-            st.warning(f"⚠️ **Key Dependencies:** High dependency on {supplier_names}. Critical for supply chain resilience.")
-
-with supply_tabs[1]:
-    st.markdown("**Contract Manufacturers (ODM/OEM Partners)**")
-
-    cms = data_supply_chain.get('contract_manufacturers', [])
-    if cms:
-        cm_df = pd.DataFrame({
-            'Manufacturer': [cm['manufacturer_name'] for cm in cms],
-            'Location': [f"{cm.get('headquarters_country', 'N/A')}" for cm in cms],
-            'Products': [', '.join(cm.get('products_manufactured', []))[:40] + '...' if len(', '.join(cm.get('products_manufactured', []))) > 40 else ', '.join(cm.get('products_manufactured', [])) for cm in cms],
-            'Relationship': [cm.get('relationship_type', 'N/A').upper() for cm in cms],
-            'Dependency': [cm.get('dependency_level', 'N/A').capitalize() for cm in cms]
-        })
-
-        st.dataframe(cm_df, use_container_width=True, hide_index=True)
-
-with supply_tabs[2]:
-    st.markdown("**Component Sourcing Analysis**")
-
-    # Group suppliers by component category
-    suppliers = data_supply_chain.get('critical_suppliers', [])
-    if suppliers:
-        categories = {}
-        for s in suppliers:
-            cat = s.get('component_category', 'Other')
-            if cat not in categories:
-                categories[cat] = []
-            categories[cat].append(s['supplier_name'])
-
-        components_df = pd.DataFrame({
-            'Component Category': list(categories.keys()),
-            'Primary Suppliers': [', '.join(sups[:3]) for sups in categories.values()],
-            'Supplier Count': [len(sups) for sups in categories.values()],
-            'Concentration': ['High' if len(sups) <= 2 else 'Medium' if len(sups) <= 4 else 'Low' for sups in categories.values()]
-        })
-
-        st.dataframe(components_df, use_container_width=True, hide_index=True)
-
-    # Supply chain concentration notes
-    concentration = data_supply_chain.get('supplier_concentration', {})
-    if concentration.get('concentration_notes'):
-        st.info(f"📋 {concentration['concentration_notes']}")
+render_supply_chain()
 
 # ============================================================================
 # Section 6: Concentration & Risk Flags
 # ============================================================================
-st.markdown('<div class="section-header">⚠️ Concentration & Risk Analysis</div>', unsafe_allow_html=True)
-
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("**Supplier Concentration Risks**")
-
-    # Generate risks from data
-    suppliers = data_supply_chain.get('critical_suppliers', [])
-    cms = data_supply_chain.get('contract_manufacturers', [])
+@report_section("concentration_risk")
+def render_concentration_risk():
+    st.markdown('<div class="section-header">⚠️ Concentration & Risk Analysis</div>', unsafe_allow_html=True)
+    if sector_pending("financial", "supply_chain", "customers_markets"):
+        show_pending_placeholder("financial", "supply_chain", "customers_markets")
 
-    risk_data = []
+    col1, col2 = st.columns(2)
 
-    # CPU/GPU supplier risk
-    cpu_gpu = [s for s in suppliers if s.get('component_category') in ['CPU', 'GPU'] and s.get('dependency_level') == 'high']
-    if cpu_gpu:
-        risk_data.append(("CPU/GPU Supplier Dependency", "High", f"High dependency on {', '.join([s['supplier_name'] for s in cpu_gpu[:2]])}"))
-
-    # Memory supplier risk
-    memory = [s for s in suppliers if s.get('component_category') == 'memory' and s.get('dependency_level') == 'high']
-    if memory:
-        risk_data.append(("Memory Supply Concentration", "Medium", f"Top {len(memory)} memory suppliers with high dependency"))
+    with col1:
+        st.markdown("**Supplier Concentration Risks**")
 
-    # Taiwan exposure
-    taiwan_cms = [cm for cm in cms if cm.get('headquarters_country') == 'Taiwan']
-    if len(taiwan_cms) >= 3:
-        risk_data.append(("Taiwan Geopolitical Risk", "High", f"Significant ODM/CM exposure in Taiwan ({len(taiwan_cms)} manufacturers)"))
+        for item, level, desc in view.supplier_risks:
+            risk_class = "risk-high" if level == "High" else "risk-medium"
+            st.markdown(f"""
+            <div style="padding: 0.75rem; background: white; border: 1px solid #e2e8f0; border-radius: 0.375rem; margin-bottom: 0.75rem;">
+                <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;">
+                    <strong style="font-size: 0.875rem; color: #1e293b;">{item}</strong>
+                    <span class="{risk_class}">{level}</span>
+                </div>
+                <div style="font-size: 0.8125rem; color: #64748b;">{desc}</div>
+            </div>
+            """, unsafe_allow_html=True)
 
-    # Single source risks
-    single_source = [s for s in suppliers if s.get('single_source') == True]
-    if single_source:
-        risk_data.append(("Single Source Components", "High", f"{len(single_source)} components with single-source suppliers"))
+    with col2:
+        st.markdown("**Geographic & Operational Risks**")
 
-    for item, level, desc in risk_data:
-        risk_class = "risk-high" if level == "High" else "risk-medium"
-        st.markdown(f"""
-        <div style="padding: 0.75rem; background: white; border: 1px solid #e2e8f0; border-radius: 0.375rem; margin-bottom: 0.75rem;">
-            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;">
-                <strong style="font-size: 0.875rem; color: #1e293b;">{item}</strong>
-                <span class="{risk_class}">{level}</span>
+        for item, level, desc in view.geo_risks:
+            risk_class = "risk-high" if level == "High" else ("risk-medium" if level == "Medium" else "risk-low")
+            st.markdown(f"""
+            <div style="padding: 0.75rem; background: white; border: 1px solid #e2e8f0; border-radius: 0.375rem; margin-bottom: 0.75rem;">
+                <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;">
+                    <strong style="font-size: 0.875rem; color: #1e293b;">{item}</strong>
+                    <span class="{risk_class}">{level}</span>
+                </div>
+                <div style="font-size: 0.8125rem; color: #64748b;">{desc}</div>
             </div>
-            <div style="font-size: 0.8125rem; color: #64748b;">{desc}</div>
-        </div>
-        """, unsafe_allow_html=True)
+            """, unsafe_allow_html=True)
 
-with col2:
-    st.markdown("**Geographic & Operational Risks**")
-
-    geo_risks = []
-
-    # China manufacturing exposure
-    facilities = data_supply_chain.get('company_owned_facilities', [])
-    china_facilities = [f for f in facilities if f.get('country') == 'China']
-    if china_facilities:
-        geo_risks.append(("China Manufacturing Exposure", "High" if len(china_facilities) >= 2 else "Medium", f"{len(china_facilities)} facilities in China; geopolitical tensions impact"))
-
-    # Customer concentration
-    cust_conc = data_customer_profile.get('customer_concentration', {})
-    conc_level = cust_conc.get('concentration_level') or 'N/A'
-    top_cust_pct = cust_conc.get('top_customer_percent') or 0
-    if conc_level.lower() == 'low':
-        geo_risks.append(("Revenue Concentration", "Low", f"Well-diversified: largest customer ~{top_cust_pct:.1f}% of revenue"))
-    elif conc_level.lower() == 'high':
-        geo_risks.append(("Revenue Concentration", "High", f"Top customer represents {top_cust_pct:.1f}% of revenue"))
-
-    # Balance sheet risk
-    bs_strength = fin_baseline.get('balance_sheet_strength') or 'N/A'
-    debt_to_equity = fin_baseline.get('debt_to_equity') or 0
-    if bs_strength.lower() == 'weak':
-        geo_risks.append(("Balance Sheet Strength", "High", f"Weak balance sheet (D/E: {debt_to_equity:.1f})"))
-    elif bs_strength.lower() == 'moderate':
-        geo_risks.append(("Balance Sheet Strength", "Medium", f"Moderate balance sheet strength"))
-
-    for item, level, desc in geo_risks:
-        risk_class = "risk-high" if level == "High" else ("risk-medium" if level == "Medium" else "risk-low")
-        st.markdown(f"""
-        <div style="padding: 0.75rem; background: white; border: 1px solid #e2e8f0; border-radius: 0.375rem; margin-bottom: 0.75rem;">
-            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;">
-                <strong style="font-size: 0.875rem; color: #1e293b;">{item}</strong>
-                <span class="{risk_class}">{level}</span>
-            </div>
-            <div style="font-size: 0.8125rem; color: #64748b;">{desc}</div>
-        </div>
-        """, unsafe_allow_html=True)
+render_concentration_risk()
 
 # ============================================================================
 # Key Takeaways
 # ============================================================================
-st.markdown('<div class="section-header">💡 Key Takeaways & Strategic Considerations</div>', unsafe_allow_html=True)
+@report_section("key_takeaways")
+def render_key_takeaways():
+    st.markdown('<div class="section-header">💡 Key Takeaways & Strategic Considerations</div>', unsafe_allow_html=True)
+    if pending_sectors:
+        show_pending_placeholder(*pending_sectors)
 
-# Generate takeaways from data
-takeaways = []
+    # Display takeaways
+    for i, takeaway in enumerate(view.takeaways, 1):
+        st.markdown(f"{i}. {takeaway}")
 
-# Segment growth
-segments = data_financial.get('business_segments', [])
-growing_segments = [s for s in segments if s.get('yoy_growth_percent', 0) > 10]
-if growing_segments:
-    top_growth = max(growing_segments, key=lambda x: x.get('yoy_growth_percent', 0))
-    takeaways.append(f"**Strong Segment Growth:** {top_growth['name']} growing {top_growth.get('yoy_growth_percent', 0):.0f}% YoY")
-
-# Supply chain initiatives
-initiatives = data_supply_chain.get('supply_chain_initiatives', [])
-if initiatives:
-    takeaways.append(f"**Supply Chain Diversification:** {len(initiatives)} active initiatives including {initiatives[0].get('initiative', 'N/A')}")
-
-# Customer diversification
-cust_conc = data_customer_profile.get('customer_concentration', {})
-if not cust_conc.get('any_customer_over_10_percent'):
-    takeaways.append("**Customer Diversification:** No single customer exceeds 10% of revenue - well-diversified base")
-
-# Geographic exposure
-if china_facilities:
-    takeaways.append(f"**Geographic Risk:** {len(china_facilities)} manufacturing facilities in China; consider China+1 strategy")
-
-# Display takeaways
-for i, takeaway in enumerate(takeaways, 1):
-    st.markdown(f"{i}. {takeaway}")
+render_key_takeaways()
 
 # ============================================================================
 # FOOTER
@@ -1127,3 +1089,11 @@ st.markdown(f"""
     Data sources: {data_meta.get('data_freshness_note', 'Company filings, industry reports')} • Confidence Score: {confidence_pct:.0f}%
 </div>
 """, unsafe_allow_html=True)
+
+if st.session_state.get('show_diagnostics'):
+    show_diagnostics()
+
+# Keep re-rendering the partial profile until the background generation finishes,
+# and a profile published at its deadline until its late agents have landed
+if research_running:
+    auto_refresh(PARTIAL_REFRESH_SECONDS)
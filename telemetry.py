@@ -0,0 +1,189 @@
+"""
+Structured logging and timing for the app and the workers.
+
+Events are a name plus fields, logged through the standard logging module:
+    telemetry.log("job_submitted", company=company, job_id=job_id)
+
+The console gets one line per event at LOG_LEVEL (INFO by default). Events
+at LOG_JSONL_LEVEL (INFO by default) are also appended as JSON lines to
+LOG_JSONL_PATH (data/logs/events.jsonl, empty to disable). The app and the
+workers share the file; it is rotated at LOG_JSONL_MAX_BYTES, keeping
+LOG_JSONL_BACKUPS old files, and reopened when another process rotated it.
+
+timed() measures a block on a hot path. The duration is logged at DEBUG, so
+by default it reaches neither the console nor the JSONL log (every script
+run records a dozen). It also goes to this process's rolling stats and to
+the timings of the current script run, both of which the app's diagnostics
+panel shows.
+"""
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+import json
+import logging
+import logging.handlers
+import os
+import statistics
+import threading
+import time
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_JSONL_PATH = os.getenv("LOG_JSONL_PATH", "data/logs/events.jsonl")
+LOG_JSONL_LEVEL = os.getenv("LOG_JSONL_LEVEL", "INFO").upper()
+LOG_JSONL_MAX_BYTES = int(os.getenv("LOG_JSONL_MAX_BYTES", 20 * 1024 * 1024))
+LOG_JSONL_BACKUPS = int(os.getenv("LOG_JSONL_BACKUPS", 3))
+
+# Samples kept per timing name for the rolling stats
+TIMING_WINDOW = 500
+
+logger = logging.getLogger("company_profile")
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+            "pid": record.process,
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{key}={value}" for key, value in getattr(record, "fields", {}).items())
+        line = f"{self.formatTime(record, '%H:%M:%S')} {record.levelname:<7} {record.getMessage()} {fields}".rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class SharedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """A RotatingFileHandler for a file several processes append to: reopens it once another process rotated it"""
+
+    def _open(self):
+        stream = super()._open()
+        stat = os.fstat(stream.fileno())
+        self._identity = (stat.st_dev, stat.st_ino)
+        return stream
+
+    def shouldRollover(self, record) -> bool:
+        if self.stream is not None:
+            try:
+                stat = os.stat(self.baseFilename)
+                rotated = (stat.st_dev, stat.st_ino) != self._identity
+            except FileNotFoundError:
+                rotated = True
+            if rotated:
+                self.stream.close()
+                self.stream = self._open()
+        return super().shouldRollover(record)
+
+
+_configure_lock = threading.Lock()
+
+
+def configure():
+    """Attach the console and JSONL handlers, once per process"""
+    with _configure_lock:
+        if logger.handlers:
+            return
+        logger.propagate = False
+        console = logging.StreamHandler()
+        console.setLevel(LOG_LEVEL)
+        console.setFormatter(ConsoleFormatter())
+        logger.addHandler(console)
+        if LOG_JSONL_PATH:
+            Path(LOG_JSONL_PATH).parent.mkdir(parents=True, exist_ok=True)
+            jsonl = SharedRotatingFileHandler(LOG_JSONL_PATH, maxBytes=LOG_JSONL_MAX_BYTES,
+                                              backupCount=LOG_JSONL_BACKUPS)
+            jsonl.setLevel(LOG_JSONL_LEVEL)
+            jsonl.setFormatter(JsonLinesFormatter())
+            logger.addHandler(jsonl)
+        # Records below every handler's level aren't even created
+        logger.setLevel(min(handler.level for handler in logger.handlers))
+
+
+def log(event: str, level: int = logging.INFO, exc_info: bool = False, **fields):
+    """Log an event with structured fields"""
+    if not logger.handlers:
+        configure()
+    if logger.isEnabledFor(level):
+        logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+
+class TimingStats:
+    """Rolling durations of this process, per timing name"""
+
+    def __init__(self, window: int = TIMING_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self._samples[name].append(seconds)
+
+    def summary(self) -> list[dict]:
+        """count, p50, p95 and max (in ms) per name, slowest p95 first"""
+        with self._lock:
+            samples = {name: sorted(durations) for name, durations in self._samples.items()}
+        rows = []
+        for name, durations in samples.items():
+            rows.append({
+                "name": name,
+                "count": len(durations),
+                "p50_ms": statistics.median(durations) * 1000,
+                "p95_ms": durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000,
+                "max_ms": durations[-1] * 1000,
+            })
+        return sorted(rows, key=lambda row: row["p95_ms"], reverse=True)
+
+
+stats = TimingStats()
+
+# Timings of the script run (or generation) in progress in this context
+_run_timings: ContextVar[list | None] = ContextVar("run_timings", default=None)
+
+
+def start_run() -> list:
+    """Start collecting the (name, seconds) timings of a new script run"""
+    timings = []
+    _run_timings.set(timings)
+    return timings
+
+
+def record_timing(name: str, seconds: float, **fields):
+    stats.record(name, seconds)
+    timings = _run_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+    log("timing", logging.DEBUG, name=name, ms=round(seconds * 1000, 2), **fields)
+
+
+@contextmanager
+def timed(name: str, **fields):
+    """Record how long the block takes, including when it exits with an exception (e.g. st.stop())"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - started, **fields)
+
+
+class Laps:
+    """Timings of consecutive stretches of a script, without wrapping each in a block"""
+
+    def __init__(self):
+        self._last = time.perf_counter()
+
+    def lap(self, name: str, **fields):
+        """Record the time since the previous lap (or since this Laps was created)"""
+        now = time.perf_counter()
+        record_timing(name, now - self._last, **fields)
+        self._last = now
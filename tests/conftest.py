@@ -0,0 +1,20 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Set before the app modules read them at import time
+os.environ.setdefault("PARALLEL_API_KEY", "test-key")
+os.environ["LOG_JSONL_PATH"] = ""
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A fresh, empty job store for the test"""
+    import job_store
+    monkeypatch.setattr(job_store, "DB_PATH", tmp_path / "jobs.db")
+    return job_store
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+
+import merge_sectors_data
+
+
+@pytest.fixture
+def generation(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(merge_sectors_data, "DATA_DIR", tmp_path)
+    store.create_generation("gen1", "Acme", tmp_path / "gen1")
+    return "gen1"
+
+
+def test_profile_published_at_the_deadline_is_shared_across_processes(store, generation):
+    assert merge_sectors_data.find_upgrading_profile("Acme") is None
+
+    merge_sectors_data.publish_profile({"meta": {"complete": False}}, "ACME")
+    store.mark_generation_published(generation, "ACME")
+
+    assert merge_sectors_data.find_upgrading_profile(" acme ") == ({"meta": {"complete": False}}, "ACME")
+
+
+def test_profile_of_a_dead_generation_is_not_shared(store, generation):
+    merge_sectors_data.publish_profile({}, "ACME")
+    store.mark_generation_published(generation, "ACME")
+    stale = (datetime.now() - store.STALE_AFTER * 2).isoformat(timespec="seconds")
+    with store._connect() as conn:
+        conn.execute("UPDATE generations SET heartbeat_at = ?", (stale,))
+
+    assert merge_sectors_data.find_upgrading_profile("Acme") is None
+
+
+def test_finished_generation_is_not_upgrading(store, generation):
+    merge_sectors_data.publish_profile({}, "ACME")
+    store.mark_generation_published(generation, "ACME")
+    store.finish_generation(generation, "completed", "ACME")
+
+    assert merge_sectors_data.find_upgrading_profile("Acme") is None
+
+
+def test_published_profile_does_not_follow_later_sector_updates():
+    sector_status = {"financial": "completed", "supply_chain": "late"}
+    section_tiers = {"financial": {"tier": "full", "processor": "ultra"}}
+    profile, _, _ = merge_sectors_data.merge_sectors_data({"financial": {}}, sector_status, section_tiers)
+
+    sector_status["supply_chain"] = "completed"
+    section_tiers["supply_chain"] = {"tier": "full", "processor": "ultra"}
+
+    assert profile["meta"]["sector_status"]["supply_chain"] == "late"
+    assert "supply_chain" not in profile["meta"]["section_tiers"]
+    assert profile["meta"]["complete"] is False
@@ -0,0 +1,139 @@
+from datetime import datetime
+
+import pytest
+
+
+def make_stale(store, table, key_column, key, column="heartbeat_at"):
+    stale = (datetime.now() - store.STALE_AFTER * 2).isoformat(timespec="seconds")
+    with store._connect() as conn:
+        conn.execute(f"UPDATE {table} SET {column} = ? WHERE {key_column} = ?", (stale, key))
+
+
+def test_jobs_are_claimed_once_oldest_first(store):
+    first = store.submit_job("Acme", two_tier=True, budget=None)
+    second = store.submit_job("Globex", two_tier=True, budget=None)
+    store.worker_heartbeat("w1")
+    store.worker_heartbeat("w2")
+
+    assert store.claim_job("w1")["job_id"] == first
+    assert store.claim_job("w2")["job_id"] == second
+    assert store.claim_job("w1") is None
+    assert store.get_job(first)["worker"] == "w1"
+
+
+def test_job_of_a_dead_worker_is_claimed_again(store):
+    job_id = store.submit_job("Acme", two_tier=True, budget=None)
+    store.worker_heartbeat("w1")
+    store.worker_heartbeat("w2")
+    assert store.claim_job("w1")["job_id"] == job_id
+    assert store.claim_job("w2") is None
+
+    make_stale(store, "workers", "worker_id", "w1")
+    claimed = store.claim_job("w2")
+    assert claimed["job_id"] == job_id and claimed["worker"] == "w2"
+
+
+def test_orphaned_generation_is_claimed_by_one_process(store, tmp_path):
+    store.create_generation("gen1", "Acme", tmp_path)
+    assert store.find_orphaned_generations() == []
+
+    make_stale(store, "generations", "generation_id", "gen1")
+    orphans = store.find_orphaned_generations("  ACME ")
+    assert [generation["generation_id"] for generation in orphans] == ["gen1"]
+    assert store.claim_generation(orphans[0]) is True
+    # The heartbeat moved on, so a second claim from the same snapshot loses
+    assert store.claim_generation(orphans[0]) is False
+    assert store.find_orphaned_generations() == []
+
+
+def test_agent_run_keeps_its_run_id_when_only_the_status_changes(store):
+    store.record_agent_run("gen1", "financial", "run_1", "running")
+    store.record_agent_run("gen1", "financial", None, "completed")
+    run = store.get_agent_runs("gen1")["financial"]
+    assert (run["run_id"], run["status"]) == ("run_1", "completed")
+
+
+def test_replacement_run_gets_its_own_creation_time(store):
+    store.record_agent_run("gen1", "financial", "run_1", "running")
+    with store._connect() as conn:
+        conn.execute("UPDATE agent_runs SET created_at = '2020-01-01T00:00:00'")
+    store.record_agent_run("gen1", "financial", None, "failed")
+    assert store.get_agent_runs("gen1")["financial"]["created_at"] == "2020-01-01T00:00:00"
+
+    store.record_agent_run("gen1", "financial", "run_2", "running")
+    run = store.get_agent_runs("gen1")["financial"]
+    assert run["run_id"] == "run_2" and run["created_at"] > "2020-01-01T00:00:00"
+
+
+@pytest.fixture
+def enqueue(store):
+    def enqueue(ticket_id, priority="interactive", tenant="t1"):
+        store.enqueue_ticket(ticket_id, f"Company {ticket_id}", priority, tenant)
+        return ticket_id
+    return enqueue
+
+
+def test_admission_respects_capacity(store, enqueue):
+    tickets = [enqueue(f"i{n}") for n in range(3)]
+    positions = store.admit_tickets(tickets, capacity=2, batch_capacity=2)
+    assert positions["i0"] == positions["i1"] == 0 and positions["i2"] > 0
+    # Admitted tickets keep their slot on the next sweep
+    assert store.admit_tickets(tickets, capacity=2, batch_capacity=2) == {"i0": 0, "i1": 0, "i2": 1}
+
+    store.release_ticket("i0")
+    assert store.admit_tickets(["i1", "i2"], capacity=2, batch_capacity=2) == {"i1": 0, "i2": 0}
+
+
+def test_interactive_tickets_go_before_batch(store, enqueue):
+    batch = enqueue("b1", priority="batch")
+    interactive = enqueue("i1")
+    positions = store.admit_tickets([batch, interactive], capacity=1, batch_capacity=1)
+    assert positions[interactive] == 0
+    assert positions[batch] > 0
+
+
+def test_batch_tickets_leave_the_reserved_slots_free(store, enqueue):
+    batch = [enqueue(f"b{n}", priority="batch") for n in range(3)]
+    positions = store.admit_tickets(batch, capacity=3, batch_capacity=1)
+    assert list(positions.values()).count(0) == 1
+
+    interactive = [enqueue("i1"), enqueue("i2")]
+    assert store.admit_tickets(interactive, capacity=3, batch_capacity=1) == {"i1": 0, "i2": 0}
+
+
+def test_tenants_with_fewer_admitted_tickets_go_first(store, enqueue):
+    store.admit_tickets([enqueue("a1", tenant="a")], capacity=2, batch_capacity=2)
+    waiting = [enqueue("a2", tenant="a"), enqueue("b1", tenant="b")]
+    positions = store.admit_tickets(waiting, capacity=2, batch_capacity=2)
+    assert positions["b1"] == 0 and positions["a2"] > 0
+
+
+def test_stale_tickets_are_dropped(store, enqueue):
+    enqueue("i1")
+    make_stale(store, "queue_tickets", "ticket_id", "i1")
+    assert store.queue_position("Company i1") is None
+    assert store.admit_tickets(["i1"], capacity=1, batch_capacity=1) == {"i1": None}
+
+
+def test_queue_position_follows_admission_order(store, enqueue):
+    enqueue("b1", priority="batch")
+    enqueue("i1")
+    assert store.queue_position("company i1") == 1
+    assert store.queue_position("Company b1") == 2
+    assert store.queue_position("Unknown") is None
+
+
+def test_webhook_statuses_are_taken_once(store):
+    store.record_webhook_status("run_1", "completed")
+    store.record_webhook_status("run_2", None)
+    assert store.take_webhook_statuses(["run_1", "run_2", "run_3"]) == {"run_1": "completed", "run_2": None}
+    assert store.take_webhook_statuses(["run_1"]) == {}
+
+
+def test_recent_run_latencies_are_newest_first(store):
+    store.record_run_latency("financial", "ultra", 812.4)
+    with store._connect() as conn:
+        conn.execute("UPDATE run_latencies SET finished_at = '2020-01-01T00:00:00'")
+    store.record_run_latency("supply_chain", "base", 95.2)
+    latencies = store.recent_run_latencies(limit=1)
+    assert [(run["agent"], run["seconds"]) for run in latencies] == [("supply_chain", 95.2)]
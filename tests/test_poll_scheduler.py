@@ -0,0 +1,25 @@
+import poll_scheduler
+
+
+def test_backs_off_without_history():
+    schedule = poll_scheduler.PollSchedule([1.0])
+    delays = [schedule.next_delay(0, polls) for polls in range(3)]
+    assert delays == sorted(delays) and delays[0] == poll_scheduler.DEFAULT_FIRST_INTERVAL
+
+
+def test_polls_around_the_learned_latencies():
+    schedule = poll_scheduler.PollSchedule([100.0] * 9 + [300.0])
+    assert schedule.next_delay(0, 0) == poll_scheduler.MAX_POLL_INTERVAL
+    assert schedule.next_delay(90, 1) == 10
+    # Past the usual latency, wait for the stragglers
+    assert schedule.next_delay(150, 2) == poll_scheduler.MAX_POLL_INTERVAL
+
+
+def test_overdue_runs_are_polled_in_proportion_to_their_age():
+    schedule = poll_scheduler.PollSchedule([100.0] * poll_scheduler.MIN_SAMPLES)
+    assert schedule.next_delay(200, 5) == 200 * poll_scheduler.OVERDUE_FRACTION
+
+
+def test_delays_stay_within_bounds():
+    schedule = poll_scheduler.PollSchedule([10.0] * 20)
+    assert schedule.next_delay(9.9, 1) == poll_scheduler.MIN_POLL_INTERVAL
@@ -0,0 +1,25 @@
+from functools import cached_property
+from pathlib import Path
+import json
+
+import pytest
+
+import profile_view
+
+ROOT = Path(__file__).resolve().parent.parent
+PROFILES = sorted(ROOT.glob("data_*/*_profile.json"))
+VIEWS = [name for name, value in vars(profile_view.ProfileView).items()
+         if isinstance(value, cached_property) and not name.startswith("_")]
+
+
+@pytest.mark.parametrize("path", PROFILES, ids=lambda path: f"{path.parent.name}/{path.name}")
+def test_every_view_builds(path):
+    view = profile_view.ProfileView(json.loads(path.read_text()))
+    for name in VIEWS:
+        getattr(view, name)
+
+
+def test_missing_sections_build_empty_views():
+    view = profile_view.ProfileView({"financial": None})
+    assert view.segments is None and view.regions is None and view.top_customers is None
+    assert view.high_dependency_suppliers == [] and view.china_facilities == []
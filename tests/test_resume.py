@@ -0,0 +1,147 @@
+"""Resuming a generation's agent runs from the job store after a crash"""
+from types import SimpleNamespace
+import asyncio
+
+import pytest
+
+import merge_sectors_data
+import poll_scheduler
+import result_cache
+import webhooks
+from pararell_agents import registry
+from pararell_agents.registry import AGENTS
+
+AGENT = AGENTS[0]
+
+
+class FakeTaskRuns:
+    """Task runs of the Parallel API: created runs complete at once, existing ones keep the status set here"""
+
+    def __init__(self):
+        self.statuses = {}
+        self.created = []
+        self.polled = []
+
+    async def create(self, input, processor, task_spec):
+        run_id = f"run_new_{len(self.created)}"
+        self.created.append(run_id)
+        self.statuses[run_id] = "completed"
+        return SimpleNamespace(run_id=run_id)
+
+    async def retrieve(self, run_id):
+        self.polled.append(run_id)
+        return SimpleNamespace(status=self.statuses[run_id])
+
+    async def result(self, run_id):
+        return SimpleNamespace(output=SimpleNamespace(content={"run_id": run_id}))
+
+
+@pytest.fixture
+def task_runs(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(webhooks, "WEBHOOK_URL", None)
+    monkeypatch.setattr(poll_scheduler, "MIN_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(poll_scheduler, "DEFAULT_FIRST_INTERVAL", 0.01)
+    return FakeTaskRuns()
+
+
+@pytest.fixture
+def workspace(store, tmp_path):
+    workspace = tmp_path / "gen1"
+    workspace.mkdir()
+    store.create_generation(workspace.name, "Acme", workspace)
+    return workspace
+
+
+def record_runs(store, task_runs, workspace):
+    """Runs of every agent submitted before the crash, completed remotely since"""
+    for agent in AGENTS:
+        run_id = f"run_{agent['name']}"
+        store.record_agent_run(workspace.name, agent["name"], run_id, "running")
+        task_runs.statuses[run_id] = "completed"
+
+
+def run_agents(task_runs, workspace, semaphore=None):
+    client = SimpleNamespace(task_run=task_runs)
+    done = {}
+
+    async def run():
+        return await merge_sectors_data.run_all_agents(
+            client, "Acme", workspace, async_client=client, semaphore=semaphore,
+            use_cache=False, on_agent_done=lambda name, status, tier, content: done.update({name: content}))
+
+    assert all(asyncio.run(run()))
+    return done
+
+
+def test_running_runs_are_reattached(store, task_runs, workspace):
+    record_runs(store, task_runs, workspace)
+
+    done = run_agents(task_runs, workspace)
+
+    assert task_runs.created == []
+    assert done == {agent["name"]: {"run_id": f"run_{agent['name']}"} for agent in AGENTS}
+    runs = store.get_agent_runs(workspace.name)
+    assert {run["status"] for run in runs.values()} == {"completed"}
+    assert registry.load_result(AGENT, workspace) == {"run_id": f"run_{AGENT['name']}"}
+
+
+def test_completed_agent_is_read_from_its_archive(store, task_runs, workspace):
+    record_runs(store, task_runs, workspace)
+    store.record_agent_run(workspace.name, AGENT["name"], None, "completed")
+    merge_sectors_data.write_json_atomic(registry.result_path(AGENT, workspace), {"archived": True})
+
+    done = run_agents(task_runs, workspace)
+
+    assert done[AGENT["name"]] == {"archived": True}
+    assert f"run_{AGENT['name']}" not in task_runs.polled
+    assert task_runs.created == []
+
+
+def test_unreadable_archive_fetches_the_completed_run_again(store, task_runs, workspace):
+    record_runs(store, task_runs, workspace)
+    store.record_agent_run(workspace.name, AGENT["name"], None, "completed")
+    registry.result_path(AGENT, workspace).write_text('{"business_segments": [')
+
+    done = run_agents(task_runs, workspace)
+
+    assert done[AGENT["name"]] == {"run_id": f"run_{AGENT['name']}"}
+    assert task_runs.created == []
+    assert registry.load_result(AGENT, workspace) == {"run_id": f"run_{AGENT['name']}"}
+
+
+def test_failed_run_is_replaced(store, task_runs, workspace):
+    record_runs(store, task_runs, workspace)
+    store.record_agent_run(workspace.name, AGENT["name"], None, "failed")
+
+    done = run_agents(task_runs, workspace)
+
+    assert task_runs.created == ["run_new_0"]
+    assert done[AGENT["name"]] == {"run_id": "run_new_0"}
+    assert f"run_{AGENT['name']}" not in task_runs.polled
+    assert store.get_agent_runs(workspace.name)[AGENT["name"]]["run_id"] == "run_new_0"
+
+
+def test_running_hedge_is_raced_again(store, task_runs, workspace):
+    record_runs(store, task_runs, workspace)
+    task_runs.statuses[f"run_{AGENT['name']}"] = "running"
+    store.record_agent_run(workspace.name, f"{AGENT['name']}:hedge", "run_hedge", "running")
+    task_runs.statuses["run_hedge"] = "completed"
+
+    done = run_agents(task_runs, workspace)
+
+    assert done[AGENT["name"]] == {"run_id": "run_hedge"}
+    assert task_runs.created == []
+    assert store.get_agent_runs(workspace.name)[f"{AGENT['name']}:hedge"]["status"] == "completed"
+
+
+def test_hedge_without_a_free_slot_is_dropped(store, task_runs, workspace):
+    record_runs(store, task_runs, workspace)
+    store.record_agent_run(workspace.name, f"{AGENT['name']}:hedge", "run_hedge", "running")
+    task_runs.statuses["run_hedge"] = "completed"
+
+    # The agent's own run holds the only slot
+    done = run_agents(task_runs, workspace, semaphore=asyncio.Semaphore(1))
+
+    assert done[AGENT["name"]] == {"run_id": f"run_{AGENT['name']}"}
+    assert "run_hedge" not in task_runs.polled
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+import scheduler
+import upstream
+
+
+@pytest.fixture(autouse=True)
+def slots(store, monkeypatch):
+    monkeypatch.setattr(scheduler, "MAX_CONCURRENT_GENERATIONS", 2)
+    monkeypatch.setattr(scheduler, "INTERACTIVE_RESERVED_SLOTS", 1)
+    monkeypatch.setattr(scheduler, "ADMISSION_CHECK_INTERVAL", 0.02)
+
+
+async def hold(company, entered, release, priority="interactive"):
+    upstream.priority.set(priority)
+    async with scheduler.admission(company):
+        entered.append(company)
+        await release.wait()
+
+
+def test_generations_wait_for_a_free_slot(store):
+    async def scenario():
+        entered, release = [], asyncio.Event()
+        holders = [asyncio.create_task(hold(company, entered, release)) for company in ("A", "B", "C")]
+        await asyncio.sleep(0.2)
+        assert len(entered) == 2
+        assert scheduler.queue_position([c for c in "ABC" if c not in entered][0]) == 1
+
+        release.set()
+        await asyncio.wait_for(asyncio.gather(*holders), timeout=5)
+        assert sorted(entered) == ["A", "B", "C"]
+
+    asyncio.run(scenario())
+    with store._connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM queue_tickets").fetchone()[0] == 0
+
+
+def test_batch_generations_leave_the_reserved_slot_to_interactive_ones():
+    async def scenario():
+        entered, release = [], asyncio.Event()
+        holders = [asyncio.create_task(hold(company, entered, release, priority="batch"))
+                   for company in ("batch A", "batch B")]
+        await asyncio.sleep(0.2)
+        assert len(entered) == 1
+
+        holders.append(asyncio.create_task(hold("interactive", entered, release)))
+        await asyncio.sleep(0.2)
+        assert "interactive" in entered and len(entered) == 2
+        release.set()
+        await asyncio.wait_for(asyncio.gather(*holders), timeout=5)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_while_queued(store):
+    async def scenario():
+        entered, release = [], asyncio.Event()
+        holders = [asyncio.create_task(hold(company, entered, release)) for company in ("A", "B")]
+        await asyncio.sleep(0.2)
+
+        with pytest.raises(scheduler.AdmissionCancelled):
+            async with scheduler.admission("C", cancelled=lambda: True):
+                pass
+        assert scheduler.queue_position("C") is None
+        release.set()
+        await asyncio.gather(*holders)
+
+    asyncio.run(scenario())
@@ -0,0 +1,25 @@
+import logging
+
+import telemetry
+
+
+def record(message):
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+
+def test_log_file_is_rotated_and_reopened_by_every_process(tmp_path):
+    path = tmp_path / "events.jsonl"
+    # Two processes appending to the same file
+    first, second = (telemetry.SharedRotatingFileHandler(path, maxBytes=100, backupCount=2) for _ in range(2))
+    try:
+        for n in range(5):
+            first.emit(record(f"first {n} " + "x" * 20))
+        assert (tmp_path / "events.jsonl.1").exists()
+
+        # The second one writes to the new file, not to the one rotated away
+        second.emit(record("second"))
+        assert "second" in path.read_text()
+        assert len(list(tmp_path.iterdir())) <= 3
+    finally:
+        first.close()
+        second.close()
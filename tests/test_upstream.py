@@ -0,0 +1,129 @@
+import asyncio
+
+import httpx
+import parallel
+import pytest
+
+import upstream
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = upstream.CircuitBreaker(failure_threshold=2, reset_seconds=0)
+    monkeypatch.setattr(upstream, "breaker", breaker)
+    return breaker
+
+
+@pytest.fixture
+def bucket():
+    return upstream.TokenBucket("test", rate=1000, capacity=1000)
+
+
+def open_circuit(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert breaker.opened_at is not None
+
+
+async def ok():
+    return "ok"
+
+
+def test_half_open_lets_a_single_trial_through(breaker):
+    open_circuit(breaker)
+    assert breaker.check() is True
+    with pytest.raises(upstream.CircuitOpenError):
+        breaker.check()
+    breaker.record_success()
+    assert breaker.check() is False
+
+
+def test_failed_trial_reopens_the_circuit(breaker):
+    open_circuit(breaker)
+    breaker.check()
+    breaker.record_failure()
+    assert not breaker.trial_in_flight
+    assert breaker.opened_at is not None
+
+
+def test_cancelled_trial_is_released(breaker, bucket):
+    open_circuit(breaker)
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(3600)
+
+        trial = asyncio.create_task(upstream.call_async(bucket, hang))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        return await upstream.call_async(bucket, ok)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert breaker.opened_at is None and not breaker.trial_in_flight
+
+
+def test_trial_cancelled_while_waiting_for_a_token_is_released(breaker):
+    open_circuit(breaker)
+    empty = upstream.TokenBucket("empty", rate=0.001, capacity=1)
+    empty.tokens = 0
+
+    async def scenario():
+        trial = asyncio.create_task(upstream.call_async(empty, ok))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(scenario())
+    assert not breaker.trial_in_flight
+    assert breaker.check() is True
+
+
+def test_client_error_closes_the_circuit(breaker, bucket):
+    open_circuit(breaker)
+
+    def rejected():
+        request = httpx.Request("POST", "https://api.parallel.ai/v1/tasks/runs")
+        raise parallel.BadRequestError("400", response=httpx.Response(400, request=request), body=None)
+
+    with pytest.raises(parallel.APIStatusError):
+        upstream.call(bucket, rejected)
+    assert breaker.opened_at is None and not breaker.trial_in_flight
+
+
+def test_local_error_leaves_the_circuit_open(breaker, bucket):
+    open_circuit(breaker)
+
+    def broken():
+        raise KeyError("task_spec")
+
+    with pytest.raises(KeyError):
+        upstream.call(bucket, broken)
+    assert breaker.opened_at is not None and not breaker.trial_in_flight
+    assert breaker.failures == breaker.failure_threshold
+
+
+def test_batch_callers_leave_the_interactive_reserve():
+    bucket = upstream.TokenBucket("test", rate=0.001, capacity=4)
+    token = upstream.priority.set("batch")
+    try:
+        taken = [bucket._take() == 0 for _ in range(4)]
+    finally:
+        upstream.priority.reset(token)
+    assert taken == [True, True, True, False]
+    assert bucket._take() == 0
+    assert bucket._take() > 0
+
+
+def test_throttling_slows_down_and_recovers(bucket):
+    for _ in range(10):
+        bucket.slow_down()
+    assert bucket.rate == bucket.base_rate * upstream.MIN_RATE_FRACTION
+    for _ in range(20):
+        bucket.speed_up()
+    assert bucket.rate == bucket.base_rate
@@ -0,0 +1,28 @@
+import asyncio
+
+import webhooks
+
+
+def test_statuses_of_other_processes_runs_are_not_kept():
+    assert webhooks.notify("run_elsewhere", "completed") is False
+    assert "run_elsewhere" not in webhooks._statuses
+
+
+def test_status_of_a_watched_run_is_kept_until_it_is_done():
+    with webhooks.watching("run_1"):
+        assert webhooks.notify("run_1", "running") is True
+        assert asyncio.run(webhooks.wait_for_status("run_1", timeout=1)) == "running"
+        assert webhooks.notify("run_1", "completed") is True
+    assert "run_1" not in webhooks._statuses and "run_1" not in webhooks._watched
+    assert webhooks.notify("run_1", "completed") is False
+
+
+def test_waiter_is_woken_up():
+    async def scenario():
+        waiting = asyncio.create_task(webhooks.wait_for_status("run_2", timeout=5))
+        await asyncio.sleep(0.01)
+        assert webhooks.notify("run_2", "completed") is True
+        return await waiting
+
+    assert asyncio.run(scenario()) == "completed"
+    assert "run_2" not in webhooks._statuses
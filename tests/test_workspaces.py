@@ -0,0 +1,23 @@
+import os
+import time
+
+import merge_sectors_data
+
+
+def test_expired_workspaces_of_finished_generations_are_pruned(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(merge_sectors_data, "RUNS_DIR", tmp_path / "runs")
+    expired = time.time() - (merge_sectors_data.WORKSPACE_RETENTION_DAYS + 1) * 86400
+    workspaces = {}
+    for name in ("finished", "running", "recent"):
+        workspaces[name] = merge_sectors_data.RUNS_DIR / name
+        workspaces[name].mkdir(parents=True)
+        store.create_generation(name, "Acme", workspaces[name])
+        if name != "recent":
+            os.utime(workspaces[name], (expired, expired))
+    store.finish_generation("finished", "completed", "ACME")
+    store.finish_generation("recent", "completed", "ACME")
+
+    new = merge_sectors_data.create_run_workspace()
+
+    assert new.is_dir()
+    assert sorted(path.name for path in merge_sectors_data.RUNS_DIR.iterdir()) == sorted(["running", "recent", new.name])
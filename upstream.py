@@ -0,0 +1,240 @@
+"""
+Guards around calls to the Parallel API.
+
+Every task creation and status poll in this process goes through a shared
+token bucket (one for creates, one for polls), so bursts of batch work are
+smoothed out instead of getting the API key throttled. A slice of each
+bucket is reserved for interactive callers: code running with
+priority set to "batch" only takes a token while the reserve is untouched.
+
+Throttling (429) and server errors (5xx, connection failures) are retried
+with exponential backoff, honouring Retry-After, and halve the bucket's rate,
+which then recovers gradually on success. After BREAKER_THRESHOLD such
+failures in a row the circuit breaker opens and calls fail fast with
+CircuitOpenError for BREAKER_RESET_SECONDS, after which a single trial call
+decides whether it closes again.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+
+from parallel import APIConnectionError, APIStatusError, InternalServerError, RateLimitError
+
+import telemetry
+
+CREATE_RATE = float(os.getenv("PARALLEL_CREATE_RATE", 2))  # task creations per second
+CREATE_BURST = int(os.getenv("PARALLEL_CREATE_BURST", 10))
+POLL_RATE = float(os.getenv("PARALLEL_POLL_RATE", 10))  # status/result calls per second
+POLL_BURST = int(os.getenv("PARALLEL_POLL_BURST", 20))
+
+# Share of each bucket that batch callers leave for interactive ones
+INTERACTIVE_RESERVE = 0.25
+
+# Throttled buckets never drop below this share of their configured rate
+MIN_RATE_FRACTION = 0.1
+
+MAX_RETRIES = 4
+BACKOFF_BASE = 1  # seconds
+BACKOFF_MAX = 60  # seconds
+
+BREAKER_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30
+
+TRANSIENT_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+
+# "interactive" or "batch"; asyncio tasks and to_thread calls inherit it
+priority = contextvars.ContextVar("upstream_priority", default="interactive")
+
+
+class CircuitOpenError(Exception):
+    """The Parallel API is considered degraded, so the call was not attempted"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Parallel API circuit is open, retry in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    def __init__(self, name: str, rate: float, capacity: int):
+        self.name = name
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token and return 0, or return how long to wait before trying again"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            floor = self.capacity * INTERACTIVE_RESERVE if priority.get() == "batch" else 0
+            if self.tokens - 1 >= floor:
+                self.tokens -= 1
+                return 0
+            return (floor + 1 - self.tokens) / self.rate
+
+    def acquire(self):
+        while (wait := self._take()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while (wait := self._take()) > 0:
+            await asyncio.sleep(wait)
+
+    def slow_down(self):
+        with self._lock:
+            self.rate = max(self.base_rate * MIN_RATE_FRACTION, self.rate / 2)
+        telemetry.log("upstream_throttled", logging.WARNING, bucket=self.name, rate=round(self.rate, 2))
+
+    def speed_up(self):
+        if self.rate < self.base_rate:
+            with self._lock:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def check(self) -> bool:
+        """Raise CircuitOpenError unless a call may go through; True if it is the half-open trial"""
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            retry_in = self.opened_at + self.reset_seconds - time.monotonic()
+            if retry_in > 0 or self.trial_in_flight:
+                raise CircuitOpenError(max(retry_in, 0))
+            # Half-open: let a single trial call through
+            self.trial_in_flight = True
+            return True
+
+    def release_trial(self):
+        """Give up a trial call that ended without a verdict (e.g. cancelled), so another may try"""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                telemetry.log("circuit_closed")
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            should_open = self.trial_in_flight or self.failures >= self.failure_threshold
+            self.trial_in_flight = False
+            if should_open:
+                if self.opened_at is None:
+                    telemetry.log("circuit_opened", logging.ERROR, failures=self.failures, reset_seconds=self.reset_seconds)
+                self.opened_at = time.monotonic()
+
+
+creates = TokenBucket("create", CREATE_RATE, CREATE_BURST)
+polls = TokenBucket("poll", POLL_RATE, POLL_BURST)
+breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_RESET_SECONDS)
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return min(BACKOFF_MAX, float(retry_after))
+    except (TypeError, ValueError):
+        return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1)
+
+
+def _on_failure(bucket: TokenBucket, error: Exception, attempt: int) -> float | None:
+    """Record a transient failure; return how long to back off, or None to give up"""
+    breaker.record_failure()
+    bucket.slow_down()
+    if attempt >= MAX_RETRIES:
+        return None
+    delay = _retry_delay(error, attempt)
+    telemetry.log("upstream_retry", logging.WARNING, bucket=bucket.name, error=type(error).__name__,
+                  delay=round(delay, 1), attempt=attempt)
+    return delay
+
+
+def _on_success(bucket: TokenBucket):
+    breaker.record_success()
+    bucket.speed_up()
+
+
+def call(bucket: TokenBucket, fn, *args, **kwargs):
+    """Rate-limited, retried, circuit-broken call of a blocking client method"""
+    attempt = 0
+    while True:
+        trial = breaker.check()
+        try:
+            bucket.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except TRANSIENT_ERRORS as e:
+                trial = False
+                delay = _on_failure(bucket, e, attempt)
+                if delay is None:
+                    raise
+            except APIStatusError:
+                # The API answered (with a 4xx), so it is up even if the call was rejected
+                trial = False
+                breaker.record_success()
+                raise
+            else:
+                trial = False
+                _on_success(bucket)
+                return result
+        finally:
+            # No verdict from the API: interrupted (KeyboardInterrupt, ...) or
+            # failed locally (e.g. a bug building the request)
+            if trial:
+                breaker.release_trial()
+        time.sleep(delay)
+        attempt += 1
+
+
+async def call_async(bucket: TokenBucket, fn, *args, **kwargs):
+    """Rate-limited, retried, circuit-broken call of an async client method"""
+    attempt = 0
+    while True:
+        trial = breaker.check()
+        try:
+            await bucket.acquire_async()
+            try:
+                result = await fn(*args, **kwargs)
+            except TRANSIENT_ERRORS as e:
+                trial = False
+                delay = _on_failure(bucket, e, attempt)
+                if delay is None:
+                    raise
+            except APIStatusError:
+                # The API answered (with a 4xx), so it is up even if the call was rejected
+                trial = False
+                breaker.record_success()
+                raise
+            else:
+                trial = False
+                _on_success(bucket)
+                return result
+        finally:
+            # Cancelled, interrupted or failed locally before the API gave a
+            # verdict: without this the breaker would wait for the trial's
+            # outcome forever
+            if trial:
+                breaker.release_trial()
+        await asyncio.sleep(delay)
+        attempt += 1
@@ -0,0 +1,220 @@
+"""
+Local receiver for Parallel task run webhooks.
+
+When PARALLEL_WEBHOOK_URL is set (a public URL that reaches this process on
+PARALLEL_WEBHOOK_PORT), tasks are created with a task_run.status webhook and
+waiting on a run means sleeping until its webhook arrives. A sparse fallback
+poll still runs in case a delivery is lost.
+
+If PARALLEL_WEBHOOK_SECRET is set, requests must carry a valid
+webhook-signature: an HMAC-SHA256 over "<webhook-id>.<webhook-timestamp>.<body>"
+(Standard Webhooks); anything else is rejected.
+
+Only one process on the machine can listen on the port. It keeps the
+statuses of the runs it waits on itself and relays the others through the
+job store, and the other processes (whose bind fails) pick up the statuses
+of the runs they wait on from there, with one query per RELAY_CHECK_INTERVAL. If the port is taken by something else,
+a process falls back to polling; if the receiving process goes away, one of
+the relaying processes takes the port over.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
+import contextlib
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+
+import job_store
+import telemetry
+
+WEBHOOK_URL = os.getenv("PARALLEL_WEBHOOK_URL")
+WEBHOOK_PORT = int(os.getenv("PARALLEL_WEBHOOK_PORT", 8787))
+WEBHOOK_SECRET = os.getenv("PARALLEL_WEBHOOK_SECRET")
+WEBHOOK_BETA = "webhook-2025-08-12"
+
+# Safety-net poll interval while waiting for webhooks (seconds)
+FALLBACK_POLL_INTERVAL = 120
+
+# How often a process that isn't the receiver checks the job store for statuses
+# of the runs it waits on, and tries to take over a freed port (seconds)
+RELAY_CHECK_INTERVAL = 2
+TAKEOVER_INTERVAL = 30
+
+# Answer to GET requests, so processes can tell the port is held by one of us
+RECEIVER_BANNER = b"parallel-webhook-receiver"
+
+# "receiver" (listening on the port), "relay" (another process listens and
+# relays through the job store) or "polling" (nobody we know of listens)
+_mode = None
+_server = None
+_server_lock = threading.Lock()
+
+# Runs this process waits on (see watching), the latest status received for
+# each of them, and the waiters to wake up for it
+_watched = set()
+_statuses = {}
+_waiters = {}
+_registry_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    """Whether runs created by this process should use webhooks; starts the receiver if needed"""
+    return bool(WEBHOOK_URL) and start() != "polling"
+
+
+def webhook_param() -> dict:
+    """The webhook argument for task creation; starts the receiver if needed"""
+    start()
+    return {"url": WEBHOOK_URL, "event_types": ["task_run.status"]}
+
+
+def start() -> str:
+    """Listen on the port, or relay from the process that does; returns the mode"""
+    global _mode
+    with _server_lock:
+        if _mode is None:
+            _mode = "receiver" if _listen() else "relay" if _receiver_running() else "polling"
+            if _mode == "relay":
+                telemetry.log("webhooks_relayed", port=WEBHOOK_PORT)
+                threading.Thread(target=_relay, name="webhook-relay", daemon=True).start()
+            elif _mode == "polling":
+                telemetry.log("webhooks_unavailable", logging.WARNING, port=WEBHOOK_PORT)
+        return _mode
+
+
+def _listen() -> bool:
+    global _server
+    try:
+        _server = ThreadingHTTPServer(("0.0.0.0", WEBHOOK_PORT), _Handler)
+    except OSError:
+        return False
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    telemetry.log("webhooks_listening", port=WEBHOOK_PORT, url=WEBHOOK_URL)
+    return True
+
+
+def _receiver_running() -> bool:
+    """Whether the process holding the port is one of ours"""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{WEBHOOK_PORT}/", timeout=2) as response:
+            return response.read() == RECEIVER_BANNER
+    except OSError:
+        return False
+
+
+def _relay():
+    """Wake up local waiters with the statuses the receiving process relayed"""
+    global _mode
+    last_takeover = time.monotonic()
+    while True:
+        time.sleep(RELAY_CHECK_INTERVAL)
+        with _registry_lock:
+            run_ids = list(_watched.union(_waiters))
+        try:
+            for run_id, status in job_store.take_webhook_statuses(run_ids).items():
+                notify(run_id, status)
+        except Exception as e:
+            telemetry.log("webhooks_relay_failed", logging.ERROR, error=str(e))
+        if time.monotonic() - last_takeover > TAKEOVER_INTERVAL:
+            last_takeover = time.monotonic()
+            with _server_lock:
+                if _listen():
+                    _mode = "receiver"
+                    # Statuses already relayed for runs waited on here are caught by the fallback poll
+                    return
+
+
+def _signature_valid(headers, body: bytes) -> bool:
+    if not WEBHOOK_SECRET:
+        return True
+    message = f"{headers.get('webhook-id')}.{headers.get('webhook-timestamp')}.".encode() + body
+    expected = base64.b64encode(hmac.new(WEBHOOK_SECRET.encode(), message, hashlib.sha256).digest()).decode()
+    signatures = [sig.split(",", 1)[-1] for sig in headers.get("webhook-signature", "").split()]
+    return any(hmac.compare_digest(expected, sig) for sig in signatures)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(RECEIVER_BANNER)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("content-length", 0)))
+        if not _signature_valid(self.headers, body):
+            self.send_response(401)
+            self.end_headers()
+            return
+        try:
+            payload = json.loads(body)
+            data = payload.get("data", payload)
+            run_id, status = data["run_id"], data.get("status")
+        except (ValueError, KeyError, AttributeError) as e:
+            telemetry.log("webhook_malformed", logging.WARNING, error=str(e))
+        else:
+            if not notify(run_id, status):
+                # Not a run of this process, so most likely one of another process
+                job_store.record_webhook_status(run_id, status)
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def watching(run_id: str):
+    """
+    Mark a run as waited on by this process for the duration of the block, so
+    its statuses are kept (or picked up from the relay) even while nobody is
+    in wait_for_status, e.g. during a fallback poll
+    """
+    with _registry_lock:
+        _watched.add(run_id)
+    try:
+        yield
+    finally:
+        with _registry_lock:
+            _watched.discard(run_id)
+            _statuses.pop(run_id, None)
+
+
+def notify(run_id: str, status: str | None) -> bool:
+    """Record a run's new status and wake up whoever is waiting on it; False if the run isn't watched here"""
+    with _registry_lock:
+        if run_id not in _watched and run_id not in _waiters:
+            return False
+        _statuses[run_id] = status
+        waiters = _waiters.pop(run_id, [])
+    for loop, event in waiters:
+        loop.call_soon_threadsafe(event.set)
+    return True
+
+
+async def wait_for_status(run_id: str, timeout: float) -> str | None:
+    """Wait up to timeout for a webhook about run_id and return its status, or None"""
+    event = asyncio.Event()
+    waiter = (asyncio.get_running_loop(), event)
+    with _registry_lock:
+        if run_id in _statuses:
+            return _statuses.pop(run_id)
+        _waiters.setdefault(run_id, []).append(waiter)
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        with _registry_lock:
+            waiters = _waiters.get(run_id, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters:
+                _waiters.pop(run_id, None)
+    with _registry_lock:
+        return _statuses.pop(run_id, None)
@@ -0,0 +1,132 @@
+"""
+Generation workers: run profile generations outside the Streamlit process.
+
+Usage:
+    python worker.py --workers 4 --jobs-per-worker 4
+
+The app only submits jobs (job_store.submit_job) and reads their status;
+each worker process claims queued jobs from the job store and runs
+pull_data_for_company for them, so long generations neither compete with
+page rendering nor die with the web process, and workers scale on their own.
+
+A job is completed as soon as its profile is published. A profile published
+at its deadline keeps being upgraded by late agents inside the worker while
+the worker moves on to the next job. If a worker dies, its running jobs are
+queued again once its heartbeat goes stale, and their generations are
+reattached to by whichever worker picks them up.
+
+A job is cancelled when its requester cancels it, or stops checking on it
+(the app touches its job on every rerun) for REQUESTER_GONE_SECONDS.
+"""
+from datetime import datetime, timedelta
+import argparse
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+
+import job_store
+import telemetry
+from merge_sectors_data import GenerationCancelled, pull_data_for_company
+
+DEFAULT_WORKERS = 2
+DEFAULT_JOBS_PER_WORKER = 4
+
+CLAIM_INTERVAL = 1  # seconds between checks of an empty queue
+
+# Browsers throttle timers in background tabs to about once a minute, so a
+# requester only counts as gone after missing a couple of refreshes
+REQUESTER_GONE_SECONDS = 180
+
+
+class JobCancelToken:
+    """Cancel event for a job, set from the job store (checked at most once a second)"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._checked_at = 0
+        self._set = False
+
+    def is_set(self) -> bool:
+        if not self._set and time.monotonic() - self._checked_at >= 1:
+            self._checked_at = time.monotonic()
+            job = job_store.get_job(self.job_id)
+            gone_since = datetime.now() - timedelta(seconds=REQUESTER_GONE_SECONDS)
+            self._set = (job is None or bool(job["cancel_requested"])
+                         or datetime.fromisoformat(job["client_heartbeat_at"]) < gone_since)
+        return self._set
+
+
+def run_job(job: dict):
+    job_id, company = job["job_id"], job["company"]
+    telemetry.log("job_started", job_id=job_id, company=company)
+    try:
+        _, ticker = pull_data_for_company(company, two_tier=bool(job["two_tier"]), budget=job["budget"],
+                                          cancel=JobCancelToken(job_id), tenant=job["tenant"])
+    except GenerationCancelled as e:
+        job_store.finish_job(job_id, "cancelled", error=str(e))
+        telemetry.log("job_cancelled", job_id=job_id, company=company)
+        return
+    except Exception as e:
+        job_store.finish_job(job_id, "failed", error=str(e))
+        telemetry.log("job_failed", logging.ERROR, exc_info=True, job_id=job_id, company=company, error=str(e))
+        return
+    if ticker:
+        job_store.finish_job(job_id, "completed", ticker)
+    else:
+        job_store.finish_job(job_id, "failed", error=f"Failed to retrieve data for {company}")
+    telemetry.log("job_finished", logging.INFO if ticker else logging.WARNING, job_id=job_id, company=company,
+                  ticker=ticker)
+
+
+def work(stop: threading.Event):
+    """Claim and run jobs one at a time until stop is set"""
+    while not stop.is_set():
+        job = job_store.claim_job(job_store.PROCESS_ID)
+        if job is None:
+            stop.wait(CLAIM_INTERVAL)
+            continue
+        run_job(job)
+
+
+def worker_main(jobs_per_worker: int):
+    """Entry point of one worker process"""
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    job_store.worker_heartbeat(job_store.PROCESS_ID)
+    telemetry.log("worker_started", worker_id=job_store.PROCESS_ID, job_slots=jobs_per_worker)
+    threads = [threading.Thread(target=work, args=(stop,), daemon=True) for _ in range(jobs_per_worker)]
+    for thread in threads:
+        thread.start()
+    while not stop.wait(job_store.HEARTBEAT_INTERVAL):
+        job_store.worker_heartbeat(job_store.PROCESS_ID)
+    # Generations still running here become orphans, and their jobs are
+    # queued again for other workers once this worker's heartbeat goes stale
+    telemetry.log("worker_stopped", worker_id=job_store.PROCESS_ID)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run profile generations submitted by the app")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of worker processes")
+    parser.add_argument("--jobs-per-worker", type=int, default=DEFAULT_JOBS_PER_WORKER,
+                        help="Jobs each worker process runs at once")
+    args = parser.parse_args()
+
+    # Spawned (not forked) so each worker gets its own job store PROCESS_ID
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=worker_main, args=(args.jobs_per_worker,)) for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()